@@ -0,0 +1,275 @@
+import logging
+import threading
+import collections
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from .bulk import BulkError
+from .sessions import get_default_session_pool
+from .throttle import ThrottleGovernor
+
+
+class Account(object):
+    """
+    Credentials and region of a seller account.
+    """
+
+    def __init__(self, name, access_key, secret_key, account_id, region='US', auth_token='', domain=''):
+        self.name = name
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.account_id = account_id
+        self.region = region
+        self.auth_token = auth_token
+        self.domain = domain
+
+    def credentials(self):
+        """
+        :return: dict of the `mws.MWS` constructor arguments.
+        """
+        return dict(access_key=self.access_key, secret_key=self.secret_key, account_id=self.account_id,
+                    region=self.region, auth_token=self.auth_token, domain=self.domain)
+
+    def __repr__(self):
+        return '<{} {} account_id={} region={}>'.format(self.__class__.__name__, self.name, self.account_id,
+                                                        self.region)
+
+
+class AccountRegistry(object):
+    """
+    Seller accounts by name.
+    """
+
+    def __init__(self, accounts=()):
+        self.accounts = collections.OrderedDict()
+        for account in accounts:
+            self.add(account)
+
+    @classmethod
+    def from_dict(cls, mapping):
+        """
+        :param mapping: dict of name: dict of :class:`Account` arguments, ie. loaded from a config file.
+        """
+        return cls(Account(name, **credentials) for name, credentials in mapping.items())
+
+    def add(self, account):
+        self.accounts[account.name] = account
+        return account
+
+    def remove(self, name):
+        self.accounts.pop(name, None)
+
+    def __getitem__(self, name):
+        return self.accounts[name]
+
+    def __contains__(self, name):
+        return name in self.accounts
+
+    def __iter__(self):
+        return iter(self.accounts.values())
+
+    def __len__(self):
+        return len(self.accounts)
+
+
+class AccountResults(object):
+    """
+    Results and errors of jobs run for many accounts, grouped by account name.
+    """
+
+    def __init__(self):
+        self.results = collections.defaultdict(list)
+        self.errors = collections.defaultdict(list)
+
+    def add(self, account, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            self.errors[account].append(e)
+        else:
+            self.results[account].append(result)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def raise_for_errors(self):
+        """
+        :raise: :class:`BulkError` mapping each failed account to its exceptions.
+        """
+        if self.errors:
+            raise BulkError(dict(self.errors))
+
+    def __repr__(self):
+        return '<{} results={} errors={}>'.format(
+            self.__class__.__name__, sum(map(len, self.results.values())), sum(map(len, self.errors.values())))
+
+
+class MultiAccountExecutor(object):
+    """
+    Run client calls for many seller accounts on one thread pool.
+
+    Clients are created once per account and client class and reused by every job
+    of that account. Jobs are queued per account and started round robin, with at
+    most `per_account` jobs of an account running at once, so an account with
+    thousands of jobs doesn't hold back the others. Clients share one
+    :class:`ThrottleGovernor`, whose buckets are per seller and operation.
+    """
+
+    def __init__(self, registry, max_workers=16, per_account=2, governor=None, session_pool=None):
+        """
+        :param registry: :class:`AccountRegistry`
+        :param max_workers: Number of jobs running at once across every account.
+        :param per_account: Number of jobs of a single account running at once.
+        :param governor: :class:`ThrottleGovernor` of the clients, one is created by default.
+        :param session_pool: :class:`SessionPool` of the clients, defaults to the shared one.
+        """
+        self.registry = registry
+        self.max_workers = max_workers
+        self.per_account = per_account
+        self.governor = governor or ThrottleGovernor()
+        self.session_pool = session_pool or get_default_session_pool()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mws-account')
+        self._clients = {}
+        self._queues = collections.OrderedDict()
+        self._turns = collections.deque()
+        self._running = collections.Counter()
+        self._active = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def client(self, account, client_class, **kwargs):
+        """
+        Warm client of an account, created on first use.
+
+        :param account: Account name.
+        :param client_class: ie. :class:`InboundShipments` or :class:`AdvancedReports`.
+        :param kwargs: Extra constructor arguments, ie. `report_type=...`.
+        """
+        key = (account, client_class, tuple(sorted(kwargs.items())))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                credentials = self.registry[account].credentials()
+                client = self._clients[key] = client_class(governor=self.governor, session_pool=self.session_pool,
+                                                           **dict(credentials, **kwargs))
+        return client
+
+    def _dispatch(self):
+        # Called with the lock held: start queued jobs, taking the accounts in turn.
+        while self._active < self.max_workers:
+            for _ in range(len(self._turns)):
+                account = self._turns[0]
+                self._turns.rotate(-1)
+                if self._queues[account] and self._running[account] < self.per_account:
+                    break
+            else:
+                return
+            future, call = self._queues[account].popleft()
+            try:
+                self._pool.submit(self._run, account, future, call)
+            except RuntimeError as e:
+                # The pool was shut down behind our back, don't leave the future pending.
+                future.set_exception(e)
+                continue
+            self._running[account] += 1
+            self._active += 1
+
+    def _run(self, account, future, call):
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(call())
+                except BaseException as e:
+                    self.logger.debug('job of account {} failed: {!r}'.format(account, e))
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                self._running[account] -= 1
+                self._active -= 1
+                self._dispatch()
+                if not self._active:
+                    self._idle.notify_all()
+                    if self._closed:
+                        self._pool.shutdown(wait=False)
+
+    def submit(self, account, client_class, func, *args, client_kwargs=None, **kwargs):
+        """
+        Queue `func(client, *args, **kwargs)` with the warm `client_class` client of an account.
+
+        :param account: Account name.
+        :param client_kwargs: Extra constructor arguments of the client.
+        :return: `concurrent.futures.Future` with an `account` attribute.
+        """
+        if account not in self.registry:
+            raise KeyError('unknown account {!r}'.format(account))
+        future = Future()
+        future.account = account
+
+        def call():
+            return func(self.client(account, client_class, **(client_kwargs or {})), *args, **kwargs)
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('cannot submit jobs after shutdown')
+            if account not in self._queues:
+                self._queues[account] = collections.deque()
+                self._turns.append(account)
+            self._queues[account].append((future, call))
+            self._dispatch()
+        return future
+
+    @staticmethod
+    def gather(futures):
+        """
+        Wait for futures returned by :meth:`submit` and group their outcome by account.
+
+        :return: :class:`AccountResults`
+        """
+        futures = list(futures)
+        wait(futures)
+        results = AccountResults()
+        for future in futures:
+            results.add(future.account, future)
+        return results
+
+    def map_accounts(self, client_class, func, *args, accounts=None, client_kwargs=None, **kwargs):
+        """
+        Run `func(client, *args, **kwargs)` once for every account.
+
+        :param accounts: Account names, defaults to every account of the registry.
+        :return: :class:`AccountResults`
+        """
+        names = accounts if accounts is not None else [account.name for account in self.registry]
+        return self.gather([
+            self.submit(name, client_class, func, *args, client_kwargs=client_kwargs, **kwargs) for name in names
+        ])
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """
+        Stop accepting jobs. The queued jobs still run unless `cancel_futures` is True.
+
+        :param wait: Block until every job is done.
+        :param cancel_futures: Cancel the jobs that haven't started yet.
+        """
+        with self._lock:
+            self._closed = True
+            if cancel_futures:
+                for queue in self._queues.values():
+                    while queue:
+                        future, _ = queue.popleft()
+                        if future.cancel():
+                            future.set_running_or_notify_cancel()
+            if wait:
+                self._idle.wait_for(lambda: not self._active)
+            if self._active:
+                # The last job to finish shuts the pool down.
+                return
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -0,0 +1,214 @@
+import asyncio
+
+from mws import mws
+from mws.mws import DictWrapper, DataWrapper, MWSError, XMLError
+
+from .client import MWSClientMixin
+from .metrics import instrumentation
+from .mws_additions import InboundShipments, OutboundShipments
+from .throttle import is_throttled
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncResponse(object):
+    """
+    Minimal response object exposing the parts of `requests.Response` used by the clients.
+    """
+
+    def __init__(self, url, status_code, headers, content, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            error = MWSError('{} Error for url: {}'.format(self.status_code, self.url))
+            error.response = self
+            raise error
+
+
+class AsyncTransport(object):
+    """
+    Pooled async HTTP transport shared by async MWS clients.
+
+    The underlying `aiohttp.ClientSession` is created lazily in the running event loop,
+    so a single transport can serve every client (and every seller) driven by that loop.
+    """
+
+    def __init__(self, limit=100, limit_per_host=0, timeout=60):
+        """
+        :param limit: Maximum number of simultaneous connections.
+        :param limit_per_host: Maximum number of simultaneous connections to the same endpoint, 0 for no limit.
+        :param timeout: Total timeout of a single request in seconds.
+        """
+        if aiohttp is None:
+            raise ImportError('aiohttp is required for the async clients: pip install mws_extensions[async]')
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self._session = None
+        self._loop = None
+
+    async def get_session(self):
+        """
+        :return: `aiohttp.ClientSession` of the running event loop.
+
+        A session left by another event loop is closed once replaced.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+        stale, stale_loop = self._session, self._loop
+        connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+        session = self._session = aiohttp.ClientSession(connector=connector,
+                                                        timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self._loop = loop
+        await self._close_session(stale, stale_loop)
+        return session
+
+    @staticmethod
+    async def _close_session(session, loop):
+        if session is None or session.closed:
+            return
+        if loop is not asyncio.get_running_loop() and loop.is_running():
+            # Its loop still runs in another thread, the connections must be closed there.
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            await session.close()
+
+    async def request(self, method, url, data=None, headers=None):
+        session = await self.get_session()
+        async with session.request(method, url, data=data or None, headers=headers) as response:
+            content = await response.read()
+            return AsyncResponse(url, response.status, response.headers, content, response.charset)
+
+    async def close(self):
+        session, self._session = self._session, None
+        await self._close_session(session, self._loop)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+_default_transport = None
+
+
+def get_default_transport():
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = AsyncTransport()
+    return _default_transport
+
+
+def sync_only(name):
+    """
+    Method overriding a helper of the sync clients that the async clients don't provide,
+    so that calling it fails right away instead of leaving coroutines un-awaited.
+    """
+    def method(self, *args, **kwargs):
+        raise TypeError('{}.{}() is only available on the sync clients'.format(self.__class__.__name__, name))
+    method.__name__ = name
+    return method
+
+
+class AsyncMWS(MWSClientMixin, mws.MWS):
+    """
+    Async base class: `make_request` is a coroutine sent through an :class:`AsyncTransport`.
+
+    Every API method of a subclass that returns `self.make_request(...)` becomes awaitable
+    without being rewritten, ie. `await client.list_inbound_shipments(...)`.
+    """
+
+    def __init__(self, *args, transport=None, **kwargs):
+        self.transport = transport or get_default_transport()
+        super().__init__(*args, **kwargs)
+
+    stream_request = sync_only('stream_request')
+
+    async def _send(self, extra_data, method="GET", **kwargs):
+        url = self.build_url(extra_data, method)
+        headers = {'User-Agent': 'python-amazon-mws/0.8.6 (Language=Python)'}
+        headers.update(kwargs.get('extra_headers', {}))
+        with instrumentation.timer('mws.request.http', operation=extra_data.get('Action')):
+            return await self.transport.request(method, url, data=kwargs.get('body', ''), headers=headers)
+
+    async def _throttled_send(self, extra_data, method="GET", **kwargs):
+        operation = extra_data.get('Action')
+        for attempt in range(self.throttle_retries + 1):
+            wait = self.governor.reserve(self.account_id, operation)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            response = await self._send(extra_data, method, **kwargs)
+            if attempt < self.throttle_retries and is_throttled(response):
+                self.governor.throttled(self.account_id, operation)
+                instrumentation.count('mws.retries', operation=operation)
+                continue
+            if response.status_code < 400:
+                self.governor.sync(self.account_id, operation, response.headers)
+            return response
+
+    async def make_request(self, extra_data, method="GET", **kwargs):
+        """
+        Make request to Amazon MWS API with these parameters
+        """
+        if self.governor is None:
+            response = await self._send(extra_data, method, **kwargs)
+        else:
+            response = await self._throttled_send(extra_data, method, **kwargs)
+        operation = extra_data.get('Action')
+        if response.status_code >= 400:
+            instrumentation.count('mws.errors', operation=operation, status=response.status_code)
+            error = MWSError(response.text)
+            error.response = response
+            raise error
+
+        data = response.content
+        rootkey = kwargs.get('rootkey', operation + "Result")
+        with instrumentation.timer('mws.response.parse', operation=operation):
+            try:
+                try:
+                    parsed_response = DictWrapper(data, rootkey)
+                except TypeError:
+                    # When we got CSV as result, we will got error on this
+                    parsed_response = DictWrapper(response.text, rootkey)
+            except XMLError:
+                parsed_response = DataWrapper(data, response.headers)
+
+        # Store the response object in the parsed_response for quick access
+        parsed_response.response = response
+        return parsed_response
+
+
+class AsyncInboundShipments(AsyncMWS, InboundShipments):
+    """
+    Async counterpart of :class:`InboundShipments`, every API method is a coroutine.
+    The paginators and the concurrent bulk helpers are only available on the sync client.
+    """
+
+    iter_inbound_shipments = sync_only('iter_inbound_shipments')
+    iter_inbound_shipment_items = sync_only('iter_inbound_shipment_items')
+    iter_items_for_shipments = sync_only('iter_items_for_shipments')
+    inbound_guidance_for_skus = sync_only('inbound_guidance_for_skus')
+    inbound_guidance_for_asins = sync_only('inbound_guidance_for_asins')
+
+
+class AsyncOutboundShipments(AsyncMWS, OutboundShipments):
+    """
+    Async counterpart of :class:`OutboundShipments`, every API method is a coroutine.
+    The paginator is only available on the sync client.
+    """
+
+    iter_all_fulfillment_orders = sync_only('iter_all_fulfillment_orders')
@@ -0,0 +1,64 @@
+import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class BulkError(Exception):
+    """
+    Raised once a bulk operation is over if some of its keys failed.
+
+    `errors` maps each failed key to its exception, every other key has already been delivered.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('{} of the requests failed: {}'.format(
+            len(errors), ', '.join(str(key) for key in list(errors)[:10])))
+
+
+def fan_out(func, keys, max_workers=8, errors=None):
+    """
+    Call `func` for every key on a bounded thread pool and yield the results as they complete.
+
+    At most `max_workers` * 2 calls are queued at once, so `keys` can be a long lazy iterable.
+    Duplicate keys are called once.
+
+    :param func: function of a key.
+    :param keys: iterable of hashable keys.
+    :param max_workers: Number of concurrent calls.
+    :param errors: Optional dict filled with the failed keys and their exception, otherwise
+        a :class:`BulkError` is raised after the last result.
+    :return: generator of (key, result)
+    """
+    logger = logging.getLogger('fan_out')
+    failed = {} if errors is None else errors
+    seen = set()
+    keys = (key for key in keys if not (key in seen or seen.add(key)))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def submit(count):
+            for key in itertools.islice(keys, count):
+                pending[executor.submit(func, key)] = key
+
+        try:
+            submit(max_workers * 2)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning('{} failed: {!r}'.format(key, e))
+                        failed[key] = e
+                        continue
+                    yield key, result
+                submit(len(done))
+        finally:
+            for future in pending:
+                future.cancel()
+
+    if failed and errors is None:
+        raise BulkError(failed)
@@ -0,0 +1,146 @@
+import copy
+import logging
+
+from mws.mws import MWSError, DictWrapper, DataWrapper, XMLError
+
+from .metrics import instrumentation
+from .sessions import get_default_session_pool
+from .signing import RequestSigner
+from .throttle import ThrottleGovernor, is_throttled
+
+
+class MWSClientMixin(object):
+    """
+    Mixin adding client side features to `mws.MWS` subclasses.
+
+    It must come before the `mws.MWS` subclass in the bases, ie.
+    `class InboundShipments(MWSClientMixin, mws.MWS)`.
+    """
+
+    # Number of times a throttled request is retried once the governor allows it.
+    throttle_retries = 3
+
+    def __init__(self, *args, governor=None, session_pool=None, **kwargs):
+        """
+        :param governor: Optional :class:`ThrottleGovernor` shared between clients.
+        :param session_pool: :class:`SessionPool` sending the requests, defaults to one shared by every client.
+        """
+        self.governor = governor
+        self.session_pool = session_pool or get_default_session_pool()
+        super().__init__(*args, **kwargs)
+        self._signer = None
+
+    @property
+    def signer(self):
+        """
+        :class:`RequestSigner` of the client, built on first use.
+        """
+        if self._signer is None:
+            self._signer = RequestSigner(self)
+        return self._signer
+
+    def governed(self):
+        """
+        This client if it has a governor, otherwise a copy of it throttled by a new :class:`ThrottleGovernor`,
+        ie. for the concurrent requests of a single bulk call. The client itself is left untouched.
+        """
+        if self.governor is not None:
+            return self
+        client = copy.copy(self)
+        client.governor = ThrottleGovernor()
+        return client
+
+    def build_url(self, extra_data, method="GET"):
+        """
+        Build the signed url of a request, same as `mws.MWS.make_request`.
+        """
+        if not instrumentation.enabled:
+            return self.signer.url(extra_data, method)
+        operation = extra_data.get('Action')
+        with instrumentation.timer('mws.request.build', operation=operation):
+            query = self.signer.query(extra_data)
+        with instrumentation.timer('mws.request.sign', operation=operation):
+            return self.signer.signed_url(query, method)
+
+    def _make_request(self, extra_data, method="GET", **kwargs):
+        """
+        Same as `mws.MWS.make_request`, signing the request with :attr:`signer`.
+        """
+        operation = extra_data.get('Action')
+        url = self.build_url(extra_data, method)
+        headers = {'User-Agent': 'python-amazon-mws/0.8.6 (Language=Python)'}
+        headers.update(kwargs.get('extra_headers', {}))
+
+        with instrumentation.timer('mws.request.http', operation=operation):
+            response = self.session_pool.request(method, url, data=kwargs.get('body', ''), headers=headers)
+        if response.status_code >= 400:
+            instrumentation.count('mws.errors', operation=operation, status=response.status_code)
+            error = MWSError(response.text)
+            error.response = response
+            raise error
+
+        data = response.content
+        rootkey = kwargs.get('rootkey', operation + "Result")
+        with instrumentation.timer('mws.response.parse', operation=operation):
+            try:
+                try:
+                    parsed_response = DictWrapper(data, rootkey)
+                except TypeError:  # raised when using Python 3 and trying to remove_namespace()
+                    parsed_response = DictWrapper(response.text, rootkey)
+            except XMLError:
+                parsed_response = DataWrapper(data, response.headers)
+
+        parsed_response.response = response
+        return parsed_response
+
+    def make_request(self, extra_data, method="GET", **kwargs):
+        if self.governor is None:
+            return self._make_request(extra_data, method, **kwargs)
+
+        operation = extra_data.get('Action')
+        for attempt in range(self.throttle_retries + 1):
+            self.governor.acquire(self.account_id, operation)
+            try:
+                parsed_response = self._make_request(extra_data, method, **kwargs)
+            except MWSError as e:
+                if attempt < self.throttle_retries and is_throttled(e.response):
+                    logger = logging.getLogger(self.__class__.__name__)
+                    logger.debug('{} throttled for seller {}'.format(operation, self.account_id))
+                    self.governor.throttled(self.account_id, operation)
+                    instrumentation.count('mws.retries', operation=operation)
+                    continue
+                raise
+            self.governor.sync(self.account_id, operation, parsed_response.response.headers)
+            return parsed_response
+
+    def stream_request(self, extra_data, method="GET", **kwargs):
+        """
+        Make request to Amazon MWS API without reading the response body.
+
+        :return: `requests.Response` opened with `stream=True`, the caller must close it.
+        """
+        operation = extra_data.get('Action')
+        headers = {'User-Agent': 'python-amazon-mws/0.8.6 (Language=Python)'}
+        headers.update(kwargs.get('extra_headers', {}))
+
+        for attempt in range(self.throttle_retries + 1):
+            if self.governor is not None:
+                self.governor.acquire(self.account_id, operation)
+            url = self.build_url(extra_data, method)
+            with instrumentation.timer('mws.request.http', operation=operation):
+                response = self.session_pool.request(method, url, data=kwargs.get('body', ''), headers=headers,
+                                                     stream=True)
+            if response.status_code >= 400:
+                instrumentation.count('mws.errors', operation=operation, status=response.status_code)
+                # Error bodies are small xml documents, reading them is fine.
+                error = MWSError(response.text)
+                error.response = response
+                response.close()
+                if self.governor is not None and attempt < self.throttle_retries and is_throttled(response):
+                    self.governor.throttled(self.account_id, operation)
+                    instrumentation.count('mws.retries', operation=operation)
+                    continue
+                raise error
+            if self.governor is not None:
+                self.governor.sync(self.account_id, operation, response.headers)
+            return response
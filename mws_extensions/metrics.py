@@ -0,0 +1,214 @@
+import time
+import threading
+import contextlib
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+
+class Measurement(object):
+    """
+    A single timing or counter increment handed to the sinks.
+    """
+
+    __slots__ = ('kind', 'name', 'value', 'labels', 'start')
+
+    TIMER = 'timer'
+    COUNTER = 'counter'
+
+    def __init__(self, kind, name, value, labels, start=None):
+        """
+        :param kind: `Measurement.TIMER` or `Measurement.COUNTER`.
+        :param name: Metric name, ie. `mws.request.http`.
+        :param value: Seconds for a timer, increment for a counter.
+        :param labels: dict of str, ie. `{'operation': 'ListInboundShipments'}`.
+        :param start: Wall clock start time of a timer, in seconds since the epoch.
+        """
+        self.kind = kind
+        self.name = name
+        self.value = value
+        self.labels = labels
+        self.start = start
+
+    def __repr__(self):
+        return '<{} {} {}={} {}>'.format(self.__class__.__name__, self.kind, self.name, self.value, self.labels)
+
+
+class _Timer(object):
+
+    __slots__ = ('instrumentation', 'name', 'labels', 'start', 'started')
+
+    def __init__(self, instrumentation, name, labels):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.time()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        elapsed = time.perf_counter() - self.started
+        if exc_type is not None:
+            self.labels['error'] = exc_type.__name__
+        self.instrumentation.emit(Measurement(Measurement.TIMER, self.name, elapsed, self.labels, self.start))
+        return False
+
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class Instrumentation(object):
+    """
+    Dispatch timings and counters of the clients to pluggable sinks.
+
+    Without sinks every call returns right away, so the instrumentation left in the
+    hot paths costs a function call and an attribute check.
+    """
+
+    def __init__(self):
+        self.sinks = ()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.sinks)
+
+    def add_sink(self, sink):
+        with self._lock:
+            self.sinks = self.sinks + (sink,)
+        return sink
+
+    def remove_sink(self, sink):
+        with self._lock:
+            self.sinks = tuple(s for s in self.sinks if s is not sink)
+
+    def emit(self, measurement):
+        for sink in self.sinks:
+            sink.record(measurement)
+
+    def timer(self, name, **labels):
+        """
+        Context manager timing its block, ie. `with instrumentation.timer('mws.request.http', operation=...)`.
+        """
+        if not self.sinks:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def observe(self, name, seconds, **labels):
+        """
+        Record a duration measured elsewhere, ie. from Amazon's report request dates.
+        """
+        if self.sinks:
+            self.emit(Measurement(Measurement.TIMER, name, seconds, labels, time.time() - seconds))
+
+    def count(self, name, value=1, **labels):
+        if self.sinks:
+            self.emit(Measurement(Measurement.COUNTER, name, value, labels))
+
+
+instrumentation = Instrumentation()
+
+
+class CallbackSink(object):
+    """
+    Call a function with every :class:`Measurement`.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def record(self, measurement):
+        self.callback(measurement)
+
+
+class PrometheusSink(object):
+    """
+    Aggregate the measurements and render them in the Prometheus text exposition format.
+
+    Timers become summaries (`_count` and `_sum` in seconds), counters become counters.
+    Metric names have their dots replaced by underscores, ie. `mws_request_http_seconds`.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.summaries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name.replace('.', '_'), tuple(sorted(labels.items()))
+
+    def record(self, measurement):
+        key = self._key(measurement.name, measurement.labels)
+        with self._lock:
+            if measurement.kind == Measurement.COUNTER:
+                self.counters[key] = self.counters.get(key, 0) + measurement.value
+            else:
+                count, total = self.summaries.get(key, (0, 0.0))
+                self.summaries[key] = (count + 1, total + measurement.value)
+
+    @staticmethod
+    def _labels(labels):
+        if not labels:
+            return ''
+        return '{' + ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                              for k, v in labels) + '}'
+
+    def text(self):
+        """
+        :return: str in the Prometheus text format, ie. to serve on a `/metrics` endpoint.
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            summaries = sorted(self.summaries.items())
+        declared = set()
+        for (name, labels), value in counters:
+            name = name + '_total'
+            if name not in declared:
+                declared.add(name)
+                lines.append('# TYPE {} counter'.format(name))
+            lines.append('{}{} {}'.format(name, self._labels(labels), value))
+        for (name, labels), (count, total) in summaries:
+            name = name + '_seconds'
+            if name not in declared:
+                declared.add(name)
+                lines.append('# TYPE {} summary'.format(name))
+            lines.append('{}_count{} {}'.format(name, self._labels(labels), count))
+            lines.append('{}_sum{} {:.6f}'.format(name, self._labels(labels), total))
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.summaries.clear()
+
+
+class SpanSink(object):
+    """
+    Export timers as OpenTelemetry spans, with their labels as attributes.
+    Counters are added as events of the current span.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        :param tracer: OpenTelemetry `Tracer`, defaults to the `mws_extensions` tracer of the global provider.
+        """
+        if tracer is None:
+            if trace is None:
+                raise ImportError('opentelemetry-api is required for SpanSink: pip install mws_extensions[otel]')
+            tracer = trace.get_tracer('mws_extensions')
+        self.tracer = tracer
+
+    def record(self, measurement):
+        if measurement.kind == Measurement.COUNTER:
+            if trace is not None:
+                trace.get_current_span().add_event(measurement.name, dict(measurement.labels, value=measurement.value))
+            return
+        start = int(measurement.start * 1e9)
+        span = self.tracer.start_span(measurement.name, start_time=start, attributes=measurement.labels)
+        span.end(end_time=start + int(measurement.value * 1e9))
@@ -1,10 +1,13 @@
 from mws import mws
 from mws.utils import next_token_action
 
+from .bulk import fan_out
+from .client import MWSClientMixin
+from .pagination import Paginator, members
 from .utils import enumerate_dict, enumerate_list
 
 
-class InboundShipments(mws.MWS):
+class InboundShipments(MWSClientMixin, mws.MWS):
     URI = "/FulfillmentInboundShipment/2010-10-01"
     VERSION = '2010-10-01'
     NAMESPACE = '{http://mws.amazonaws.com/FulfillmentInboundShipment/2010-10-01/}'
@@ -12,6 +15,8 @@ class InboundShipments(mws.MWS):
         'ListInboundShipments',
         'ListInboundShipmentItems',
     ]
+    # Maximum number of SKUs or ASINs of a GetInboundGuidanceForSKU/ASIN request.
+    GUIDANCE_LIST_LIMIT = 50
 
     @next_token_action('ListInboundShipments')
     def list_inbound_shipments(self, shipment_status_list=None, shipment_id_list=None,
@@ -35,6 +40,19 @@ class InboundShipments(mws.MWS):
         data.update(enumerate_list('ShipmentIdList.member.', shipment_id_list))
         return self.make_request(data)
 
+    def iter_inbound_shipments(self, shipment_status_list=None, shipment_id_list=None,
+                               last_updated_after=None, last_updated_before=None, prefetch=1):
+        """
+        Iterate the shipments of every ListInboundShipments page, fetching the next
+        pages in the background, see :class:`Paginator`.
+        Returns:
+            :obj:`Paginator` of shipment :obj:`ObjectDict`
+        """
+        return Paginator.for_method(self.list_inbound_shipments, 'ListInboundShipments',
+                                    shipment_status_list=shipment_status_list, shipment_id_list=shipment_id_list,
+                                    last_updated_after=last_updated_after, last_updated_before=last_updated_before,
+                                    prefetch=prefetch)
+
     @next_token_action('ListInboundShipmentItems')
     def list_inbound_shipment_items(self, shipment_id=None, last_updated_after=None,
                                     last_updated_before=None, next_token=None):
@@ -58,6 +76,42 @@ class InboundShipments(mws.MWS):
                     LastUpdatedBefore=last_updated_before)
         return self.make_request(data)
 
+    def iter_inbound_shipment_items(self, shipment_id=None, last_updated_after=None,
+                                    last_updated_before=None, prefetch=1):
+        """
+        Iterate the items of every ListInboundShipmentItems page, fetching the next
+        pages in the background, see :class:`Paginator`.
+        Returns:
+            :obj:`Paginator` of item :obj:`ObjectDict`
+        """
+        return Paginator.for_method(self.list_inbound_shipment_items, 'ListInboundShipmentItems',
+                                    shipment_id=shipment_id, last_updated_after=last_updated_after,
+                                    last_updated_before=last_updated_before, prefetch=prefetch)
+
+    def iter_items_for_shipments(self, shipment_ids, max_workers=8, errors=None):
+        """
+        List the items of many shipments concurrently, following the NextToken pages of each one.
+
+        Requests go through the client governor, or one created for this call if the client
+        has none, since concurrent calls would otherwise just be throttled.
+        Args:
+            shipment_ids: iterable of shipment ids.
+            max_workers: Number of shipments listed at once.
+            errors: Optional dict filled with the failed shipment ids and their exception,
+                otherwise a :obj:`BulkError` is raised once every other shipment is delivered.
+        Returns:
+            generator of (shipment id, item :obj:`ObjectDict`), the items of a shipment are
+            yielded together once it is fully listed.
+        """
+        client = self.governed()
+
+        def list_items(shipment_id):
+            return list(client.iter_inbound_shipment_items(shipment_id=shipment_id, prefetch=0))
+
+        for shipment_id, items in fan_out(list_items, shipment_ids, max_workers=max_workers, errors=errors):
+            for item in items:
+                yield shipment_id, item
+
     def inbound_guidance_for_sku(self, sku_inbound_guidance_list, marketplace_id):
         """
         The GetInboundGuidanceForSKU operation lets a seller know if Amazon recommends sending an item to a given
@@ -92,6 +146,68 @@ class InboundShipments(mws.MWS):
         data.update(enumerate_list('ASINList.Id.', asin_inbound_guidance_list))
         return self.make_request(data)
 
+    def _inbound_guidance_batch(self, request, ids, marketplace_id, result_path, invalid_path, id_key,
+                                max_workers, cache, errors):
+        client = self.governed()
+
+        guidance = {}
+        missing = []
+        for id_ in dict.fromkeys(ids):
+            cached = cache.get((marketplace_id, id_)) if cache is not None else None
+            if cached is not None:
+                guidance[id_] = cached
+            else:
+                missing.append(id_)
+
+        def fetch(chunk):
+            parsed = getattr(client, request)(list(chunk), marketplace_id).parsed
+            return members(parsed, *result_path) + members(parsed, *invalid_path)
+
+        chunks = (tuple(missing[i:i + self.GUIDANCE_LIST_LIMIT])
+                  for i in range(0, len(missing), self.GUIDANCE_LIST_LIMIT))
+        for _, entries in fan_out(fetch, chunks, max_workers=max_workers, errors=errors):
+            for entry in entries:
+                id_ = entry[id_key]['value']
+                guidance[id_] = entry
+                if cache is not None:
+                    cache.set((marketplace_id, id_), entry)
+        return guidance
+
+    def inbound_guidance_for_skus(self, skus, marketplace_id, max_workers=4, cache=None, errors=None):
+        """
+        Get the inbound guidance of any number of SKUs, see :meth:`inbound_guidance_for_sku`.
+
+        SKUs are deduplicated, sent by chunks of 50 concurrently through the client governor,
+        and the responses merged.
+        Args:
+            skus: iterable of seller SKUs.
+            marketplace_id:
+            max_workers: Number of chunks requested at once.
+            cache: Optional :obj:`TTLCache` of the entries per (marketplace id, SKU).
+            errors: Optional dict filled with the failed chunks and their exception,
+                otherwise a :obj:`BulkError` is raised.
+        Returns:
+            :obj:`dict` of SKU to its `SKUInboundGuidance` or `InvalidSKU` :obj:`ObjectDict`
+        """
+        return self._inbound_guidance_batch(
+            'inbound_guidance_for_sku', skus, marketplace_id,
+            ('SKUInboundGuidanceList', 'SKUInboundGuidance'), ('InvalidSKUList', 'InvalidSKU'), 'SellerSKU',
+            max_workers, cache, errors,
+        )
+
+    def inbound_guidance_for_asins(self, asins, marketplace_id, max_workers=4, cache=None, errors=None):
+        """
+        Get the inbound guidance of any number of ASINs, see :meth:`inbound_guidance_for_asin`
+        and :meth:`inbound_guidance_for_skus`.
+        Returns:
+            :obj:`dict` of ASIN to its `ASINInboundGuidance` or `InvalidASIN` :obj:`ObjectDict`
+        """
+        return self._inbound_guidance_batch(
+            'inbound_guidance_for_asin', asins, marketplace_id,
+            ('ASINInboundGuidanceList', 'ASINInboundGuidance'), ('InvalidASINList', 'InvalidASIN'), 'ASIN',
+            max_workers, cache, errors,
+        )
+
     def create_inbound_shipment_plan(self, ship_from_address, inbound_shipment_plan_request_items,
                                      ship_to_country_code=None, ship_to_country_ship_to_country_subdivision_code=None,
                                      label_prep_preference=None):
@@ -140,7 +256,7 @@ class InboundShipments(mws.MWS):
         return self.make_request(data)
 
 
-class OutboundShipments(mws.MWS):
+class OutboundShipments(MWSClientMixin, mws.MWS):
 
     """ Amazon MWS OutboundShipments API """
 
@@ -157,6 +273,16 @@ class OutboundShipments(mws.MWS):
                     QueryStartDateTime=query_start_date_time)
         return self.make_request(data, "POST")
 
+    def iter_all_fulfillment_orders(self, query_start_date_time=None, prefetch=1):
+        """
+        Iterate the orders of every ListAllFulfillmentOrders page, fetching the next
+        pages in the background, see :class:`Paginator`.
+        Returns:
+            :obj:`Paginator` of fulfillment order :obj:`ObjectDict`
+        """
+        return Paginator.for_method(self.list_all_fulfillment_orders, 'ListAllFulfillmentOrders',
+                                    query_start_date_time=query_start_date_time, prefetch=prefetch)
+
     def get_fulfillment_order(self, seller_fulfillment_order_id):
         data = dict(Action='GetFulfillmentOrder',
                     SellerFulfillmentOrderId=seller_fulfillment_order_id)
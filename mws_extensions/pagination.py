@@ -0,0 +1,133 @@
+import queue
+import threading
+
+
+# Path of the members in the parsed `DictWrapper` result of each NextToken operation.
+MEMBER_PATHS = {
+    'ListInboundShipments': ('ShipmentData', 'member'),
+    'ListInboundShipmentItems': ('ItemData', 'member'),
+    'ListAllFulfillmentOrders': ('FulfillmentOrders', 'member'),
+}
+
+
+def members(parsed, *path):
+    """
+    Return the list found at `path` in a parsed `DictWrapper` response.
+    A single member is returned as a one element list, a missing one as an empty list.
+    """
+    node = parsed
+    for key in path:
+        node = node.get(key) if isinstance(node, dict) else None
+        if node is None:
+            return []
+    return node if isinstance(node, list) else [node]
+
+
+def next_token(parsed):
+    token = parsed.get('NextToken') if isinstance(parsed, dict) else None
+    if isinstance(token, dict):
+        token = token.get('value')
+    return token or None
+
+
+def dict_page(path):
+    """
+    Build a page extractor for `DictWrapper` responses.
+
+    :param path: Path of the members in the parsed result, ie. `('ShipmentData', 'member')`
+    :return: function of a response returning (members, next token)
+    """
+    def extract(response):
+        parsed = response.parsed
+        return members(parsed, *path), next_token(parsed)
+    return extract
+
+
+class Paginator(object):
+    """
+    Iterate the members of a NextToken operation across every page.
+
+    With `prefetch` > 0 pages are fetched on a background thread while the current one
+    is consumed, at most `prefetch` pages ahead, so a deep listing takes close to the
+    network time only. With `prefetch=0` pages are fetched on demand.
+    """
+
+    _done = object()
+
+    def __init__(self, fetch_first, fetch_next, prefetch=1):
+        """
+        :param fetch_first: function returning the first page as (members, next token).
+        :param fetch_next: function of a next token returning the following page as (members, next token).
+        :param prefetch: Number of pages fetched ahead of the consumer.
+        """
+        self.fetch_first = fetch_first
+        self.fetch_next = fetch_next
+        self.prefetch = prefetch
+
+    @classmethod
+    def for_method(cls, method, action, *args, prefetch=1, **kwargs):
+        """
+        Paginate a `@next_token_action` client method, ie.
+        `Paginator.for_method(client.list_inbound_shipments, 'ListInboundShipments', shipment_status_list=[...])`.
+        """
+        extract = dict_page(MEMBER_PATHS[action])
+        return cls(lambda: extract(method(*args, **kwargs)),
+                   lambda token: extract(method(next_token=token)),
+                   prefetch=prefetch)
+
+    def _iter_pages(self):
+        page = self.fetch_first()
+        while True:
+            yield page
+            if not page[1]:
+                return
+            page = self.fetch_next(page[1])
+
+    def _iter_prefetched_pages(self):
+        pages = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for page in self._iter_pages():
+                    if not put((page, None)):
+                        return
+            except BaseException as e:
+                put((None, e))
+                return
+            put((self._done, None))
+
+        thread = threading.Thread(target=produce, name='paginator', daemon=True)
+        thread.start()
+        try:
+            while True:
+                page, error = pages.get()
+                if error is not None:
+                    raise error
+                if page is self._done:
+                    return
+                yield page
+        finally:
+            stop.set()
+
+    def pages(self):
+        """
+        :return: generator of (members, next token)
+        """
+        if self.prefetch > 0:
+            return self._iter_prefetched_pages()
+        return self._iter_pages()
+
+    def __iter__(self):
+        for page_members, _ in self.pages():
+            for member in page_members:
+                yield member
@@ -1,2 +1,10 @@
 from .helpers import AdvancedReports
-from .exceptions import ReportFailedError
+from .exceptions import ReportFailedError, ReportTimeoutError
+from .batch import BatchReports, ReportJob
+from .polling import StatusPoller
+from .schedule import PollSchedule, FixedSchedule, BackoffSchedule, DurationEstimator
+from .records import ReportInfoRecord, ReportRequestInfoRecord
+from .cache import ReportCache
+from .journal import JobJournal
+from .notifications import NotificationListener, LocalQueue, SQSQueue
+from .diff import SnapshotDiff
@@ -0,0 +1,139 @@
+import asyncio
+
+from ..aio import AsyncMWS, sync_only
+from ..metrics import instrumentation
+from .helpers import AdvancedReports
+from .base import RequestReportResponse, GetReportRequestListResponse
+from .utils import to_amazon_timestamp
+from .streams import open_sink
+from .exceptions import ReportFailedError, ReportTimeoutError
+
+
+class AsyncAdvancedReports(AsyncMWS, AdvancedReports):
+    """
+    Async counterpart of :class:`AdvancedReports` with the same method names.
+
+    Instances sharing an :class:`AsyncTransport` can be driven from a single event loop,
+    ie. `await asyncio.gather(*(reports.request_and_download() for reports in sellers))`.
+
+    The cache, the journal, the notifications and the streaming helpers are only available
+    on the sync client.
+    """
+
+    def __init__(self, report_type, max_retries=None, schedule=None, cache=None, journal=None, notifications=None,
+                 **kwargs):
+        for name, value in (('cache', cache), ('journal', journal), ('notifications', notifications)):
+            if value is not None:
+                raise TypeError('{} does not support `{}`, use AdvancedReports'.format(self.__class__.__name__, name))
+        super().__init__(report_type, max_retries=max_retries, schedule=schedule, **kwargs)
+
+    iter_report_list = sync_only('iter_report_list')
+    iter_report_request_list = sync_only('iter_report_request_list')
+    iter_download = sync_only('iter_download')
+    iter_download_lines = sync_only('iter_download_lines')
+    iter_report_rows = sync_only('iter_report_rows')
+    iter_report_changes = sync_only('iter_report_changes')
+    iter_report_batches = sync_only('iter_report_batches')
+    done_report_requests = sync_only('done_report_requests')
+    find_report = sync_only('find_report')
+    load_cached = sync_only('load_cached')
+    submit = sync_only('submit')
+    run_job = sync_only('run_job')
+
+    async def _request(self, start_date=None, end_date=None, marketplaceids=(), report_type=None):
+        report_type = report_type or self.report_type
+        start_date, end_date = map(to_amazon_timestamp, self.resolve_dates(start_date, end_date))
+        self.logger.debug('requesting {} between {} and {}'.format(report_type, start_date, end_date))
+        parsed_response = await self.request_report(report_type, start_date, end_date, marketplaceids)
+        parsed_response.response.raise_for_status()
+        return parsed_response.response.text
+
+    async def request(self, start_date=None, end_date=None, marketplaceids=(), report_type=None):
+        return RequestReportResponse.load(await self._request(start_date, end_date, marketplaceids, report_type))
+
+    async def _get_report_status(self, report_request_id):
+        self.logger.debug('getting report request list for request id {}'.format(report_request_id))
+        parsed_response = await self.get_report_request_list(requestids=(report_request_id,))
+        parsed_response.response.raise_for_status()
+        return parsed_response.response.text
+
+    async def get_report_status(self, report_request_id):
+        doc = await self._get_report_status(report_request_id)
+        return GetReportRequestListResponse.load(doc)
+
+    async def download(self, generated_report_id):
+        self.logger.debug('downloading report for report id {}'.format(generated_report_id))
+        parsed_response = await self.get_report(generated_report_id)
+        return parsed_response.response.text
+
+    async def download_to(self, generated_report_id, dest, compression=None):
+        """
+        Write the report contents to a file.
+
+        :param generated_report_id:
+        :param dest: file path or binary file object.
+        :param compression: None, 'gzip' or 'zstd' to compress the file.
+        :return: Number of bytes downloaded.
+        """
+        parsed_response = await self.get_report(generated_report_id)
+        content = parsed_response.response.content
+        with open_sink(dest, compression) as sink:
+            sink.write(content)
+        self.logger.debug('downloaded {} bytes for report id {}'.format(len(content), generated_report_id))
+        return len(content)
+
+    async def poll(self, report_request_id):
+        """
+        Wait for report to finish processing and return the generate report id.
+
+        :param report_request_id:
+        :return:
+        """
+        return (await self.poll_info(report_request_id)).generated_report_id
+
+    async def poll_info(self, report_request_id):
+        """
+        Wait for report to finish processing and return its `ReportRequestInfo`.
+
+        :param report_request_id:
+        :return: :class:`ReportRequestInfo`
+        """
+        timer = self.schedule.timer(self.report_type)
+        while True:
+            report_status_response = await self.get_report_status(report_request_id)
+            report_status_info = report_status_response.report_request_info_list()[0]
+            status = report_status_info.report_processing_status
+            self.logger.debug('report_request_id={} report_processing_status={}'.format(report_request_id, status))
+
+            # Completed date is `None` if report isn't finished processing, otherwise it's a datetime object
+            if report_status_info.completed_date:
+                if status != '_DONE_':
+                    raise ReportFailedError(report_request_id, status)
+                self._report_finished(report_status_info)
+                break
+
+            delay = timer.next_delay()
+            if delay is None:
+                raise ReportTimeoutError(report_request_id, status)
+            await asyncio.sleep(delay)  # Wait a bit for the report status to change
+
+        return report_status_info
+
+    async def request_and_download(self, start_date=None, end_date=None, marketplaceids=(), dest=None,
+                                   compression=None):
+        """
+        request, wait, and download.
+
+        :param dest: Optional file path or binary file object to write the report to.
+        :param compression: None, 'gzip' or 'zstd', only used with `dest`.
+        :return: The report contents, or the number of bytes written if `dest` is given.
+        """
+        requested_report_response = await self.request(start_date, end_date, marketplaceids)
+        report_id = await self.poll(requested_report_response.request_report_result.report_request_id)
+        with instrumentation.timer('mws.report.download', report_type=self.report_type):
+            if dest is not None:
+                report_contents = await self.download_to(report_id, dest, compression)
+            else:
+                report_contents = await self.download(report_id)
+        await self.update_report_acknowledgements(report_ids=(report_id,), acknowledged=True)
+        return report_contents
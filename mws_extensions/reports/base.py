@@ -1,8 +1,11 @@
+import io
 import logging
+import threading
 from lxml import etree
-from functools import partial
 
+from ..metrics import instrumentation
 from .utils import from_amazon_timestamp
+from .records import ReportInfoRecord, ReportRequestInfoRecord
 
 
 def first_element_or_none(element_list):
@@ -42,6 +45,17 @@ def parse_bool(f):
     return inner
 
 
+def cached_field(f):
+    """
+    Compute a wrapper field once per instance, ie. under `@property`.
+    :param f:
+    :return:
+    """
+    def inner(self):
+        return self.cached(f, lambda: f(self))
+    return inner
+
+
 def parse_date(f):
     """
     Parse date from amazon timestamp.
@@ -57,39 +71,138 @@ def parse_date(f):
     return inner
 
 
+def to_bool(s):
+    """
+    Parse boolean from a non empty string.
+    """
+    return s.lower() == 'true'
+
+
+class ChildField(object):
+    """
+    Descriptor returning the text of a direct child element, ie. `./a:ReportType/text()`.
+
+    The children of the wrapped element are read in a single pass the first time any
+    field is accessed, and every parsed value is cached on the instance.
+    """
+
+    def __init__(self, tag, parser=None, prefix='a'):
+        """
+        :param tag: Local name of the child element.
+        :param parser: Optional function applied to non empty values, ie. `from_amazon_timestamp`.
+        :param prefix: Namespace prefix of the child element in the wrapper namespaces.
+        """
+        self.tag = tag
+        self.parser = parser
+        self.prefix = prefix
+        self.name = tag
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        cache = instance._cache
+        try:
+            return cache[self.name]
+        except KeyError:
+            pass
+        namespace = instance.namespaces.get(self.prefix)
+        children = instance.children()
+        with instrumentation.timer('mws.wrapper.extract', operation=instance.operation_name()):
+            text = children.get('{{{}}}{}'.format(namespace, self.tag) if namespace else self.tag)
+            if text and self.parser is not None:
+                value = self.parser(text)
+            else:
+                value = text or None
+        cache[self.name] = value
+        return value
+
+
 class BaseElementWrapper(object):
 
     namespaces = {}
     # Used to create a dict from the instance attributes specified here.
     attrs = []
     orm_class = None
+    # :class:`Record` subclass returned by `to_record`.
+    record_class = None
+    # MWS operation of a response wrapper, used to label its measurements.
+    operation = None
+
+    # Compiled `etree.XPath` objects shared by every instance of a thread, keyed by (expression, namespaces).
+    _xpath_local = threading.local()
 
     def __init__(self, element):
         """
         :param element: Etree object of response body
         """
-        # Assign placeholder element so that the partial on the elements xpath will not throw an error.
+        # Assign placeholder element so that xpath will not throw an error.
         if element is None:
             element = etree.fromstring('<Empty />')
         self.element = element
+        self._cache = {}
+
+    @property
+    def logger(self):
+        return logging.getLogger(self.__class__.__name__)
 
-        self.xpath = partial(self.element.xpath, namespaces=self.namespaces)
-        self.logger = logging.getLogger(self.__class__.__name__)
+    @classmethod
+    def compile_xpath(cls, expression, namespaces=None):
+        """
+        Return the compiled `etree.XPath` of an expression, compiling it only once.
+        """
+        namespaces = cls.namespaces if namespaces is None else namespaces
+        cache = getattr(cls._xpath_local, 'cache', None)
+        if cache is None:
+            cache = cls._xpath_local.cache = {}
+        key = (expression, tuple(sorted(namespaces.items())))
+        compiled = cache.get(key)
+        if compiled is None:
+            compiled = cache[key] = etree.XPath(expression, namespaces=namespaces)
+        return compiled
+
+    def xpath(self, expression):
+        return self.compile_xpath(expression, self.namespaces)(self.element)
+
+    def children(self):
+        """
+        Text of the direct children of the element keyed by their tag, read in a single pass.
+        The first occurrence of a tag wins.
+        """
+        children = self._cache.get(ChildField)
+        if children is None:
+            children = {}
+            with instrumentation.timer('mws.wrapper.extract', operation=self.operation_name()):
+                for child in self.element:
+                    children.setdefault(child.tag, child.text)
+            self._cache[ChildField] = children
+        return children
+
+    def cached(self, key, f):
+        """
+        Return `f()` computed once per instance.
+        """
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = f()
+            return value
 
     def set_namespace(self, ns_dict):
         """
         Use this method to assign the namespace after the class has been instantiated.
-        Otherwise the xpath method of this class will not update with the new namespace.
         :param ns_dict:
         :return:
         """
         self.namespaces = ns_dict
-        self.xpath = partial(self.element.xpath, namespaces=ns_dict)
+        self._cache.clear()
 
     def to_dict(self):
         d = {}
         for attr in self.attrs:
-            result = self.__getattribute__(attr)
+            result = getattr(self, attr)
             # If attribute is callable, then call the method and store the result
             if callable(result):
                 result = result()
@@ -109,6 +222,12 @@ class BaseElementWrapper(object):
                     d[attr] = result
         return d
 
+    def to_record(self):
+        """
+        Return a compact immutable :class:`Record` holding the parsed fields.
+        """
+        return self.record_class(*[getattr(self, field) for field in self.record_class.fields])
+
     @property
     def __dict__(self):
         return self.to_dict()
@@ -122,51 +241,143 @@ class BaseElementWrapper(object):
             s = '<Empty />'
         return etree.fromstring(s)
 
+    @classmethod
+    def operation_name(cls):
+        """
+        Label of the measurements of the wrapper: its MWS operation, or its class name for entry wrappers.
+        """
+        return cls.operation or cls.__name__
+
     @classmethod
     def load(cls, xml_string):
-        return cls(cls.string_to_element(xml_string))
+        with instrumentation.timer('mws.wrapper.parse', operation=cls.operation_name()):
+            return cls(cls.string_to_element(xml_string))
+
+
+class IterParsedListResponse(object):
+    """
+    Incrementally parse a list response and yield its entries as they are parsed.
+
+    Each entry wrapper has its fields read before the element is cleared and dropped
+    from the tree, so memory stays bounded by one entry whatever the page size.
+    `has_next`, `next_token` and `request_id` are available once iteration is over.
+    """
+
+    namespace = 'http://mws.amazonaws.com/doc/2009-01-01/'
+
+    def __init__(self, source, entry_class, entry_tag):
+        """
+        :param source: xml bytes, or a binary file object such as a streamed response body.
+        :param entry_class: wrapper class of the entries, ie. :class:`ReportInfo`.
+        :param entry_tag: Local name of the entry elements, ie. `ReportInfo`.
+        """
+        if isinstance(source, (bytes, str)):
+            source = io.BytesIO(source.encode() if isinstance(source, str) else source)
+        self.source = source
+        self.entry_class = entry_class
+        self.entry_tag = entry_tag
+        self.has_next = None
+        self.next_token = None
+        self.request_id = None
+
+    def _tag(self, name):
+        return '{{{}}}{}'.format(self.namespace, name)
+
+    def __iter__(self):
+        entry_tag = self._tag(self.entry_tag)
+        tags = [entry_tag, self._tag('HasNext'), self._tag('NextToken'), self._tag('RequestId')]
+        for _, element in etree.iterparse(self.source, events=('end',), tag=tags):
+            if element.tag == entry_tag:
+                entry = self.entry_class(element)
+                # Read the fields now, the element is emptied right after.
+                entry.children()
+                yield entry
+                element.clear()
+                parent = element.getparent()
+                while element.getprevious() is not None:
+                    del parent[0]
+            elif element.tag == tags[1]:
+                self.has_next = to_bool(element.text) if element.text else None
+            elif element.tag == tags[2]:
+                self.next_token = element.text
+            else:
+                self.request_id = element.text
+
+    def records(self):
+        """
+        :return: generator of :class:`Record` instead of element wrappers.
+        """
+        for entry in self:
+            yield entry.to_record()
 
 
 class GetReportRequestListResponse(BaseElementWrapper):
 
     namespaces = {'a': 'http://mws.amazonaws.com/doc/2009-01-01/'}
     attrs = ['request_id', 'has_next', 'next_token', 'report_request_info_list']
+    operation = 'GetReportRequestList'
 
     @property
+    @cached_field
     @first_element
     def request_id(self):
         return self.xpath('//a:RequestId/text()')
 
     @property
+    @cached_field
     @parse_bool
     @first_element
     def has_next(self):
         return self.xpath('//a:HasNext/text()')
 
     @property
+    @cached_field
     @first_element
     def next_token(self):
         return self.xpath('//a:NextToken/text()')
 
     def report_request_info_list(self):
-        return [ReportRequestInfo(x) for x in self.xpath('//a:ReportRequestInfo')]
+        return self.cached('report_request_info_list', lambda: [
+            ReportRequestInfo(x) for x in self.xpath('//a:ReportRequestInfo')
+        ])
+
+    @classmethod
+    def iterparse(cls, source):
+        """
+        :param source: xml bytes or binary file object
+        :return: :class:`IterParsedListResponse` of :class:`ReportRequestInfo`
+        """
+        return IterParsedListResponse(source, ReportRequestInfo, 'ReportRequestInfo')
+
+    @classmethod
+    def load_records(cls, source):
+        """
+        Parse every entry of a response straight to :class:`ReportRequestInfoRecord`.
+
+        :param source: xml bytes or binary file object
+        :return: list of :class:`ReportRequestInfoRecord`
+        """
+        return list(cls.iterparse(source).records())
 
 
 class RequestReportResponse(BaseElementWrapper):
 
     namespaces = {'a': 'http://mws.amazonaws.com/doc/2009-01-01/'}
     attrs = ['request_report_result', 'request_id']
+    operation = 'RequestReport'
 
     @property
     def request_report_result(self):
-        return ReportRequestInfo(self._request_report_result)
+        return self.cached('request_report_result', lambda: ReportRequestInfo(self._request_report_result))
 
     @property
+    @cached_field
     @first_element
     def _request_report_result(self):
         return self.xpath('./a:RequestReportResult/a:ReportRequestInfo')
 
     @property
+    @cached_field
     @first_element
     def request_id(self):
         return self.xpath('//a:RequestId/text()')
@@ -187,62 +398,18 @@ class ReportRequestInfo(BaseElementWrapper):
         'completed_date',
         'started_processing_date'
     ]
+    record_class = ReportRequestInfoRecord
 
-    @property
-    @first_element
-    def report_request_id(self):
-        return self.xpath('./a:ReportRequestId/text()')
-
-    @property
-    @first_element
-    def report_type(self):
-        return self.xpath('./a:ReportType/text()')
-
-    @property
-    @parse_date
-    @first_element
-    def start_date(self):
-        return self.xpath('./a:StartDate/text()')
-
-    @property
-    @parse_date
-    @first_element
-    def end_date(self):
-        return self.xpath('./a:EndDate/text()')
-
-    @property
-    @parse_bool
-    @first_element
-    def scheduled(self):
-        return self.xpath('./a:Scheduled/text()')
-
-    @property
-    @parse_date
-    @first_element
-    def submitted_date(self):
-        return self.xpath('./a:SubmittedDate/text()')
-
-    @property
-    @first_element
-    def report_processing_status(self):
-        return self.xpath('./a:ReportProcessingStatus/text()')
-
-    @property
-    @first_element
-    def generated_report_id(self):
-        return self.xpath('./a:GeneratedReportId/text()')
-
-    @property
-    @parse_date
-    @first_element
-    def completed_date(self):
-        return self.xpath('./a:CompletedDate/text()')
-
-    @property
-    @parse_date
-    @first_element
-    def started_processing_date(self):
-        return self.xpath('./a:StartedProcessingDate/text()')
+    report_request_id = ChildField('ReportRequestId')
+    report_type = ChildField('ReportType')
+    start_date = ChildField('StartDate', from_amazon_timestamp)
+    end_date = ChildField('EndDate', from_amazon_timestamp)
+    scheduled = ChildField('Scheduled', to_bool)
+    submitted_date = ChildField('SubmittedDate', from_amazon_timestamp)
+    report_processing_status = ChildField('ReportProcessingStatus')
+    generated_report_id = ChildField('GeneratedReportId')
+    completed_date = ChildField('CompletedDate', from_amazon_timestamp)
+    started_processing_date = ChildField('StartedProcessingDate', from_amazon_timestamp)
 
 
 class ReportInfo(BaseElementWrapper):
@@ -259,39 +426,14 @@ class ReportInfo(BaseElementWrapper):
         'report_request_id',
         'available_date'
     }
+    record_class = ReportInfoRecord
 
-    @property
-    @first_element
-    def report_type(self):
-        return self.xpath('./a:ReportType/text()')
-
-    @property
-    @parse_bool
-    @first_element
-    def acknowledged(self):
-        return self.xpath('./a:Acknowledged/text()')
-
-    @property
-    @parse_date
-    @first_element
-    def acknowledged_date(self):
-        return self.xpath('./a:AcknowledgedDate/text()')
-
-    @property
-    @first_element
-    def report_id(self):
-        return self.xpath('./a:ReportId/text()')
-
-    @property
-    @first_element
-    def report_request_id(self):
-        return self.xpath('./a:ReportRequestId/text()')
-
-    @property
-    @parse_date
-    @first_element
-    def available_date(self):
-        return self.xpath('./a:AvailableDate/text()')
+    report_type = ChildField('ReportType')
+    acknowledged = ChildField('Acknowledged', to_bool)
+    acknowledged_date = ChildField('AcknowledgedDate', from_amazon_timestamp)
+    report_id = ChildField('ReportId')
+    report_request_id = ChildField('ReportRequestId')
+    available_date = ChildField('AvailableDate', from_amazon_timestamp)
 
     def __repr__(self):
         return '<{} report_type={} report_id={} available_date={}>'.format(
@@ -307,6 +449,7 @@ class GetReportListResponse(BaseElementWrapper):
     namespaces = {
         'a': 'http://mws.amazonaws.com/doc/2009-01-01/'
     }
+    operation = 'GetReportList'
 
     attrs = {
         'has_next',
@@ -316,23 +459,46 @@ class GetReportListResponse(BaseElementWrapper):
     }
 
     @property
+    @cached_field
     @parse_bool
     @first_element
     def has_next(self):
         return self.xpath('./a:GetReportListResult/a:HasNext/text()')
 
     @property
+    @cached_field
     @first_element
     def next_token(self):
         return self.xpath('./a:GetReportListResult/a:NextToken/text()')
 
     @property
+    @cached_field
     @first_element
     def request_id(self):
         return self.xpath('./a:ResponseMetadata/a:RequestId/text()')
 
     def report_info_list(self):
-        return [ReportInfo(x) for x in self.xpath('./a:GetReportListResult//a:ReportInfo')]
+        return self.cached('report_info_list', lambda: [
+            ReportInfo(x) for x in self.xpath('./a:GetReportListResult//a:ReportInfo')
+        ])
+
+    @classmethod
+    def iterparse(cls, source):
+        """
+        :param source: xml bytes or binary file object
+        :return: :class:`IterParsedListResponse` of :class:`ReportInfo`
+        """
+        return IterParsedListResponse(source, ReportInfo, 'ReportInfo')
+
+    @classmethod
+    def load_records(cls, source):
+        """
+        Parse every entry of a response straight to :class:`ReportInfoRecord`.
+
+        :param source: xml bytes or binary file object
+        :return: list of :class:`ReportInfoRecord`
+        """
+        return list(cls.iterparse(source).records())
 
     def __repr__(self):
         return '<{} has_next={} report_info_list={}>'.format(
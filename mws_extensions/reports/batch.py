@@ -0,0 +1,180 @@
+import time
+from functools import partial
+
+from .helpers import AdvancedReports
+from .jobs import ReportJob, POLLED, DOWNLOADED, GENERATED, FAILED, FINAL_STAGES
+from .polling import StatusPoller
+from .exceptions import ReportFailedError, ReportTimeoutError
+
+
+class BatchReports(AdvancedReports):
+    """
+    Request, wait for and download many reports at once.
+
+    Every `RequestReport` call is sent up front, then the outstanding requests are
+    polled together through a :class:`StatusPoller` and each report is downloaded as soon as it is `_DONE_`, so the
+    total time is bounded by the slowest report instead of the sum of all of them.
+    """
+
+    def __init__(self, jobs=(), **kwargs):
+        """
+        :param jobs: iterable of :class:`ReportJob`
+
+        Each job gets its own timer from the instance :class:`PollSchedule`, so short
+        reports are checked often while long ones are not abandoned early.
+        With a `journal`, jobs found in it resume from their last recorded stage.
+        With `notifications`, each report is checked as soon as its notification arrives.
+        """
+        super().__init__(report_type=None, **kwargs)
+        self.jobs = list(jobs)
+
+    @classmethod
+    def resume(cls, journal, **kwargs):
+        """
+        Batch of the unfinished jobs of a journal, ie. after a crash or to recover stuck jobs.
+
+        :param journal: :class:`JobJournal`
+        """
+        return cls(jobs=journal.pending(), journal=journal, **kwargs)
+
+    def add_job(self, report_type, start_date=None, end_date=None, marketplaceids=(), dest=None, compression=None,
+                job_id=None):
+        job = ReportJob(report_type, start_date, end_date, marketplaceids, dest, compression, job_id)
+        self.jobs.append(job)
+        return job
+
+    def update(self, job, info):
+        """
+        Update a job from its `ReportRequestInfo` and download the report if it is done.
+
+        :param job: :class:`ReportJob`
+        :param info: :class:`ReportRequestInfo`
+        :return: True if the job is finished.
+        """
+        status, job.status = job.status, info.report_processing_status
+        self.logger.debug('report_request_id={} report_processing_status={}'.format(job.report_request_id, job.status))
+        # Completed date is `None` if report isn't finished processing, otherwise it's a datetime object
+        if not info.completed_date:
+            if job.status != status:
+                self._record(job, POLLED)
+            return False
+
+        if job.status != '_DONE_':
+            job.error = ReportFailedError(job.report_request_id, job.status)
+            self._record(job, FAILED)
+            return True
+
+        self._report_finished(info)
+        self._safe_download(job, info)
+        return True
+
+    def _safe_download(self, job, info=None, download=None):
+        """
+        Download a job like :meth:`_download`, recording it as failed instead of raising,
+        so that an error doesn't abort the rest of the batch.
+
+        :param download: Function downloading the job, defaults to :meth:`_download`.
+        :return: The result of `download`, True if it failed.
+        """
+        try:
+            return (download or self._download)(job, info)
+        except Exception as e:
+            if job.downloaded:
+                # Only the acknowledgement failed, the journal keeps the job downloaded.
+                self.logger.warning('acknowledging report_request_id={} failed: {!r}'.format(job.report_request_id, e))
+                return True
+            self.logger.warning('downloading report_request_id={} failed: {!r}'.format(job.report_request_id, e))
+            job.error = e
+            self._record(job, FAILED)
+            return True
+
+    def _update_jobs(self, jobs, info):
+        """
+        :meth:`update` every job waiting for the same report request.
+
+        :return: True once they are all finished.
+        """
+        return all([self.update(job, info) for job in jobs])
+
+    def iter_completed(self):
+        """
+        Request every job and yield them as they finish, either downloaded or failed.
+
+        :return: generator of :class:`ReportJob`
+        """
+        # Jobs waiting for each report request, several jobs may share one, ie. when resumed from a journal.
+        pending = {}
+        timers = {}
+        next_poll = {}
+        poller = StatusPoller(self)
+        infos = None
+        for job in self.jobs:
+            if self.journal is not None and not job.done:
+                self.journal.restore(job)
+                if job.stage in FINAL_STAGES:
+                    # Finished by a previous run, a new run asks for a new report.
+                    job.reset()
+            if job.done:
+                if job.stage == DOWNLOADED:
+                    self._acknowledge(job)
+                continue
+            if job.stage == GENERATED and job.generated_report_id:
+                self._safe_download(job)
+                yield job
+                continue
+            if job.report_request_id is None:
+                if infos is None and self.cache is not None:
+                    # A single listing of the reusable reports for the whole batch
+                    infos = self.done_report_requests(x.report_type for x in self.jobs
+                                                      if x.report_request_id is None and x.start_date and x.end_date)
+                if self._safe_download(job, infos, self.load_cached):
+                    yield job
+                    continue
+                self.submit(job)
+            if job.report_request_id in pending:
+                pending[job.report_request_id].append(job)
+                continue
+            pending[job.report_request_id] = [job]
+            timer = timers[job.report_request_id] = self.schedule.timer(job.report_type)
+            next_poll[job.report_request_id] = time.monotonic()
+            if self.notifications is not None:
+                # The report can't be done yet, wait for its notification before the first check.
+                next_poll[job.report_request_id] += timer.next_delay() or 0
+            poller.register(job.report_request_id, partial(self._update_jobs, pending[job.report_request_id]))
+
+        while pending:
+            now = time.monotonic()
+            due = [report_request_id for report_request_id in pending if next_poll[report_request_id] <= now]
+            for report_request_id in poller.poll(due):
+                for job in pending.pop(report_request_id):
+                    yield job
+
+            for report_request_id in due:
+                if report_request_id not in pending:
+                    continue
+                delay = timers[report_request_id].next_delay()
+                if delay is None:
+                    poller.unregister(report_request_id)
+                    # Still processing on Amazon's side, the journal keeps the jobs at their last stage
+                    # so that the next run resumes polling their report request.
+                    for job in pending.pop(report_request_id):
+                        job.error = ReportTimeoutError(report_request_id, job.status)
+                        yield job
+                else:
+                    next_poll[report_request_id] = now + delay
+
+            if pending:
+                # Wait a bit for the report statuses to change, checking the notified ones right away
+                delay = max(min(next_poll[x] for x in pending) - time.monotonic(), 0)
+                for report_request_id in self._sleep(list(pending), delay):
+                    next_poll[report_request_id] = 0
+
+    def run(self):
+        """
+        Request, wait for and download every job.
+
+        :return: list of :class:`ReportJob`
+        """
+        for _ in self.iter_completed():
+            pass
+        return self.jobs
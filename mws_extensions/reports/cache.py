@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import datetime
+import tempfile
+import threading
+import contextlib
+
+from .utils import to_amazon_timestamp
+from .streams import open_sink
+
+
+class CacheEntry(object):
+
+    def __init__(self, key, path, size, created, metadata, encoding=None):
+        self.key = key
+        self.path = path
+        self.size = size
+        self.created = created
+        self.metadata = metadata
+        self.encoding = encoding
+
+    def open(self, mode='rb', **kwargs):
+        return open(self.path, mode, **kwargs)
+
+    def read_text(self, encoding=None):
+        """
+        :param encoding: Defaults to the encoding of the response the report was downloaded from, or utf-8.
+        """
+        encoding = encoding or self.encoding or 'utf-8'
+        with self.open('r', encoding=encoding, errors='replace', newline='') as fp:
+            return fp.read()
+
+    def __repr__(self):
+        return '<{} key={} size={} created={}>'.format(self.__class__.__name__, self.key, self.size, self.created)
+
+
+class ReportCache(object):
+    """
+    On-disk content addressed cache of downloaded reports.
+
+    Report bodies are stored once per sha256 digest under `objects/`, and an sqlite
+    index maps each (report type, marketplaces, date range) key to a body and its
+    metadata. Entries expire after `ttl` seconds and the least recently used ones are
+    evicted once the bodies exceed `max_size` bytes. The cache can be shared by
+    several processes.
+    """
+
+    def __init__(self, directory, ttl=24 * 60 * 60, max_size=10 * 1024 ** 3):
+        """
+        :param directory: Cache directory, created if needed.
+        :param ttl: Seconds during which a cached report is reused.
+        :param max_size: Maximum total size of the cached bodies in bytes.
+        """
+        self.directory = directory
+        self.objects = os.path.join(directory, 'objects')
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        os.makedirs(self.objects, exist_ok=True)
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS entries ('
+                       'key TEXT PRIMARY KEY, digest TEXT, size INTEGER, created REAL, accessed REAL, metadata TEXT)')
+            db.execute('CREATE TABLE IF NOT EXISTS requests (report_request_id TEXT PRIMARY KEY, key TEXT)')
+            columns = [row[1] for row in db.execute('PRAGMA table_info(entries)')]
+            if 'encoding' not in columns:
+                # Added after the first release, older entries are decoded as utf-8.
+                db.execute('ALTER TABLE entries ADD COLUMN encoding TEXT')
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(os.path.join(self.directory, 'index.sqlite'), timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def _normalize(value):
+        if isinstance(value, datetime.datetime):
+            return to_amazon_timestamp(value)
+        return value
+
+    def key(self, report_type, start_date=None, end_date=None, marketplaceids=()):
+        """
+        Key identifying a report by its request parameters.
+        """
+        parameters = [
+            report_type,
+            self._normalize(start_date),
+            self._normalize(end_date),
+            sorted(marketplaceids or ()),
+        ]
+        return hashlib.sha256(json.dumps(parameters).encode()).hexdigest()
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects, digest)
+
+    def get(self, key):
+        """
+        :return: :class:`CacheEntry` or None if the report isn't cached or has expired.
+        """
+        now = time.time()
+        with self._lock, self._connect() as db:
+            row = db.execute('SELECT digest, size, created, metadata, encoding FROM entries WHERE key = ?',
+                             (key,)).fetchone()
+            if row is None:
+                return None
+            digest, size, created, metadata, encoding = row
+            if created + self.ttl < now or not os.path.exists(self._object_path(digest)):
+                db.execute('DELETE FROM entries WHERE key = ?', (key,))
+                return None
+            db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+        return CacheEntry(key, self._object_path(digest), size, created, json.loads(metadata), encoding)
+
+    def put(self, key, chunks, metadata=None, encoding=None):
+        """
+        Store a report body.
+
+        :param key:
+        :param chunks: iterable of bytes, ie. `AdvancedReports.iter_download(...)`
+        :param metadata: json serializable dict, ie. `ReportRequestInfoRecord.to_dict()`
+        :param encoding: Encoding of the report, ie. the `encoding` of the GetReport response.
+        :return: :class:`CacheEntry`
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    fp.write(chunk)
+            os.replace(tmp_path, self._object_path(digest.hexdigest()))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        now = time.time()
+        metadata = json.dumps(metadata or {}, default=str)
+        with self._lock, self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO entries (key, digest, size, created, accessed, metadata, encoding) '
+                       'VALUES (?, ?, ?, ?, ?, ?, ?)', (key, digest.hexdigest(), size, now, now, metadata, encoding))
+        self.evict()
+        return CacheEntry(key, self._object_path(digest.hexdigest()), size, now, json.loads(metadata), encoding)
+
+    def remember_request(self, report_request_id, key):
+        """
+        Remember the parameters of a report request, so that the generated report can be
+        matched later on even though Amazon doesn't return the marketplaces of a request.
+        """
+        with self._lock, self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO requests VALUES (?, ?)', (report_request_id, key))
+
+    def request_key(self, report_request_id):
+        with self._lock, self._connect() as db:
+            row = db.execute('SELECT key FROM requests WHERE report_request_id = ?', (report_request_id,)).fetchone()
+        return row[0] if row else None
+
+    def evict(self):
+        """
+        Drop expired entries, then the least recently used ones until the bodies fit in `max_size`.
+        """
+        with self._lock, self._connect() as db:
+            db.execute('DELETE FROM entries WHERE created < ?', (time.time() - self.ttl,))
+            rows = db.execute('SELECT key, digest, size FROM entries ORDER BY accessed DESC').fetchall()
+            kept, total = set(), 0
+            for key, digest, size in rows:
+                if digest in kept:
+                    continue
+                if total + size > self.max_size:
+                    db.execute('DELETE FROM entries WHERE digest = ?', (digest,))
+                    continue
+                kept.add(digest)
+                total += size
+
+        for name in os.listdir(self.objects):
+            if name.startswith('.tmp-') or name in kept:
+                continue
+            path = self._object_path(name)
+            try:
+                # Leave recent bodies alone, another process may be about to index them.
+                if time.time() - os.path.getmtime(path) > 60:
+                    os.unlink(path)
+            except OSError:
+                pass
+
+    def copy_to(self, entry, dest, compression=None):
+        """
+        Copy a cached report to a file path or file object.
+
+        :return: Number of bytes copied.
+        """
+        with entry.open() as src, open_sink(dest, compression) as sink:
+            shutil.copyfileobj(src, sink)
+        return entry.size
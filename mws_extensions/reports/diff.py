@@ -0,0 +1,226 @@
+import os
+import mmap
+import heapq
+import bisect
+import shutil
+import struct
+import hashlib
+import tempfile
+import contextlib
+
+INSERTED = 'inserted'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+_MAGIC = b'MWSDIFF1'
+_HEADER = struct.Struct('=8sQ')
+_UINT64 = struct.Struct('=Q')
+# key hash, row hash, key offset, key length of a row of the new snapshot, while it is sorted
+_RECORD = struct.Struct('=QQQQ')
+_SEPARATOR = '\x1f'
+
+
+def _hash(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+class _Index(object):
+    """
+    Read only view of an index file, memory mapped.
+
+    Layout, in native byte order: header (magic, count), `count` sorted key hashes,
+    `count` row hashes, `count + 1` key offsets, then the keys.
+    """
+
+    def __init__(self, path):
+        self.fp = open(path, 'rb')
+        self.mmap = mmap.mmap(self.fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = _HEADER.unpack_from(self.mmap)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError('{} is not a snapshot index'.format(path))
+        view = memoryview(self.mmap)
+        start, n = _HEADER.size, self.count * 8
+        self.key_hashes = view[start:start + n].cast('Q')
+        self.row_hashes = view[start + n:start + 2 * n].cast('Q')
+        self.offsets = view[start + 2 * n:start + 3 * n + 8].cast('Q')
+        self.keys_start = start + 3 * n + 8
+
+    def key(self, position):
+        return self.mmap[self.keys_start + self.offsets[position]:self.keys_start + self.offsets[position + 1]]
+
+    def find(self, key_hash, key):
+        """
+        :return: Position of the key, or -1.
+        """
+        position = bisect.bisect_left(self.key_hashes, key_hash)
+        while position < self.count and self.key_hashes[position] == key_hash:
+            if self.key(position) == key:
+                return position
+            position += 1
+        return -1
+
+    def close(self):
+        for name in ('key_hashes', 'row_hashes', 'offsets'):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self.mmap.close()
+        self.fp.close()
+
+
+class SnapshotDiff(object):
+    """
+    Compare each snapshot of a report with the previous one, and only yield the rows that changed.
+
+    The previous snapshot is kept as a compact index file of 64 bit key hash -> 64 bit row hash,
+    plus the keys themselves, memory mapped while diffing. The hashes of the new snapshot are
+    sorted on disk by runs of `run_size` rows, so memory usage is bounded by one run (about
+    20 MB by default) plus one byte per row of the previous snapshot, whatever their size.
+    The new index is swapped in once a diff is fully consumed.
+
+        diff = SnapshotDiff('/var/lib/listings.idx', key='seller-sku')
+        for change, row in reports.iter_report_changes(generated_report_id, diff):
+            ...
+    """
+
+    def __init__(self, path, key, columns=None, run_size=100000):
+        """
+        :param path: Index file, missing before the first snapshot.
+        :param key: Column name or tuple of column names identifying a row, unique in a snapshot.
+        :param columns: Columns compared between snapshots, defaults to all of them.
+            Use it to ignore columns changing on every snapshot, ie. a timestamp.
+        :param run_size: Number of rows of the new snapshot sorted in memory at once.
+        """
+        self.path = path
+        self.key = (key,) if isinstance(key, str) else tuple(key)
+        self.columns = tuple(columns) if columns is not None else None
+        self.run_size = run_size
+
+    def _row_key(self, row):
+        return _SEPARATOR.join(str(row[column]) for column in self.key).encode('utf-8')
+
+    def _row_hash(self, row):
+        values = row.values() if self.columns is None else (row.get(column) for column in self.columns)
+        return _hash(_SEPARATOR.join(map(str, values)).encode('utf-8'))
+
+    def _deleted_row(self, key):
+        return dict(zip(self.key, key.decode('utf-8').split(_SEPARATOR)))
+
+    @contextlib.contextmanager
+    def _previous(self):
+        index = _Index(self.path) if os.path.exists(self.path) else None
+        try:
+            yield index
+        finally:
+            if index is not None:
+                index.close()
+
+    def diff(self, rows):
+        """
+        Yield the changes between the previous snapshot and `rows`.
+
+        Deleted rows only hold their key columns, as strings. The index is replaced by the
+        one of `rows` once the generator is exhausted; a diff stopped early leaves it untouched.
+
+        :param rows: iterable of dict, ie. :meth:`FlatFileParser.iter_rows`.
+        :return: generator of (`INSERTED`, `UPDATED` or `DELETED`, row)
+        """
+        runs = []
+        run = []
+        count = key_offset = 0
+        with tempfile.TemporaryFile() as keys:
+            try:
+                with self._previous() as previous:
+                    seen = bytearray(previous.count if previous is not None else 0)
+                    for row in rows:
+                        key = self._row_key(row)
+                        key_hash, row_hash = _hash(key), self._row_hash(row)
+                        keys.write(key)
+                        run.append((key_hash, row_hash, key_offset, len(key)))
+                        key_offset += len(key)
+                        count += 1
+                        if len(run) >= self.run_size:
+                            runs.append(self._spill(run))
+                            run = []
+
+                        position = previous.find(key_hash, key) if previous is not None else -1
+                        if position < 0:
+                            yield INSERTED, row
+                            continue
+                        seen[position] = 1
+                        if previous.row_hashes[position] != row_hash:
+                            yield UPDATED, row
+
+                    if previous is not None:
+                        position = seen.find(0)
+                        while position >= 0:
+                            yield DELETED, self._deleted_row(previous.key(position))
+                            position = seen.find(0, position + 1)
+
+                # The previous index is closed before being replaced, a mapped file can't be on Windows.
+                run.sort()
+                self._write(count, heapq.merge(*[self._iter_run(fp) for fp in runs], run), keys)
+            finally:
+                for fp in runs:
+                    fp.close()
+
+    @staticmethod
+    def _spill(run):
+        run.sort()
+        fp = tempfile.TemporaryFile()
+        for record in run:
+            fp.write(_RECORD.pack(*record))
+        return fp
+
+    @staticmethod
+    def _iter_run(fp, chunk_size=4096):
+        fp.seek(0)
+        while True:
+            chunk = fp.read(_RECORD.size * chunk_size)
+            if not chunk:
+                break
+            for record in _RECORD.iter_unpack(chunk):
+                yield record
+
+    def _write(self, count, records, keys):
+        """
+        Write the index of the new snapshot next to the previous one, then swap it in.
+
+        :param count: Number of rows.
+        :param records: iterable of (key hash, row hash, key offset, key length), sorted.
+        :param keys: Temporary file of the keys.
+        """
+        keys.flush()
+        blob = mmap.mmap(keys.fileno(), 0, access=mmap.ACCESS_READ) if keys.tell() else b''
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+        try:
+            with os.fdopen(fd, 'wb') as fp, tempfile.TemporaryFile() as row_hashes, \
+                    tempfile.TemporaryFile() as offsets, tempfile.TemporaryFile() as sorted_keys:
+                fp.write(_HEADER.pack(_MAGIC, count))
+                position = 0
+                offsets.write(_UINT64.pack(position))
+                for key_hash, row_hash, key_offset, length in records:
+                    fp.write(_UINT64.pack(key_hash))
+                    row_hashes.write(_UINT64.pack(row_hash))
+                    position += length
+                    offsets.write(_UINT64.pack(position))
+                    sorted_keys.write(blob[key_offset:key_offset + length])
+                for section in (row_hashes, offsets, sorted_keys):
+                    section.seek(0)
+                    shutil.copyfileobj(section, fp)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        finally:
+            if blob:
+                blob.close()
+
+    def reset(self):
+        """
+        Forget the previous snapshot, so that every row of the next one is inserted.
+        """
+        if os.path.exists(self.path):
+            os.unlink(self.path)
@@ -5,3 +5,16 @@ class ReportFailedError(ValueError):
         self.report_request_id = report_request_id
         self.message = 'GetReportRequestList for report_request_id={} returned {}'.format(self.report_request_id, self.status)
         super(ReportFailedError, self).__init__(self.message, *args)
+
+
+class ReportTimeoutError(ReportFailedError):
+    """
+    Raised when the poll schedule gives up on a report that is still not finished.
+
+    Amazon may still generate it: a journaled job keeps its report request and resumes polling it.
+    """
+
+    def __init__(self, report_request_id, status, *args):
+        super(ReportTimeoutError, self).__init__(report_request_id, status, *args)
+        self.message = 'report_request_id={} still {} when polling gave up'.format(self.report_request_id, self.status)
+        self.args = (self.message,) + args
@@ -1,27 +1,58 @@
 import time
+import base64
+import hashlib
 import logging
 import datetime
 
-from mws.mws import Reports
+from mws import utils
+from mws.mws import MWSError, Reports
 
+from ..client import MWSClientMixin
+from ..metrics import instrumentation
+from ..pagination import Paginator
 from .utils import to_amazon_timestamp
-from .base import RequestReportResponse, GetReportRequestListResponse
-from .exceptions import ReportFailedError
+from .base import RequestReportResponse, GetReportRequestListResponse, GetReportListResponse
+from .schedule import BackoffSchedule, FixedSchedule
+from .streams import open_sink, iter_lines
+from .parsers import FlatFileParser
+from .exceptions import ReportFailedError, ReportTimeoutError
+from .jobs import ReportJob, REQUESTED, GENERATED, DOWNLOADED, ACKNOWLEDGED, FAILED, FINAL_STAGES
 
-logging.basicConfig(format='%(levelname)s:%(message)s', level=logging.DEBUG)
 
-
-class AdvancedReports(Reports):
+class AdvancedReports(MWSClientMixin, Reports):
     """
     Advanced Reports class that allows to request_and_download report
     with a single function call.
-    TODO: add back session support
+    Requests are sent through a keep-alive :class:`SessionPool`, see the `session_pool` argument.
     """
 
-    def __init__(self, report_type, max_retries=5, **kwargs):
+    def __init__(self, report_type, max_retries=None, schedule=None, cache=None, journal=None, notifications=None,
+                 **kwargs):
+        """
+        :param report_type:
+        :param max_retries: Legacy fixed polling, check every 30 seconds at most `max_retries` times.
+        :param schedule: :class:`PollSchedule` deciding how long to wait between status checks.
+            Defaults to :class:`BackoffSchedule`.
+        :param cache: Optional :class:`ReportCache` used by `request_and_download`.
+        :param journal: Optional :class:`JobJournal` recording the progress of `request_and_download`,
+            so that a restarted process resumes it instead of requesting the report again.
+        :param notifications: Optional :class:`NotificationListener` waking the poll loops when a report
+            is finished. The default schedule then polls every `fallback_interval` seconds only.
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.report_type = report_type
         self.max_retries = max_retries
+        if schedule is None and max_retries is not None:
+            schedule = FixedSchedule(30, max_retries)
+        elif schedule is None and notifications is not None:
+            interval = notifications.fallback_interval
+            schedule = BackoffSchedule(initial=interval, max_interval=interval)
+        elif schedule is None:
+            schedule = BackoffSchedule()
+        self.schedule = schedule
+        self.cache = cache
+        self.journal = journal
+        self.notifications = notifications
         super().__init__(**kwargs)
 
     def update_report_acknowledgements(self, report_ids=(), acknowledged=False):
@@ -29,24 +60,35 @@ class AdvancedReports(Reports):
         data.update(self.enumerate_param('ReportIdList.Id.', report_ids))
         return self.make_request(data)
 
-    def _request(self, start_date=None, end_date=None, marketplaceids=()):
+    def _request(self, start_date=None, end_date=None, marketplaceids=(), report_type=None):
         """
         Send request to amazon to request new report for instances report type.
 
         :param start_date: Begin date range of records to include in the report.
         :param end_date: End date range of records to include in the report.
         :param marketplaceids:
+        :param report_type: Report type to request, defaults to the instance report type.
         :return:
         """
-        start_date = to_amazon_timestamp(start_date or (datetime.datetime.now() - datetime.timedelta(days=30)))
-        end_date = to_amazon_timestamp(end_date or datetime.datetime.now())
-        self.logger.debug('requesting {} between {} and {}'.format(self.report_type, start_date, end_date))
-        parsed_response = self.request_report(self.report_type, start_date, end_date, marketplaceids)
+        report_type = report_type or self.report_type
+        start_date, end_date = map(to_amazon_timestamp, self.resolve_dates(start_date, end_date))
+        self.logger.debug('requesting {} between {} and {}'.format(report_type, start_date, end_date))
+        parsed_response = self.request_report(report_type, start_date, end_date, marketplaceids)
         parsed_response.response.raise_for_status()
         return parsed_response.response.text
 
-    def request(self, start_date=None, end_date=None, marketplaceids=()):
-        return RequestReportResponse.load(self._request(start_date, end_date, marketplaceids))
+    @staticmethod
+    def resolve_dates(start_date=None, end_date=None):
+        """
+        Date range of a report request, the last 30 days by default.
+
+        :return: (start_date, end_date)
+        """
+        now = datetime.datetime.now()
+        return start_date or now - datetime.timedelta(days=30), end_date or now
+
+    def request(self, start_date=None, end_date=None, marketplaceids=(), report_type=None):
+        return RequestReportResponse.load(self._request(start_date, end_date, marketplaceids, report_type))
 
     def _get_report_status(self, report_request_id):
         self.logger.debug('getting report request list for request id {}'.format(report_request_id))
@@ -58,11 +100,177 @@ class AdvancedReports(Reports):
         doc = self._get_report_status(report_request_id)
         return GetReportRequestListResponse.load(doc)
 
+    def _fetch_list_page(self, response_class, data):
+        response = self.stream_request(data, method="POST" if 'NextToken' in data else "GET")
+        try:
+            page = response_class.iterparse(response.content)
+            entries = list(page)
+        finally:
+            response.close()
+        return entries, page.next_token if page.has_next else None
+
+    def _iter_list(self, response_class, data, prefetch=0):
+        """
+        Yield the entries of every page of a list operation.
+
+        Pages are streamed and parsed incrementally, or with `prefetch` > 0 fetched
+        that many pages ahead on a background thread, see :class:`Paginator`.
+        """
+        action = data['Action']
+        if prefetch:
+            return iter(Paginator(
+                lambda: self._fetch_list_page(response_class, data),
+                lambda token: self._fetch_list_page(
+                    response_class, dict(Action='{}ByNextToken'.format(action), NextToken=token)),
+                prefetch=prefetch,
+            ))
+        return self._iter_streamed_list(response_class, data)
+
+    def _iter_streamed_list(self, response_class, data):
+        action = data['Action']
+        while True:
+            response = self.stream_request(data, method="POST" if 'NextToken' in data else "GET")
+            response.raw.decode_content = True
+            try:
+                page = response_class.iterparse(response.raw)
+                for entry in page:
+                    yield entry
+            finally:
+                response.close()
+            if not (page.has_next and page.next_token):
+                break
+            data = dict(Action='{}ByNextToken'.format(action), NextToken=page.next_token)
+
+    def iter_report_list(self, requestids=(), max_count=None, types=(), acknowledged=None,
+                         fromdate=None, todate=None, prefetch=0):
+        """
+        Yield the `ReportInfo` of every GetReportList page, parsing the responses incrementally.
+
+        :param prefetch: Number of pages fetched ahead in the background instead of streaming.
+
+        :return: generator of :class:`ReportInfo`
+        """
+        data = dict(Action='GetReportList',
+                    Acknowledged=acknowledged,
+                    AvailableFromDate=fromdate,
+                    AvailableToDate=todate,
+                    MaxCount=max_count)
+        data.update(utils.enumerate_param('ReportRequestIdList.Id.', requestids))
+        data.update(utils.enumerate_param('ReportTypeList.Type.', types))
+        return self._iter_list(GetReportListResponse, data, prefetch)
+
+    def iter_report_request_list(self, requestids=(), types=(), processingstatuses=(),
+                                 max_count=None, fromdate=None, todate=None, prefetch=0):
+        """
+        Yield the `ReportRequestInfo` of every GetReportRequestList page, parsing the responses incrementally.
+
+        :param prefetch: Number of pages fetched ahead in the background instead of streaming.
+
+        :return: generator of :class:`ReportRequestInfo`
+        """
+        data = dict(Action='GetReportRequestList',
+                    MaxCount=max_count,
+                    RequestedFromDate=fromdate,
+                    RequestedToDate=todate)
+        data.update(utils.enumerate_param('ReportRequestIdList.Id.', requestids))
+        data.update(utils.enumerate_param('ReportTypeList.Type.', types))
+        data.update(utils.enumerate_param('ReportProcessingStatusList.Status.', processingstatuses))
+        return self._iter_list(GetReportRequestListResponse, data, prefetch)
+
     def download(self, generated_report_id):
         self.logger.debug('downloading report for report id {}'.format(generated_report_id))
         parsed_response = self.get_report(generated_report_id)
         return parsed_response.response.text
 
+    def iter_download(self, generated_report_id, chunk_size=1024 * 1024):
+        """
+        Stream the report contents as raw byte chunks, checking the Content-MD5 sent by Amazon.
+
+        :param generated_report_id:
+        :param chunk_size: Size of the chunks in bytes.
+        :return: generator of bytes
+        """
+        self.logger.debug('streaming report for report id {}'.format(generated_report_id))
+        response = self.stream_request(dict(Action='GetReport', ReportId=generated_report_id))
+        for chunk in self._iter_content(response, chunk_size):
+            yield chunk
+
+    @staticmethod
+    def _iter_content(response, chunk_size=1024 * 1024):
+        """
+        Read a streamed GetReport response, checking the Content-MD5 sent by Amazon, then close it.
+        """
+        md5_hash = hashlib.md5()
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                md5_hash.update(chunk)
+                yield chunk
+        finally:
+            response.close()
+
+        expected = response.headers.get('content-md5')
+        if expected and expected.encode() != base64.b64encode(md5_hash.digest()):
+            raise MWSError("Wrong Contentlength, maybe amazon error...")
+
+    def iter_download_lines(self, generated_report_id, encoding='utf-8', chunk_size=1024 * 1024):
+        """
+        Stream the report contents as decoded lines without their line terminator.
+
+        :param generated_report_id:
+        :param encoding: Report encoding, ie. `cp1252` for most flat file reports of the EU marketplaces.
+        :param chunk_size:
+        :return: generator of str
+        """
+        return iter_lines(self.iter_download(generated_report_id, chunk_size), encoding)
+
+    def iter_report_rows(self, generated_report_id, schema=None, encoding='utf-8'):
+        """
+        Stream the report as typed rows, see :class:`FlatFileParser`.
+
+        :param generated_report_id:
+        :param schema: dict of column name: converter, defaults to the schema of the instance report type.
+        :param encoding:
+        :return: generator of dict
+        """
+        parser = FlatFileParser(schema, report_type=self.report_type)
+        return parser.iter_rows(self.iter_download_lines(generated_report_id, encoding))
+
+    def iter_report_changes(self, generated_report_id, diff, schema=None, encoding='utf-8'):
+        """
+        Stream the rows of the report that changed since the previous snapshot, see :class:`SnapshotDiff`.
+
+        :param generated_report_id:
+        :param diff: :class:`SnapshotDiff` of this report.
+        :return: generator of (`INSERTED`, `UPDATED` or `DELETED`, row)
+        """
+        return diff.diff(self.iter_report_rows(generated_report_id, schema, encoding))
+
+    def iter_report_batches(self, generated_report_id, schema=None, batch_size=10000, output='list',
+                            encoding='utf-8'):
+        """
+        Stream the report as columnar batches, see :meth:`FlatFileParser.iter_batches`.
+        """
+        parser = FlatFileParser(schema, report_type=self.report_type)
+        return parser.iter_batches(self.iter_download_lines(generated_report_id, encoding), batch_size, output)
+
+    def download_to(self, generated_report_id, dest, compression=None, chunk_size=1024 * 1024):
+        """
+        Write the report contents to a file with constant memory usage.
+
+        :param generated_report_id:
+        :param dest: file path or binary file object.
+        :param compression: None, 'gzip' or 'zstd' to compress the file on the fly.
+        :param chunk_size:
+        :return: Number of bytes downloaded.
+        """
+        size = 0
+        with open_sink(dest, compression) as sink:
+            for chunk in self.iter_download(generated_report_id, chunk_size):
+                sink.write(chunk)
+                size += len(chunk)
+        self.logger.debug('downloaded {} bytes for report id {}'.format(size, generated_report_id))
+        return size
+
     def poll(self, report_request_id):
         """
         Wait for report to finish processing and return the generate report id.
@@ -70,38 +278,301 @@ class AdvancedReports(Reports):
         :param report_request_id:
         :return:
         """
-        report_status_response = self.get_report_status(report_request_id)
-        report_status_info = report_status_response.report_request_info_list()[0]
-        status = report_status_info.report_processing_status
+        return self.poll_info(report_request_id).generated_report_id
 
-        for i in range(0, self.max_retries):
+    def poll_info(self, report_request_id):
+        """
+        Wait for report to finish processing and return its `ReportRequestInfo`.
+
+        :param report_request_id:
+        :return: :class:`ReportRequestInfo`
+        """
+        timer = self.schedule.timer(self.report_type)
+        if self.notifications is not None:
+            # The report can't be done yet, wait for its notification before the first check.
+            self._wait((report_request_id,), timer)
+        while True:
+            report_status_response = self.get_report_status(report_request_id)
+            report_status_info = report_status_response.report_request_info_list()[0]
+            status = report_status_info.report_processing_status
             self.logger.debug('report_request_id={} report_processing_status={}'.format(report_request_id, status))
+
             # Completed date is `None` if report isn't finished processing, otherwise it's a datetime object
             done = bool(report_status_info.completed_date)
             if done:
                 if status != '_DONE_':
                     raise ReportFailedError(report_request_id, status)
+                self._report_finished(report_status_info)
                 break
-            time.sleep(30)  # Wait a bit for the report status to change
 
-            report_status_response = self.get_report_status(report_request_id)
-            report_status_info = report_status_response.report_request_info_list()[0]
-            status = report_status_info.report_processing_status
+            if not self._wait((report_request_id,), timer):
+                raise ReportTimeoutError(report_request_id, status)
+
+        return report_status_info
+
+    def _sleep(self, report_request_ids, delay):
+        """
+        Sleep `delay` seconds, or until a notification arrives for one of the report requests.
+
+        :return: list of the report_request_id notified.
+        """
+        if self.notifications is None:
+            time.sleep(delay)
+            return []
+        return self.notifications.wait(report_request_ids, delay)
+
+    def _wait(self, report_request_ids, timer):
+        """
+        Wait for the next status check of a poll loop.
+
+        :return: False once the timer gives up.
+        """
+        delay = timer.next_delay()
+        if delay is None:
+            return False
+        self._sleep(report_request_ids, delay)
+        return True
+
+    def _report_finished(self, info):
+        """
+        Feed the duration of a finished report to the schedule and the instrumentation.
+        """
+        self.schedule.observe(info)
+        if not instrumentation.enabled:
+            return
+        submitted, started, completed = info.submitted_date, info.started_processing_date, info.completed_date
+        if submitted and started:
+            instrumentation.observe('mws.report.queued', (started - submitted).total_seconds(),
+                                    report_type=info.report_type)
+        if started and completed:
+            instrumentation.observe('mws.report.processing', (completed - started).total_seconds(),
+                                    report_type=info.report_type)
+
+    def done_report_requests(self, report_types):
+        """
+        List the `_DONE_` report requests of the given types generated within the cache ttl,
+        with a single paged GetReportRequestList.
+
+        :param report_types: iterable of report types.
+        :return: list of :class:`ReportRequestInfo`
+        """
+        report_types = tuple(sorted(set(report_types)))
+        if not report_types:
+            return []
+        fromdate = to_amazon_timestamp(datetime.datetime.now() - datetime.timedelta(seconds=self.cache.ttl))
+        return [info for info in self.iter_report_request_list(types=report_types,
+                                                               processingstatuses=('_DONE_',), fromdate=fromdate)
+                if info.generated_report_id]
+
+    def find_report(self, start_date, end_date, marketplaceids=(), report_type=None, infos=None):
+        """
+        Look for a report already generated for these parameters within the cache ttl,
+        so that it can be downloaded instead of requested again.
+
+        Amazon doesn't return the marketplaces of a report request, so a report with
+        marketplaces is only matched if its request was remembered by the cache.
+
+        :param infos: Report requests to search, as returned by :meth:`done_report_requests`.
+            Listed for the report type if None.
+        :return: :class:`ReportRequestInfo` or None
+        """
+        if self.cache is None or not (start_date and end_date):
+            return None
+        report_type = report_type or self.report_type
+        key = self.cache.key(report_type, start_date, end_date, marketplaceids)
+        start_date, end_date = to_amazon_timestamp(start_date), to_amazon_timestamp(end_date)
+        if infos is None:
+            infos = self.done_report_requests((report_type,))
+
+        for info in infos:
+            if info.report_type != report_type:
+                continue
+            if to_amazon_timestamp(info.start_date) != start_date or to_amazon_timestamp(info.end_date) != end_date:
+                continue
+            request_key = self.cache.request_key(info.report_request_id)
+            if request_key == key or (request_key is None and not marketplaceids):
+                self.logger.debug('reusing report_request_id={} for {}'.format(info.report_request_id, report_type))
+                return info
+        return None
+
+    def _cache_report(self, key, generated_report_id, metadata):
+        """
+        Stream a report into the cache, along with its encoding.
+
+        :return: :class:`CacheEntry`
+        """
+        self.logger.debug('caching report for report id {}'.format(generated_report_id))
+        response = self.stream_request(dict(Action='GetReport', ReportId=generated_report_id))
+        return self.cache.put(key, self._iter_content(response), metadata, encoding=response.encoding)
+
+    def _deliver(self, entry, dest=None, compression=None):
+        if dest is not None:
+            return self.cache.copy_to(entry, dest, compression)
+        return entry.read_text()
+
+    def _cached_request_and_download(self, start_date=None, end_date=None, marketplaceids=(), dest=None,
+                                     compression=None):
+        start_date, end_date = self.resolve_dates(start_date, end_date)
+        key = self.cache.key(self.report_type, start_date, end_date, marketplaceids)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.logger.debug('{} found in cache'.format(self.report_type))
+            return self._deliver(entry, dest, compression)
+
+        info = self.find_report(start_date, end_date, marketplaceids)
+        if info is None:
+            requested_report_response = self.request(start_date, end_date, marketplaceids)
+            report_request_id = requested_report_response.request_report_result.report_request_id
+            self.cache.remember_request(report_request_id, key)
+            info = self.poll_info(report_request_id)
 
+        with instrumentation.timer('mws.report.download', report_type=self.report_type):
+            entry = self._cache_report(key, info.generated_report_id, info.to_record().to_dict())
+        self.update_report_acknowledgements(report_ids=(info.generated_report_id,), acknowledged=True)
+        return self._deliver(entry, dest, compression)
+
+    def _record(self, job, stage):
+        if self.journal is not None:
+            self.journal.record(job, stage)
         else:
-            raise ReportFailedError(report_request_id, status)
+            job.stage = stage
 
-        return report_status_info.generated_report_id
+    def _cache_key(self, job):
+        return self.cache.key(job.report_type, job.start_date, job.end_date, job.marketplaceids)
 
-    def request_and_download(self, start_date=None, end_date=None, marketplaceids=()):
+    def submit(self, job):
         """
-        request, wait, and download.
+        Send the `RequestReport` call for a single job.
 
+        :param job: :class:`ReportJob`
         :return:
         """
+        # The requested dates identify the report in the cache.
+        job.start_date, job.end_date = self.resolve_dates(job.start_date, job.end_date)
+        response = self.request(job.start_date, job.end_date, job.marketplaceids, report_type=job.report_type)
+        info = response.request_report_result
+        job.report_request_id = info.report_request_id
+        job.status = info.report_processing_status
+        if self.cache is not None:
+            self.cache.remember_request(job.report_request_id, self._cache_key(job))
+        self._record(job, REQUESTED)
+        return job
+
+    def _acknowledge(self, job):
+        self.update_report_acknowledgements(report_ids=(job.generated_report_id,), acknowledged=True)
+        self._record(job, ACKNOWLEDGED)
+
+    def _download(self, job, info=None):
+        """
+        Download the generated report of a job, then acknowledge it.
+
+        :param job: :class:`ReportJob`
+        :param info: `ReportRequestInfo` of the finished request, or None to download
+            the `generated_report_id` of a resumed job.
+        """
+        if info is not None:
+            job.generated_report_id = info.generated_report_id
+        self._record(job, GENERATED)
+        with instrumentation.timer('mws.report.download', report_type=job.report_type):
+            if self.cache is not None:
+                metadata = info.to_record().to_dict() if info is not None else {}
+                entry = self._cache_report(self._cache_key(job), job.generated_report_id, metadata)
+                job.contents = self._deliver(entry, job.dest, job.compression)
+            elif job.dest is not None:
+                job.contents = self.download_to(job.generated_report_id, job.dest, job.compression)
+            else:
+                job.contents = self.download(job.generated_report_id)
+        job.downloaded = True
+        self._record(job, DOWNLOADED)
+        self._acknowledge(job)
+
+    def load_cached(self, job, infos=None):
+        """
+        Fill a job from the cache, or from a report already generated for the same parameters.
+
+        :param job: :class:`ReportJob`
+        :param infos: Report requests to search, see :meth:`find_report`.
+        :return: True if the job is done without requesting a new report.
+        """
+        if self.cache is None:
+            return False
+        entry = self.cache.get(self._cache_key(job))
+        if entry is not None:
+            job.status = '_DONE_'
+            job.contents = self._deliver(entry, job.dest, job.compression)
+            job.downloaded = True
+            self._record(job, ACKNOWLEDGED)
+            return True
+
+        info = self.find_report(job.start_date, job.end_date, job.marketplaceids, report_type=job.report_type,
+                                infos=infos)
+        if info is None:
+            return False
+        job.report_request_id = info.report_request_id
+        job.status = info.report_processing_status
+        self._download(job, info)
+        return True
+
+    def run_job(self, job):
+        """
+        Request, wait for and download a single job, resuming it from the journal if it is found there.
+
+        :param job: :class:`ReportJob`
+        :return: The job, downloaded.
+        """
+        if self.journal is not None:
+            self.journal.restore(job)
+        if job.stage in FINAL_STAGES:
+            # Finished by a previous call, a new call asks for a new report.
+            job.reset()
+        if job.done:
+            if job.stage == DOWNLOADED:
+                self._acknowledge(job)
+            return job
+
+        if job.stage != GENERATED:
+            if job.report_request_id is None:
+                if self.load_cached(job):
+                    return job
+                self.submit(job)
+            try:
+                info = self.poll_info(job.report_request_id)
+            except ReportTimeoutError as e:
+                # Still processing on Amazon's side, keep the report request to resume polling it.
+                job.error = e
+                raise
+            except ReportFailedError as e:
+                job.status = e.status
+                job.error = e
+                self._record(job, FAILED)
+                raise
+            job.status = info.report_processing_status
+            self._download(job, info)
+        else:
+            self._download(job)
+        return job
+
+    def request_and_download(self, start_date=None, end_date=None, marketplaceids=(), dest=None, compression=None):
+        """
+        request, wait, and download.
+
+        :param dest: Optional file path or binary file object to stream the report to.
+        :param compression: None, 'gzip' or 'zstd', only used with `dest`.
+        :return: The report contents, or the number of bytes written if `dest` is given.
+        """
+        if self.journal is not None:
+            job = ReportJob(self.report_type, start_date, end_date, marketplaceids, dest, compression)
+            return self.run_job(job).contents
+
+        if self.cache is not None:
+            return self._cached_request_and_download(start_date, end_date, marketplaceids, dest, compression)
+
         requested_report_response = self.request(start_date, end_date, marketplaceids)
         report_id = self.poll(requested_report_response.request_report_result.report_request_id)
-        report_contents = self.download(report_id)
-        print(report_contents)
+        with instrumentation.timer('mws.report.download', report_type=self.report_type):
+            if dest is not None:
+                report_contents = self.download_to(report_id, dest, compression)
+            else:
+                report_contents = self.download(report_id)
         self.update_report_acknowledgements(report_ids=(report_id,), acknowledged=True)
         return report_contents
@@ -0,0 +1,84 @@
+import json
+import hashlib
+
+from .utils import to_amazon_timestamp
+
+# Stages of a job recorded by a :class:`JobJournal`, in order.
+NEW = 'new'
+REQUESTED = 'requested'
+POLLED = 'polled'
+GENERATED = 'generated'
+DOWNLOADED = 'downloaded'
+ACKNOWLEDGED = 'acknowledged'
+FAILED = 'failed'
+FINAL_STAGES = (ACKNOWLEDGED, FAILED)
+
+
+class ReportJob(object):
+    """
+    A single report to generate as part of a :class:`BatchReports` run.
+
+    The job keeps track of its own progress: once the report has been requested
+    `report_request_id` is set, and once it is finished either `downloaded` or `error`
+    is set. The report is kept in `contents`, unless `dest` is given in which case it
+    is streamed to that file and `contents` holds the number of bytes written.
+
+    `stage` is the last step reached, and `job_id` identifies the job in a :class:`JobJournal`.
+    """
+
+    def __init__(self, report_type, start_date=None, end_date=None, marketplaceids=(), dest=None,
+                 compression=None, job_id=None):
+        """
+        :param report_type: Amazon report type, ie. `_GET_FLAT_FILE_OPEN_LISTINGS_DATA_`
+        :param start_date: Begin date range of records to include in the report.
+        :param end_date: End date range of records to include in the report.
+        :param marketplaceids:
+        :param dest: Optional file path or binary file object to stream the report to.
+        :param compression: None, 'gzip' or 'zstd', only used with `dest`.
+        :param job_id: Defaults to a digest of the report type, dates and marketplaces.
+        """
+        self.report_type = report_type
+        self.start_date = start_date
+        self.end_date = end_date
+        self.marketplaceids = tuple(marketplaceids or ())
+        self.dest = dest
+        self.compression = compression
+        self.job_id = job_id or self.default_id(report_type, start_date, end_date, self.marketplaceids)
+
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the progress of the job, so that the report is requested again.
+        """
+        self.stage = NEW
+        self.report_request_id = None
+        self.status = None
+        self.generated_report_id = None
+        self.downloaded = False
+        self.contents = None
+        self.error = None
+
+    @staticmethod
+    def default_id(report_type, start_date=None, end_date=None, marketplaceids=()):
+        parameters = [
+            report_type,
+            to_amazon_timestamp(start_date),
+            to_amazon_timestamp(end_date),
+            sorted(marketplaceids or ()),
+        ]
+        return hashlib.sha256(json.dumps(parameters).encode()).hexdigest()[:32]
+
+    @property
+    def done(self):
+        return self.downloaded or self.error is not None
+
+    def __repr__(self):
+        return '<{} report_type={} marketplaceids={} report_request_id={} status={} stage={}>'.format(
+            self.__class__.__name__,
+            self.report_type,
+            self.marketplaceids,
+            self.report_request_id,
+            self.status,
+            self.stage
+        )
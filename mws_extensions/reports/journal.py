@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import contextlib
+
+from .jobs import ReportJob, NEW, REQUESTED, POLLED, GENERATED, DOWNLOADED, ACKNOWLEDGED, FAILED, FINAL_STAGES
+from .utils import to_amazon_timestamp, from_amazon_timestamp
+from .exceptions import ReportFailedError
+
+
+class JobJournal(object):
+    """
+    Durable record of the progress of report jobs, stored in an sqlite database.
+
+    Every stage reached by a job (requested, polled status, generated report id,
+    downloaded file, acknowledged) is written as soon as it happens, along with an
+    event history. A restarted process restores its jobs from the journal and picks
+    them up where they stopped, instead of requesting the reports again.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Database file, created if needed.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS jobs ('
+                       'job_id TEXT PRIMARY KEY, report_type TEXT, start_date TEXT, end_date TEXT, '
+                       'marketplaceids TEXT, dest TEXT, compression TEXT, stage TEXT, report_request_id TEXT, '
+                       'status TEXT, generated_report_id TEXT, size INTEGER, error TEXT, created REAL, updated REAL)')
+            db.execute('CREATE TABLE IF NOT EXISTS events (job_id TEXT, stage TEXT, status TEXT, time REAL)')
+            db.execute('CREATE INDEX IF NOT EXISTS events_job_id ON events (job_id)')
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def record(self, job, stage):
+        """
+        Store the current state of a job as having reached `stage`.
+
+        :param job: :class:`ReportJob`
+        :param stage: One of the stages of :mod:`jobs`, ie. `REQUESTED`.
+        """
+        job.stage = stage
+        now = time.time()
+        size = job.contents if isinstance(job.contents, int) else None
+        with self._lock, self._connect() as db:
+            db.execute(
+                'INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (job_id) DO UPDATE SET stage = excluded.stage, '
+                'report_request_id = excluded.report_request_id, status = excluded.status, '
+                'generated_report_id = excluded.generated_report_id, size = excluded.size, '
+                'error = excluded.error, updated = excluded.updated',
+                (job.job_id, job.report_type, to_amazon_timestamp(job.start_date), to_amazon_timestamp(job.end_date),
+                 json.dumps(list(job.marketplaceids)), job.dest if isinstance(job.dest, str) else None,
+                 job.compression, stage, job.report_request_id, job.status, job.generated_report_id, size,
+                 str(job.error) if job.error is not None else None, now, now)
+            )
+            db.execute('INSERT INTO events VALUES (?, ?, ?, ?)', (job.job_id, stage, job.status, now))
+
+    def _row(self, job_id):
+        with self._lock, self._connect() as db:
+            return db.execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+
+    @staticmethod
+    def _restore(job, row):
+        job.stage = row['stage']
+        job.report_request_id = row['report_request_id']
+        job.status = row['status']
+        job.generated_report_id = row['generated_report_id']
+        if job.stage == FAILED:
+            job.error = ReportFailedError(job.report_request_id, job.status)
+        elif job.stage == ACKNOWLEDGED:
+            job.contents = row['size']
+            job.downloaded = True
+        elif job.stage == DOWNLOADED and isinstance(job.dest, str) and os.path.exists(job.dest):
+            job.contents = row['size']
+            job.downloaded = True
+        elif job.stage == DOWNLOADED:
+            # The report was kept in memory, or its file is gone: download it again.
+            job.stage = GENERATED
+        return job
+
+    def restore(self, job):
+        """
+        Fill a job with its journaled progress, if any.
+
+        A job downloaded in memory by the previous process but not acknowledged is set
+        back to `GENERATED`, so that it is downloaded again.
+
+        :param job: :class:`ReportJob`
+        :return: True if the job was found in the journal.
+        """
+        row = self._row(job.job_id)
+        if row is None:
+            return False
+        self._restore(job, row)
+        return True
+
+    def _job(self, row):
+        start_date, end_date = row['start_date'], row['end_date']
+        job = ReportJob(
+            row['report_type'],
+            from_amazon_timestamp(start_date) if start_date else None,
+            from_amazon_timestamp(end_date) if end_date else None,
+            json.loads(row['marketplaceids']),
+            row['dest'],
+            row['compression'],
+            job_id=row['job_id'],
+        )
+        return self._restore(job, row)
+
+    def jobs(self, stages=None):
+        """
+        :param stages: Only return the jobs at these stages, defaults to all of them.
+        :return: list of :class:`ReportJob`
+        """
+        with self._lock, self._connect() as db:
+            rows = db.execute('SELECT * FROM jobs ORDER BY created').fetchall()
+        return [self._job(row) for row in rows if stages is None or row['stage'] in stages]
+
+    def pending(self):
+        """
+        :return: list of the unfinished :class:`ReportJob`
+        """
+        return self.jobs(stages=(NEW, REQUESTED, POLLED, GENERATED, DOWNLOADED))
+
+    def stuck(self, older_than=60 * 60):
+        """
+        Unfinished jobs without progress for `older_than` seconds, ie. left behind by a dead process.
+
+        :return: list of :class:`ReportJob`
+        """
+        limit = time.time() - older_than
+        with self._lock, self._connect() as db:
+            rows = db.execute('SELECT * FROM jobs WHERE updated < ? ORDER BY created', (limit,)).fetchall()
+        return [self._job(row) for row in rows if row['stage'] not in FINAL_STAGES]
+
+    def reset(self, job_id):
+        """
+        Forget the progress of a job so that its report is requested again on the next run,
+        ie. when its report request expired on Amazon's side.
+        """
+        with self._lock, self._connect() as db:
+            db.execute('UPDATE jobs SET stage = ?, report_request_id = NULL, status = NULL, '
+                       'generated_report_id = NULL, size = NULL, error = NULL, updated = ? WHERE job_id = ?',
+                       (NEW, time.time(), job_id))
+            db.execute('INSERT INTO events VALUES (?, ?, ?, ?)', (job_id, NEW, None, time.time()))
+
+    def history(self, job_id):
+        """
+        :return: list of (stage, status, time) of a job, oldest first.
+        """
+        with self._lock, self._connect() as db:
+            rows = db.execute('SELECT stage, status, time FROM events WHERE job_id = ? ORDER BY rowid',
+                              (job_id,)).fetchall()
+        return [tuple(row) for row in rows]
+
+    def forget(self, stages=FINAL_STAGES):
+        """
+        Delete the jobs at the given stages, finished ones by default.
+        """
+        with self._lock, self._connect() as db:
+            for stage in stages:
+                db.execute('DELETE FROM events WHERE job_id IN (SELECT job_id FROM jobs WHERE stage = ?)', (stage,))
+                db.execute('DELETE FROM jobs WHERE stage = ?', (stage,))
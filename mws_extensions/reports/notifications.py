@@ -0,0 +1,254 @@
+import queue
+import logging
+import threading
+import collections
+from lxml import etree
+
+from ..metrics import instrumentation
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+REPORT_PROCESSING_FINISHED = 'ReportProcessingFinished'
+
+
+class ReportNotification(object):
+    """
+    Payload of a `ReportProcessingFinished` notification.
+    """
+
+    def __init__(self, report_request_id, report_id=None, report_type=None, status=None, seller_id=None):
+        self.report_request_id = report_request_id
+        self.report_id = report_id
+        self.report_type = report_type
+        self.status = status
+        self.seller_id = seller_id
+
+    def __repr__(self):
+        return '<{} report_request_id={} status={}>'.format(self.__class__.__name__, self.report_request_id,
+                                                            self.status)
+
+
+def _text(element, tag):
+    found = element.xpath('.//*[local-name() = $tag]', tag=tag)
+    return found[0].text if found else None
+
+
+def parse_notification(body):
+    """
+    :param body: XML notification as sent by Amazon, str or bytes.
+    :return: :class:`ReportNotification`, or None for other notification types and invalid messages.
+    """
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    try:
+        element = etree.fromstring(body)
+    except etree.XMLSyntaxError:
+        return None
+    if _text(element, 'NotificationType') != REPORT_PROCESSING_FINISHED:
+        return None
+    report_request_id = _text(element, 'ReportRequestId')
+    if not report_request_id:
+        return None
+    return ReportNotification(report_request_id, _text(element, 'ReportId'), _text(element, 'ReportType'),
+                              _text(element, 'ReportProcessingStatus'), _text(element, 'SellerId'))
+
+
+def report_notification_xml(report_request_id, report_id=None, report_type=None, status='Done', seller_id=''):
+    """
+    Build a `ReportProcessingFinished` notification, ie. to feed a :class:`LocalQueue` in tests.
+    """
+    return (
+        '<Notification><NotificationMetaData><NotificationType>{type}</NotificationType>'
+        '<PayloadVersion>1.0</PayloadVersion><SellerId>{seller_id}</SellerId></NotificationMetaData>'
+        '<NotificationPayload><ReportProcessingFinishedNotification><SellerId>{seller_id}</SellerId>'
+        '<ReportRequestId>{report_request_id}</ReportRequestId><ReportId>{report_id}</ReportId>'
+        '<ReportType>{report_type}</ReportType><ReportProcessingStatus>{status}</ReportProcessingStatus>'
+        '</ReportProcessingFinishedNotification></NotificationPayload></Notification>'
+    ).format(type=REPORT_PROCESSING_FINISHED, seller_id=seller_id, report_request_id=report_request_id,
+             report_id=report_id or '', report_type=report_type or '', status=status)
+
+
+class NotificationQueue(object):
+    """
+    Base queue backend. Messages are opaque to the listener except for their body.
+    """
+
+    def receive(self, wait=0):
+        """
+        :param wait: Seconds to wait for messages if none are available.
+        :return: list of messages.
+        """
+        raise NotImplementedError
+
+    def body(self, message):
+        raise NotImplementedError
+
+    def delete(self, message):
+        """
+        Remove a handled message from the queue.
+        """
+
+
+class LocalQueue(NotificationQueue):
+    """
+    In-process queue, for tests and for applications receiving the notifications by other means.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def send(self, body):
+        self._queue.put(body)
+
+    def receive(self, wait=0, max_messages=10):
+        try:
+            messages = [self._queue.get(timeout=wait) if wait else self._queue.get_nowait()]
+        except queue.Empty:
+            return []
+        while len(messages) < max_messages:
+            try:
+                messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def body(self, message):
+        return message
+
+
+class SQSQueue(NotificationQueue):
+    """
+    Amazon SQS queue the MWS notifications are delivered to, see the Subscriptions API.
+
+    Handled messages are deleted, so every consumer needs its own queue.
+    """
+
+    def __init__(self, queue_url, client=None, max_messages=10):
+        """
+        :param queue_url:
+        :param client: boto3 SQS client, created from the default session if None.
+        :param max_messages: Maximum number of messages per receive call, at most 10.
+        """
+        if client is None:
+            if boto3 is None:
+                raise ImportError('boto3 is required for SQSQueue: pip install mws_extensions[sqs]')
+            client = boto3.client('sqs')
+        self.queue_url = queue_url
+        self.client = client
+        self.max_messages = max_messages
+
+    def receive(self, wait=0):
+        response = self.client.receive_message(QueueUrl=self.queue_url, MaxNumberOfMessages=self.max_messages,
+                                               WaitTimeSeconds=int(min(wait, 20)))
+        return response.get('Messages', [])
+
+    def body(self, message):
+        return message['Body']
+
+    def delete(self, message):
+        self.client.delete_message(QueueUrl=self.queue_url, ReceiptHandle=message['ReceiptHandle'])
+
+
+class NotificationListener(object):
+    """
+    Consume `ReportProcessingFinished` notifications on a background thread and wake
+    the report jobs waiting for them.
+
+    Pass it as the `notifications` argument of :class:`AdvancedReports` or :class:`BatchReports`:
+    they then sleep on :meth:`wait` instead of `time.sleep`, check the status of a report as
+    soon as its notification arrives, and only poll every `fallback_interval` seconds in case
+    a notification is lost.
+
+    Notifications arriving before anyone waits for them are kept, up to `max_kept` of them.
+    """
+
+    def __init__(self, queue, wait=20, fallback_interval=5 * 60, max_kept=10000):
+        """
+        :param queue: :class:`NotificationQueue`, ie. :class:`SQSQueue` or :class:`LocalQueue`.
+        :param wait: Seconds of a single long poll of the queue.
+        :param fallback_interval: Seconds between status checks of reports without notification.
+        :param max_kept: Maximum number of notifications kept for report requests nobody waits for.
+        """
+        self.queue = queue
+        self.wait_time = wait
+        self.fallback_interval = fallback_interval
+        self.max_kept = max_kept
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.notifications = collections.OrderedDict()
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def pump(self, wait=0):
+        """
+        Receive one batch of messages from the queue and wake the waiters of their report requests.
+
+        :return: list of :class:`ReportNotification` received.
+        """
+        received = []
+        for message in self.queue.receive(wait):
+            notification = parse_notification(self.queue.body(message))
+            if notification is not None:
+                received.append(notification)
+            self.queue.delete(message)
+        if received:
+            with self._condition:
+                for notification in received:
+                    self.notifications[notification.report_request_id] = notification
+                while len(self.notifications) > self.max_kept:
+                    self.notifications.popitem(last=False)
+                self._condition.notify_all()
+            for notification in received:
+                self.logger.debug('report_request_id={} finished with {}'.format(
+                    notification.report_request_id, notification.status))
+                instrumentation.count('mws.report.notified', report_type=notification.report_type)
+        return received
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.pump(self.wait_time)
+            except Exception:
+                self.logger.exception('failed to receive notifications')
+                self._stopped.wait(self.wait_time)
+
+    def start(self):
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='mws-notifications', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _pop(self, report_request_ids):
+        return [x for x in report_request_ids if self.notifications.pop(x, None) is not None]
+
+    def wait(self, report_request_ids, timeout):
+        """
+        Sleep until one of the report requests has a notification, or `timeout` seconds.
+
+        :param report_request_ids: iterable of report_request_id.
+        :param timeout: Seconds.
+        :return: list of the report_request_id notified, their notification is consumed.
+        """
+        report_request_ids = list(report_request_ids)
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pop(report_request_ids), timeout)
+
+    def discard(self, report_request_id):
+        with self._condition:
+            self.notifications.pop(report_request_id, None)
@@ -0,0 +1,207 @@
+import decimal
+
+from .utils import from_amazon_timestamp
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def to_date(value):
+    return from_amazon_timestamp(value)
+
+
+def to_decimal(value):
+    """
+    Parse an amount using a dot or a comma as decimal separator.
+
+    A comma is the decimal separator unless a dot follows it, ie. `1,50` or `1.234,50`;
+    before a dot commas separate thousands, ie. `1,234.50`.
+    """
+    comma = value.rfind(',')
+    if comma < 0:
+        return decimal.Decimal(value)
+    if value.rfind('.') > comma:
+        return decimal.Decimal(value.replace(',', ''))
+    return decimal.Decimal(value.replace('.', '').replace(',', '.'))
+
+
+def to_int(value):
+    return int(value)
+
+
+def to_bool(value):
+    return value.lower() in ('true', 'yes', 'y', '1')
+
+
+# Typed columns of the most common flat file reports, the other columns are kept as `str`.
+_ORDER_COLUMNS = {
+    'purchase-date': to_date,
+    'last-updated-date': to_date,
+    'quantity': to_int,
+    'item-price': to_decimal,
+    'item-tax': to_decimal,
+    'shipping-price': to_decimal,
+    'shipping-tax': to_decimal,
+    'gift-wrap-price': to_decimal,
+    'gift-wrap-tax': to_decimal,
+    'item-promotion-discount': to_decimal,
+    'ship-promotion-discount': to_decimal,
+}
+
+SCHEMAS = {
+    '_GET_FLAT_FILE_OPEN_LISTINGS_DATA_': {
+        'price': to_decimal,
+        'quantity': to_int,
+    },
+    '_GET_MERCHANT_LISTINGS_ALL_DATA_': {
+        'price': to_decimal,
+        'quantity': to_int,
+        'open-date': to_date,
+    },
+    '_GET_MERCHANT_LISTINGS_DATA_': {
+        'price': to_decimal,
+        'quantity': to_int,
+        'open-date': to_date,
+    },
+    '_GET_FBA_MYI_UNSUPPRESSED_INVENTORY_DATA_': {
+        'your-price': to_decimal,
+        'per-unit-volume': to_decimal,
+        'mfn-fulfillable-quantity': to_int,
+        'afn-warehouse-quantity': to_int,
+        'afn-fulfillable-quantity': to_int,
+        'afn-unsellable-quantity': to_int,
+        'afn-reserved-quantity': to_int,
+        'afn-total-quantity': to_int,
+        'afn-inbound-working-quantity': to_int,
+        'afn-inbound-shipped-quantity': to_int,
+        'afn-inbound-receiving-quantity': to_int,
+    },
+    '_GET_AFN_INVENTORY_DATA_': {
+        'Quantity Available': to_int,
+    },
+    '_GET_FLAT_FILE_ALL_ORDERS_DATA_BY_LAST_UPDATE_': _ORDER_COLUMNS,
+    '_GET_FLAT_FILE_ALL_ORDERS_DATA_BY_ORDER_DATE_': _ORDER_COLUMNS,
+    '_GET_V2_SETTLEMENT_REPORT_DATA_FLAT_FILE_': {
+        'settlement-start-date': to_date,
+        'settlement-end-date': to_date,
+        'deposit-date': to_date,
+        'posted-date': to_date,
+        'total-amount': to_decimal,
+        'amount': to_decimal,
+        'quantity-purchased': to_int,
+    },
+}
+
+
+class FlatFileParser(object):
+    """
+    Stream a tab delimited flat file report into typed rows or columnar batches.
+
+    The first line is the header. Values of the columns listed in the schema go
+    through their converter, empty values become None and the other columns are
+    kept as `str`. Only one batch is held in memory at a time.
+    """
+
+    def __init__(self, schema=None, report_type=None, delimiter='\t', null_values=('',)):
+        """
+        :param schema: dict of column name: converter, defaults to the schema of `report_type`.
+        :param report_type: Amazon report type used to look up a default schema in :data:`SCHEMAS`.
+        :param delimiter:
+        :param null_values: Values converted to None.
+        """
+        if schema is None:
+            schema = SCHEMAS.get(report_type, {})
+        self.schema = schema
+        self.delimiter = delimiter
+        self.null_values = frozenset(null_values)
+
+    def _converters(self, header):
+        return [(i, self.schema[name]) for i, name in enumerate(header) if name in self.schema]
+
+    def iter_tuples(self, lines):
+        """
+        :param lines: iterable of str, ie. `AdvancedReports.iter_download_lines(...)`
+        :return: the header followed by a generator of typed value lists.
+        """
+        lines = iter(lines)
+        # Some reports start with a UTF-8 byte order mark, it isn't part of the first column name.
+        header = next(lines, '').lstrip('\ufeff').split(self.delimiter)
+        return header, self._iter_values(lines, header)
+
+    def _iter_values(self, lines, header):
+        delimiter = self.delimiter
+        null_values = self.null_values
+        converters = self._converters(header)
+        width = len(header)
+        for line in lines:
+            if not line:
+                continue
+            values = line.split(delimiter)
+            if len(values) < width:
+                values.extend([''] * (width - len(values)))
+            for i, converter in converters:
+                value = values[i]
+                values[i] = None if value in null_values else converter(value)
+            yield values
+
+    def iter_rows(self, lines):
+        """
+        :param lines: iterable of str
+        :return: generator of dict of column name: typed value
+        """
+        header, values = self.iter_tuples(lines)
+        for row in values:
+            yield dict(zip(header, row))
+
+    def iter_batches(self, lines, batch_size=10000, output='list'):
+        """
+        Group rows in columnar batches.
+
+        :param lines: iterable of str
+        :param batch_size: Number of rows per batch.
+        :param output: 'list' for dict of column name: list, 'numpy' for dict of column name: array,
+            'arrow' for `pyarrow.RecordBatch`.
+        :return: generator of batches
+        """
+        if output == 'numpy' and numpy is None:
+            raise ImportError('numpy is required for numpy batches: pip install numpy')
+        if output == 'arrow' and pyarrow is None:
+            raise ImportError('pyarrow is required for arrow batches: pip install pyarrow')
+
+        header, values = self.iter_tuples(lines)
+        rows = []
+        for row in values:
+            rows.append(row)
+            if len(rows) >= batch_size:
+                yield self._to_batch(header, rows, output)
+                rows = []
+        if rows:
+            yield self._to_batch(header, rows, output)
+
+    def _to_batch(self, header, rows, output):
+        columns = {name: list(column) for name, column in zip(header, zip(*rows))}
+        if output == 'numpy':
+            return {name: self._to_array(name, column) for name, column in columns.items()}
+        if output == 'arrow':
+            return pyarrow.RecordBatch.from_pydict(columns)
+        return columns
+
+    def _to_array(self, name, column):
+        converter = self.schema.get(name)
+        has_null = None in column
+        if converter is to_date:
+            return numpy.array(column, dtype='datetime64[us]')
+        if converter is to_decimal:
+            return numpy.array([numpy.nan if x is None else float(x) for x in column], dtype='float64')
+        if converter is to_int and not has_null:
+            return numpy.array(column, dtype='int64')
+        if converter is to_int:
+            return numpy.array([numpy.nan if x is None else x for x in column], dtype='float64')
+        return numpy.array(column, dtype=object)
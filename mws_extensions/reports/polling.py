@@ -0,0 +1,84 @@
+import logging
+
+from .base import GetReportRequestListResponse
+
+
+class StatusPoller(object):
+    """
+    Poll the status of many report requests with a single GetReportRequestList call.
+
+    Each pending ReportRequestId is registered with a waiter, a callable taking the
+    matching :class:`ReportRequestInfo`. On every :meth:`poll` all pending ids are sent
+    in one request (following NextToken pages), and each `ReportRequestInfo` is routed
+    back to its waiter. A waiter returning True is considered finished and is removed.
+    """
+
+    def __init__(self, reports, max_count=100):
+        """
+        :param reports: `mws.Reports` instance used to send the requests.
+        :param max_count: Maximum number of results per page.
+        """
+        self.reports = reports
+        self.max_count = max_count
+        self.waiters = {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def pending(self):
+        return list(self.waiters)
+
+    def register(self, report_request_id, waiter):
+        self.waiters[report_request_id] = waiter
+
+    def unregister(self, report_request_id):
+        self.waiters.pop(report_request_id, None)
+
+    def _get_report_request_list(self, report_request_ids=(), next_token=None):
+        if next_token:
+            parsed_response = self.reports.get_report_request_list(next_token=next_token)
+        else:
+            parsed_response = self.reports.get_report_request_list(requestids=report_request_ids,
+                                                                   max_count=str(self.max_count))
+        parsed_response.response.raise_for_status()
+        return GetReportRequestListResponse.load(parsed_response.response.text)
+
+    def fetch(self, report_request_ids):
+        """
+        Get the `ReportRequestInfo` of every given report request, following NextToken pages.
+
+        :param report_request_ids:
+        :return: dict of report_request_id: :class:`ReportRequestInfo`
+        """
+        report_request_ids = tuple(report_request_ids)
+        if not report_request_ids:
+            return {}
+
+        self.logger.debug('getting report request list for {} request ids'.format(len(report_request_ids)))
+        response = self._get_report_request_list(report_request_ids)
+        infos = {}
+        while True:
+            for info in response.report_request_info_list():
+                infos[info.report_request_id] = info
+            if not (response.has_next and response.next_token):
+                break
+            response = self._get_report_request_list(next_token=response.next_token)
+        return infos
+
+    def poll(self, report_request_ids=None):
+        """
+        Fetch the status of pending report requests and notify the waiters.
+
+        :param report_request_ids: Subset of the pending ids to check, defaults to all of them.
+        :return: list of report_request_id whose waiter is finished.
+        """
+        if report_request_ids is None:
+            report_request_ids = self.pending
+        finished = []
+        for report_request_id, info in self.fetch(report_request_ids).items():
+            waiter = self.waiters.get(report_request_id)
+            if waiter is None:
+                continue
+            if waiter(info):
+                self.unregister(report_request_id)
+                finished.append(report_request_id)
+        return finished
@@ -0,0 +1,83 @@
+class Record(object):
+    """
+    Frozen, `__slots__` based value object holding already parsed fields.
+
+    Records are cheap to keep around by the hundred thousand, compare and hash by
+    value, and pickle to a plain tuple so they can be cached or sent to other processes.
+    Subclasses only list their `fields`.
+    """
+
+    __slots__ = ()
+    fields = ()
+
+    def __init__(self, *args, **kwargs):
+        if len(args) > len(self.fields):
+            raise TypeError('{} takes at most {} arguments'.format(self.__class__.__name__, len(self.fields)))
+        values = dict(zip(self.fields, args))
+        for key, value in kwargs.items():
+            if key not in self.fields:
+                raise TypeError('{} has no field {!r}'.format(self.__class__.__name__, key))
+            values[key] = value
+        for field in self.fields:
+            object.__setattr__(self, field, values.get(field))
+
+    def __setattr__(self, key, value):
+        raise AttributeError('{} is immutable'.format(self.__class__.__name__))
+
+    def __delattr__(self, key):
+        raise AttributeError('{} is immutable'.format(self.__class__.__name__))
+
+    def values(self):
+        return tuple(getattr(self, field) for field in self.fields)
+
+    def to_dict(self):
+        return dict(zip(self.fields, self.values()))
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.values() == other.values()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash(self.values())
+
+    def __reduce__(self):
+        return self.__class__, self.values()
+
+    def __repr__(self):
+        return '<{} {}>'.format(
+            self.__class__.__name__,
+            ' '.join('{}={}'.format(field, getattr(self, field)) for field in self.fields)
+        )
+
+
+class ReportInfoRecord(Record):
+
+    __slots__ = fields = (
+        'report_type',
+        'acknowledged',
+        'acknowledged_date',
+        'report_id',
+        'report_request_id',
+        'available_date',
+    )
+
+
+class ReportRequestInfoRecord(Record):
+
+    __slots__ = fields = (
+        'report_request_id',
+        'report_type',
+        'start_date',
+        'end_date',
+        'scheduled',
+        'submitted_date',
+        'report_processing_status',
+        'generated_report_id',
+        'completed_date',
+        'started_processing_date',
+    )
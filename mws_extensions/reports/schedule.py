@@ -0,0 +1,164 @@
+import time
+import random
+import threading
+
+
+class DurationEstimator(object):
+    """
+    Learn how long each report type takes to generate from past
+    `submitted_date`/`completed_date` pairs.
+
+    The estimate is an exponentially weighted moving average per report type.
+    """
+
+    def __init__(self, durations=None, smoothing=0.3):
+        """
+        :param durations: Optional dict of report_type: seconds to start from.
+        :param smoothing: Weight of the newest observation in the moving average.
+        """
+        self.durations = dict(durations or {})
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+
+    def observe(self, report_type, submitted_date, completed_date):
+        if not (report_type and submitted_date and completed_date):
+            return
+        duration = max((completed_date - submitted_date).total_seconds(), 0)
+        with self._lock:
+            previous = self.durations.get(report_type)
+            if previous is None:
+                self.durations[report_type] = duration
+            else:
+                self.durations[report_type] = previous + self.smoothing * (duration - previous)
+
+    def observe_info(self, info):
+        """
+        :param info: finished :class:`ReportRequestInfo`
+        :return:
+        """
+        self.observe(info.report_type, info.submitted_date, info.completed_date)
+
+    def estimate(self, report_type):
+        """
+        :return: Expected number of seconds for the report type or None if unknown.
+        """
+        return self.durations.get(report_type)
+
+
+class PollTimer(object):
+    """
+    Tell a single report poll loop how long to wait before the next status check.
+    """
+
+    def __init__(self, delays, deadline=None, clock=time.monotonic):
+        """
+        :param delays: iterable of delays in seconds, the loop gives up once it is exhausted.
+        :param deadline: Number of seconds after which the loop gives up.
+        :param clock:
+        """
+        self.delays = iter(delays)
+        self.deadline = deadline
+        self.clock = clock
+        self.started = clock()
+        self.attempts = 0
+
+    @property
+    def elapsed(self):
+        return self.clock() - self.started
+
+    def next_delay(self):
+        """
+        :return: Seconds to wait before checking again, or None to give up.
+        """
+        delay = next(self.delays, None)
+        if delay is None:
+            return None
+        if self.deadline is not None:
+            remaining = self.deadline - self.elapsed
+            if remaining <= 0:
+                return None
+            delay = min(delay, remaining)
+        self.attempts += 1
+        return delay
+
+
+class PollSchedule(object):
+    """
+    Base poll schedule policy. Subclasses define the delays between status checks.
+    """
+
+    def __init__(self, estimator=None):
+        """
+        :param estimator: Optional :class:`DurationEstimator` fed with finished reports.
+        """
+        self.estimator = estimator
+
+    def delays(self, report_type=None):
+        raise NotImplementedError
+
+    def deadline(self, report_type=None):
+        return None
+
+    def timer(self, report_type=None):
+        return PollTimer(self.delays(report_type), self.deadline(report_type))
+
+    def observe(self, info):
+        if self.estimator is not None:
+            self.estimator.observe_info(info)
+
+
+class FixedSchedule(PollSchedule):
+    """
+    Wait the same interval between checks and give up after `max_retries` checks.
+    """
+
+    def __init__(self, interval=30, max_retries=5, **kwargs):
+        self.interval = interval
+        self.max_retries = max_retries
+        super().__init__(**kwargs)
+
+    def delays(self, report_type=None):
+        return [self.interval] * self.max_retries
+
+
+class BackoffSchedule(PollSchedule):
+    """
+    Exponential backoff with jitter, bounded by a wall-clock deadline.
+
+    If an estimator knows how long the report type usually takes, the first check
+    is delayed until the report is expected to be done, and the backoff starts from
+    a fraction of that duration.
+    """
+
+    def __init__(self, initial=1, factor=2, max_interval=60, jitter=0.2, deadline=4 * 60 * 60, **kwargs):
+        """
+        :param initial: First delay in seconds.
+        :param factor: Multiplier applied to the delay after each check.
+        :param max_interval: Upper bound of a single delay in seconds.
+        :param jitter: Random fraction applied to every delay, ie. 0.2 means +/- 20%.
+        :param deadline: Seconds after which a still unfinished report is abandoned.
+        """
+        self.initial = initial
+        self.factor = factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self._deadline = deadline
+        super().__init__(**kwargs)
+
+    def _jittered(self, delay):
+        if not self.jitter:
+            return delay
+        return random.uniform(delay * (1 - self.jitter), delay * (1 + self.jitter))
+
+    def deadline(self, report_type=None):
+        return self._deadline
+
+    def delays(self, report_type=None):
+        interval = self.initial
+        expected = self.estimator.estimate(report_type) if self.estimator is not None else None
+        if expected:
+            yield self._jittered(expected)
+            interval = min(max(self.initial, expected / 10), self.max_interval)
+        while True:
+            yield self._jittered(min(interval, self.max_interval))
+            interval *= self.factor
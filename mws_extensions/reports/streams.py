@@ -0,0 +1,63 @@
+import gzip
+import codecs
+import contextlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIONS = (None, 'gzip', 'zstd')
+
+
+@contextlib.contextmanager
+def open_sink(dest, compression=None):
+    """
+    Open a binary sink writing to a file path or a file object, optionally compressed on the fly.
+
+    :param dest: file path or binary file object. A file object is left open.
+    :param compression: None, 'gzip' or 'zstd' (requires the `zstandard` package).
+    :return:
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError('compression must be one of {}, got {!r}'.format(COMPRESSIONS, compression))
+    if compression == 'zstd' and zstandard is None:
+        raise ImportError('zstandard is required for zstd compression: pip install zstandard')
+
+    close_fp = not hasattr(dest, 'write')
+    fp = open(dest, 'wb') if close_fp else dest
+    try:
+        if compression == 'gzip':
+            with gzip.GzipFile(fileobj=fp, mode='wb') as sink:
+                yield sink
+        elif compression == 'zstd':
+            with zstandard.ZstdCompressor().stream_writer(fp, closefd=False) as sink:
+                yield sink
+        else:
+            yield fp
+    finally:
+        if close_fp:
+            fp.close()
+
+
+def iter_lines(chunks, encoding='utf-8'):
+    """
+    Decode an iterable of byte chunks and yield its lines, without their line terminator.
+
+    Only the current chunk and a partial line are kept in memory.
+
+    :param chunks: iterable of bytes
+    :param encoding:
+    :return: generator of str
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line[:-1] if line.endswith('\r') else line
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending.rstrip('\r')
@@ -1,37 +1,115 @@
 import datetime
+from functools import lru_cache
 
 from dateutil import parser
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-def _utc_offset():
-    """
-    Get the UTC offset for the current timezone.
-    :return: The number of hours offset from UTC.
-    """
-    # Add 1 second to account for the time which it takes between calculating utcnow() and now()
-    return int(((datetime.datetime.utcnow() - datetime.datetime.now()) + datetime.timedelta(
-        seconds=1)).total_seconds() / 60 / 60)
+
+UTC = datetime.timezone.utc
+
+# Timezone abbreviations found in flat file reports, ie. `2019-01-01 10:00:00 PST`.
+TZINFOS = {
+    name: datetime.timezone(datetime.timedelta(hours=hours), name)
+    for name, hours in (
+        ('UTC', 0), ('GMT', 0),
+        ('PST', -8), ('PDT', -7), ('MST', -7), ('MDT', -6), ('CST', -6), ('CDT', -5), ('EST', -5), ('EDT', -4),
+        ('BST', 1), ('CET', 1), ('MEZ', 1), ('CEST', 2), ('MESZ', 2), ('JST', 9),
+    )
+}
 
 
 def to_amazon_timestamp(dt):
     """
     Return string formatted datetime in amazon proper format with utc offset applied.
 
+    Naive datetimes are considered local time, the offset is the one in effect
+    at that date so daylight saving time is taken into account.
+
     :type dt: datetime.datetime
     :param dt:
     :return:
     """
     if not dt:
         return
-    return (dt + datetime.timedelta(hours=_utc_offset())).strftime('%Y-%m-%dT%H:%M:%SZ')
+    return dt.astimezone(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
+
 
+def _parse_amazon_timestamp(ts):
+    """
+    Parse the fixed formats used by Amazon without going through dateutil,
+    ie. `2020-01-01T10:00:00+00:00`, `2020-01-01T10:00:00.000Z` or `2020-01-01 10:00:00 PST`.
+    """
+    ts = ts.strip()
+    try:
+        if ts.endswith('Z'):
+            return datetime.datetime.fromisoformat(ts[:-1]).replace(tzinfo=UTC)
+        return datetime.datetime.fromisoformat(ts)
+    except ValueError:
+        pass
+
+    head, _, name = ts.rpartition(' ')
+    tzinfo = TZINFOS.get(name)
+    if tzinfo is not None:
+        try:
+            return datetime.datetime.fromisoformat(head).replace(tzinfo=tzinfo)
+        except ValueError:
+            pass
+    return parser.parse(ts, tzinfos=TZINFOS)
 
+
+@lru_cache(maxsize=65536)
 def from_amazon_timestamp(ts):
     """
     Return a datetime object in local time.
 
+    Timestamps without offset are considered UTC. Results are memoized since
+    reports repeat the same timestamps a lot.
+
     :param ts: Amazon string formatted timestamp.
     :return:
     """
-    dt = parser.parse(ts).replace(tzinfo=None)
-    return dt - datetime.timedelta(hours=_utc_offset())
+    dt = _parse_amazon_timestamp(ts)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return dt.astimezone().replace(tzinfo=None)
+
+
+def from_amazon_timestamps(values):
+    """
+    Convert a whole column of Amazon timestamps in one call.
+
+    Every distinct value is parsed once. Empty values give None, or NaT for arrays.
+
+    :param values: list of str, or NumPy array of str.
+    :return: list of datetime, or NumPy `datetime64[us]` array if `values` is an array.
+    """
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        # Object arrays mixing None and str can't be sorted by numpy.unique, the cache dedups instead.
+        converted = from_amazon_timestamps(values.ravel().tolist())
+        return numpy.array(converted, dtype='datetime64[us]').reshape(values.shape)
+
+    cache = {}
+    result = []
+    for value in values:
+        try:
+            dt = cache[value]
+        except KeyError:
+            dt = cache[value] = from_amazon_timestamp(value) if value else None
+        result.append(dt)
+    return result
+
+
+def to_amazon_timestamps(values):
+    """
+    Format a whole column of local datetimes, see :func:`to_amazon_timestamp`.
+
+    :param values: list of datetime, or NumPy `datetime64` array.
+    :return: list of str
+    """
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        values = values.astype('datetime64[us]').tolist()
+    return [to_amazon_timestamp(value) for value in values]
@@ -0,0 +1,114 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from urllib.parse import urlsplit, parse_qs
+except ImportError:
+    from urlparse import urlsplit, parse_qs
+
+
+class MWSRetry(Retry):
+    """
+    Retry connection errors of every request, but read errors and 5xx responses only for
+    read only operations (`Get*` and `List*` actions) sent with an idempotent method.
+
+    Other operations may have been carried out by Amazon before the error, replaying them
+    could create a second report or inbound shipment.
+    """
+
+    READ_ONLY_PREFIXES = ('Get', 'List')
+
+    def is_replayable(self, method, url):
+        if method is None or method.upper() not in Retry.DEFAULT_ALLOWED_METHODS:
+            return False
+        action = parse_qs(urlsplit(url or '').query).get('Action', [''])[0]
+        return action.startswith(self.READ_ONLY_PREFIXES)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if not (error is not None and self._is_connection_error(error)) and not self.is_replayable(method, url):
+            return Retry.increment(self.new(total=0), method, url, response, error, _pool, _stacktrace)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class SessionPool(object):
+    """
+    Keep-alive `requests.Session` per MWS endpoint, shared by every client and thread.
+
+    Connections to an endpoint are kept open and reused by the following requests, so
+    TLS handshakes are only paid once per pooled connection. Connection errors, and 5xx
+    gateway errors of read only operations, are retried by the transport, see :class:`MWSRetry`;
+    throttling (503) is left to the :class:`ThrottleGovernor` of the clients.
+    """
+
+    def __init__(self, pool_maxsize=10, timeout=(10, 300), retries=3, backoff_factor=0.5):
+        """
+        :param pool_maxsize: Number of connections kept open per endpoint, ie. the number of
+            threads expected to call the same endpoint at once.
+        :param timeout: Default (connect, read) timeout in seconds.
+        :param retries: Number of transport level retries of a request.
+        :param backoff_factor: Retries wait `backoff_factor * 2 ** (retry - 1)` seconds.
+        """
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _create_session(self):
+        retry = MWSRetry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(500, 502, 504),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def session(self, url):
+        """
+        :return: `requests.Session` of the endpoint of `url`.
+        """
+        parts = urlsplit(url)
+        endpoint = '{}://{}'.format(parts.scheme, parts.netloc)
+        session = self._sessions.get(endpoint)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(endpoint)
+                if session is None:
+                    session = self._sessions[endpoint] = self._create_session()
+        return session
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session(url).request(method, url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_session_pool():
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SessionPool()
+        return _default_pool
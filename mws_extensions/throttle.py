@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import threading
+
+from .metrics import instrumentation
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Default (maximum request quota, restore rate in requests per second) of the operations
+# wrapped by this package, see the throttling section of each MWS API reference.
+DEFAULT_QUOTAS = {
+    # Fulfillment Inbound Shipment
+    'ListInboundShipments': (30, 2),
+    'ListInboundShipmentsByNextToken': (30, 2),
+    'ListInboundShipmentItems': (30, 2),
+    'ListInboundShipmentItemsByNextToken': (30, 2),
+    'GetInboundGuidanceForSKU': (200, 200),
+    'GetInboundGuidanceForASIN': (200, 200),
+    'CreateInboundShipmentPlan': (30, 2),
+    'CreateInboundShipment': (30, 2),
+    # Fulfillment Outbound Shipment
+    'ListAllFulfillmentOrders': (30, 2),
+    'ListAllFulfillmentOrdersByNextToken': (30, 2),
+    'GetFulfillmentOrder': (30, 2),
+    # Reports
+    'RequestReport': (15, 1 / 60.),
+    'GetReportRequestList': (10, 1 / 45.),
+    'GetReportRequestListByNextToken': (30, 1 / 2.),
+    'GetReportRequestCount': (10, 1 / 45.),
+    'GetReportList': (10, 1 / 60.),
+    'GetReportListByNextToken': (30, 1 / 2.),
+    'GetReportCount': (10, 1 / 45.),
+    'GetReport': (15, 1 / 60.),
+    'UpdateReportAcknowledgements': (10, 1 / 45.),
+}
+
+# Used for operations missing from the quotas table.
+DEFAULT_QUOTA = (10, 1)
+
+
+class MemoryBackend(object):
+    """
+    Token buckets stored in memory, shared by every thread of the process.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _refill(bucket, capacity, rate, now):
+        tokens, updated = bucket if bucket else (capacity, now)
+        return min(capacity, tokens + (now - updated) * rate)
+
+    def reserve(self, key, capacity, rate, now=None):
+        """
+        Take a token from the bucket, going into debt if it is empty.
+
+        :return: Number of seconds to wait before the request can be sent.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            tokens = self._refill(self.buckets.get(key), capacity, rate, now) - 1
+            self.buckets[key] = (tokens, now)
+        return -tokens / rate if tokens < 0 else 0
+
+    def update(self, key, capacity, rate, tokens, now=None):
+        """
+        Lower the number of tokens available in a bucket, ie. from the quota reported by Amazon.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            current = self._refill(self.buckets.get(key), capacity, rate, now)
+            self.buckets[key] = (min(current, tokens), now)
+
+
+class FileBackend(MemoryBackend):
+    """
+    Token buckets stored in a local json file so that they are shared across processes.
+    Access is serialized with an exclusive `fcntl` lock on the file.
+    """
+
+    def __init__(self, path):
+        if fcntl is None:
+            raise RuntimeError('FileBackend requires fcntl, it is not available on this platform')
+        super().__init__()
+        self.path = path
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        os.close(fd)
+
+    def _transaction(self, f):
+        with self._lock, open(self.path, 'r+') as fp:
+            fcntl.flock(fp, fcntl.LOCK_EX)
+            try:
+                content = fp.read()
+                buckets = json.loads(content) if content else {}
+                result = f(buckets)
+                fp.seek(0)
+                fp.truncate()
+                json.dump(buckets, fp)
+                fp.flush()
+            finally:
+                fcntl.flock(fp, fcntl.LOCK_UN)
+        return result
+
+    @staticmethod
+    def _key(key):
+        return '\t'.join(str(x) for x in key)
+
+    def reserve(self, key, capacity, rate, now=None):
+        now = time.time() if now is None else now
+
+        def take(buckets):
+            tokens = self._refill(buckets.get(self._key(key)), capacity, rate, now) - 1
+            buckets[self._key(key)] = (tokens, now)
+            return tokens
+
+        tokens = self._transaction(take)
+        return -tokens / rate if tokens < 0 else 0
+
+    def update(self, key, capacity, rate, tokens, now=None):
+        now = time.time() if now is None else now
+
+        def lower(buckets):
+            current = self._refill(buckets.get(self._key(key)), capacity, rate, now)
+            buckets[self._key(key)] = (min(current, tokens), now)
+
+        self._transaction(lower)
+
+
+class ThrottleGovernor(object):
+    """
+    Client side token bucket rate limiter keyed by (seller, operation).
+
+    `acquire` blocks just long enough for a request to fit in the MWS quota of the
+    operation. A single governor is meant to be shared by every client and thread,
+    use a :class:`FileBackend` to share it across processes as well.
+    """
+
+    def __init__(self, quotas=None, backend=None, sleep=time.sleep):
+        """
+        :param quotas: dict of operation: (max request quota, restore rate per second)
+            overriding :data:`DEFAULT_QUOTAS`.
+        :param backend: :class:`MemoryBackend` (default) or :class:`FileBackend`.
+        :param sleep:
+        """
+        self.quotas = dict(DEFAULT_QUOTAS)
+        self.quotas.update(quotas or {})
+        self.backend = backend or MemoryBackend()
+        self.sleep = sleep
+
+    def quota(self, operation):
+        return self.quotas.get(operation, DEFAULT_QUOTA)
+
+    def reserve(self, seller, operation):
+        """
+        Reserve a request slot without blocking.
+
+        :return: Number of seconds to wait before sending the request.
+        """
+        capacity, rate = self.quota(operation)
+        return self.backend.reserve((seller, operation), capacity, rate)
+
+    def acquire(self, seller, operation):
+        """
+        Block until a request for the operation can be sent.
+
+        :return: Number of seconds waited.
+        """
+        wait = self.reserve(seller, operation)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def throttled(self, seller, operation):
+        """
+        Empty the bucket after Amazon throttled a request.
+        """
+        instrumentation.count('mws.throttled', operation=operation)
+        capacity, rate = self.quota(operation)
+        self.backend.update((seller, operation), capacity, rate, 0)
+
+    def sync(self, seller, operation, headers):
+        """
+        Resync the bucket from the `x-mws-quota-*` headers of a response.
+
+        :param headers: Response headers.
+        """
+        remaining = headers.get('x-mws-quota-remaining') if headers else None
+        if remaining is None:
+            return
+        capacity, rate = self.quota(operation)
+        try:
+            remaining = float(remaining)
+        except ValueError:
+            return
+        self.backend.update((seller, operation), capacity, rate, remaining)
+
+
+def is_throttled(response):
+    """
+    Tell whether an error response is an MWS throttling error.
+    """
+    if response is None:
+        return False
+    return response.status_code == 503 and 'RequestThrottled' in (response.text or '')
@@ -1,33 +1,75 @@
+import time
+import threading
+
+
+# Position suffixes of list members, ie. `['1', '2', ...]`, to not format them again on every request.
+_POSITIONS = [str(i) for i in range(1, 1001)]
+
+
+def _positions(count):
+    global _POSITIONS
+    if count > len(_POSITIONS):
+        _POSITIONS = [str(i) for i in range(1, count + 1)]
+    return _POSITIONS
+
+
+def flatten_params(param, value, params=None):
+    """
+    Flatten a value into MWS request parameters in a single pass.
+
+    Dict values add their keys to the parameter name, list and tuple values their
+    1-based position, anything else is a leaf.
+    ie. flatten_params('InboundShipmentPlanRequestItems.member', [{'SellerSKU': 'a', 'Quantity': 1}])
+        returns
+        {
+            InboundShipmentPlanRequestItems.member.1.SellerSKU: 'a',
+            InboundShipmentPlanRequestItems.member.1.Quantity: 1
+        }
+    Args:
+        param (`str`): the beginning of the keys, with or without the trailing dot.
+        value: dict, list or leaf value.
+        params (`dict`): optional dict to add the parameters to.
+    Returns:
+        :obj:`dict`
+    """
+    if params is None:
+        params = {}
+    stack = [(str(param).rstrip('.'), value)]
+    while stack:
+        key, value = stack.pop()
+        if isinstance(value, dict):
+            children = value.items()
+        elif isinstance(value, (list, tuple)):
+            children = zip(_positions(len(value)), value)
+        else:
+            params[key] = value
+            continue
+        prefix = key + '.' if key else ''
+        for child_key, child in children:
+            if isinstance(child, (dict, list, tuple)):
+                stack.append((prefix + str(child_key), child))
+            else:
+                params[prefix + str(child_key)] = child
+    return params
+
+
 def enumerate_dict(param, dic):
     """
     Builds a dictionary of an enumerated parameter. Takes any dictionary and returns
     a dictionary recursively
-    ie. enumerate_list('MarketplaceIdList.Id', (123, 345, 4343))
+    ie. enumerate_dict('InboundShipmentHeader', {'ShipmentName': 'a', 'ShipFromAddress': {'Name': 'b'}})
         returns
         {
-            MarketplaceIdList.Id.1: 123,
-            MarketplaceIdList.Id.2: 345,
-            MarketplaceIdList.Id.3: 4343
+            InboundShipmentHeader.ShipmentName: 'a',
+            InboundShipmentHeader.ShipFromAddress.Name: 'b'
         }
     Args:
         param (`str`): the beginning of the key in the returned dictionary
-        values(`list`): the values in the returned dictionary
+        dic(`dict`): the values in the returned dictionary
     """
-
-    params = {}
-    if dic is not None:
-        if not param.endswith('.'):
-            param = "{}.".format(param)
-        for key, value in dic.items():
-            if isinstance(value, list):
-                for sub_key, sub_value in enumerate_list(param=key, values=value).items():
-                    params['{}{}'.format(key, sub_key)] = sub_value
-            elif isinstance(value, dict):
-                for sub_key, sub_value in enumerate_dict(param=key, dic=value).items():
-                    params['{}{}'.format(key, sub_key)] = sub_value
-            else:
-                params['{}{}'.format(param, key)] = value
-    return params
+    if dic is None:
+        return {}
+    return flatten_params(param, dic)
 
 
 def enumerate_list(param, values):
@@ -40,23 +82,49 @@ def enumerate_list(param, values):
             MarketplaceIdList.Id.2: 345,
             MarketplaceIdList.Id.3: 4343
         }
+    Dict and list values are flattened under their position, see :func:`flatten_params`.
     Args:
         param (`str`): the beginning of the key in the returned dictionary
         values(`list`): the values in the returned dictionary
     Returns:
-        :obj:`DictWrapper`
-    """
-    params = {}
-    if values is not None:
-        if not param.endswith('.'):
-            param = "{}.".format(param)
-        for num, value in enumerate(values):
-            if isinstance(value, list):
-                for sub_key, sub_value in enumerate_dict(num, dic=values).items():
-                    params['{}{}'.format(param, (num + 1))] = sub_value
-            elif isinstance(value, dict):
-                for sub_key, sub_value in enumerate_dict(num, dic=values).items():
-                    params['{}{}'.format(param, (num + 1))] = sub_value
-            else:
-                params['{}{}'.format(param, (num + 1))] = value
-    return params
+        :obj:`dict`
+    """
+    if values is None:
+        return {}
+    if not isinstance(values, (list, tuple)):
+        values = list(values)
+    return flatten_params(param, values)
+
+
+class TTLCache(object):
+    """
+    Thread safe in-memory mapping whose entries expire `ttl` seconds after being set.
+    """
+
+    def __init__(self, ttl=7 * 24 * 60 * 60, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < self.clock():
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
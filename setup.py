@@ -8,7 +8,7 @@ setup(
     author='Thomas Berdy',
     author_email='thomas.berdy@seelk.co',
     url='https://gitlab.seelk.io/seelk/open-source/mws_extensions',
-    packages=find_packages(),
+    packages=find_packages(exclude=('tests', 'tests.*')),
     classifiers=[
         "Development Status :: Beta",
         "Environment :: Web Environment",
@@ -22,6 +22,15 @@ setup(
         'python-dateutil',
         'lxml',
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'zstd': ['zstandard'],
+        'numpy': ['numpy'],
+        'arrow': ['pyarrow'],
+        'otel': ['opentelemetry-api'],
+        'sqs': ['boto3'],
+        'test': ['pytest', 'pytest-benchmark'],
+    },
     include_package_data=True,
     zip_safe=False,
 )
@@ -0,0 +1,32 @@
+"""
+Diffing two snapshots of 100k rows with 1% of them changed.
+"""
+import os
+import tempfile
+
+import pytest
+
+from mws_extensions.reports import SnapshotDiff
+from mws_extensions.reports.parsers import FlatFileParser
+
+from ..fake_server import flat_file_lines
+
+pytest.importorskip('pytest_benchmark')
+
+SNAPSHOT = list(FlatFileParser(report_type='_GET_FLAT_FILE_OPEN_LISTINGS_DATA_').iter_rows(flat_file_lines(100000)))
+CHANGED_SNAPSHOT = [dict(row, quantity=row['quantity'] + 1) if i % 100 == 0 else row for i, row in enumerate(SNAPSHOT)]
+
+
+@pytest.mark.benchmark(group='diff.100k_rows')
+def test_100k_rows_1pct_changed(benchmark):
+    with tempfile.TemporaryDirectory() as directory:
+        diff = SnapshotDiff(os.path.join(directory, 'listings.idx'), key='sku')
+
+        def setup():
+            diff.reset()
+            for _ in diff.diff(SNAPSHOT):
+                pass
+            return (), {}
+
+        changes = benchmark.pedantic(lambda: list(diff.diff(CHANGED_SNAPSHOT)), setup=setup, rounds=3)
+    assert len(changes) == 1000
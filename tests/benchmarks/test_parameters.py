@@ -0,0 +1,75 @@
+"""
+Building request parameters, against the `enumerate_param` of `python-amazon-mws` the
+clients used before :func:`flatten_params`.
+"""
+import pytest
+from mws.utils import enumerate_param
+
+from mws_extensions.utils import enumerate_list, enumerate_dict
+
+pytest.importorskip('pytest_benchmark')
+
+PLAN_ITEMS = [
+    {
+        'SellerSKU': 'SKU-{:06d}'.format(i),
+        'ASIN': 'B0{:08d}'.format(i),
+        'Condition': 'NewItem',
+        'Quantity': i % 50 + 1,
+        'QuantityInCase': 10,
+        'PrepDetailsList.PrepDetails': [
+            {'PrepInstruction': 'Labeling', 'PrepOwner': 'SELLER'},
+            {'PrepInstruction': 'Polybagging', 'PrepOwner': 'AMAZON'},
+        ],
+    }
+    for i in range(1000)
+]
+SKUS = [item['SellerSKU'] for item in PLAN_ITEMS]
+SHIPMENT_HEADER = {
+    'ShipmentName': 'name',
+    'ShipFromAddress': {'Name': 'name', 'AddressLine1': 'line', 'City': 'city', 'CountryCode': 'FR'},
+    'DestinationFulfillmentCenterId': 'ABC1',
+    'ShipmentStatus': 'WORKING',
+}
+
+
+def enumerate_param_nested(param, value):
+    # `enumerate_param` only handles scalar members, nested ones are enumerated level by level with it.
+    if isinstance(value, dict):
+        children = ((key, child) for key, child in value.items())
+    elif isinstance(value, list):
+        children = enumerate_param(param, value).items()
+        param = ''
+    else:
+        return {param: value}
+    params = {}
+    for key, child in children:
+        params.update(enumerate_param_nested('{}.{}'.format(param, key) if param else key, child))
+    return params
+
+
+@pytest.mark.benchmark(group='parameters.1000_skus')
+def test_1000_skus_enumerate_param(benchmark):
+    benchmark(enumerate_param, 'SellerSKUList.Id', SKUS)
+
+
+@pytest.mark.benchmark(group='parameters.1000_skus')
+def test_1000_skus_enumerate_list(benchmark):
+    params = benchmark(enumerate_list, 'SellerSKUList.Id', SKUS)
+    assert params == enumerate_param('SellerSKUList.Id', SKUS)
+
+
+@pytest.mark.benchmark(group='parameters.1000_plan_items')
+def test_1000_plan_items_enumerate_param(benchmark):
+    benchmark(enumerate_param_nested, 'InboundShipmentPlanRequestItems.member', PLAN_ITEMS)
+
+
+@pytest.mark.benchmark(group='parameters.1000_plan_items')
+def test_1000_plan_items_enumerate_list(benchmark):
+    params = benchmark(enumerate_list, 'InboundShipmentPlanRequestItems.member', PLAN_ITEMS)
+    assert params == enumerate_param_nested('InboundShipmentPlanRequestItems.member', PLAN_ITEMS)
+    assert len(params) == 9000
+
+
+@pytest.mark.benchmark(group='parameters.shipment_header')
+def test_shipment_header_enumerate_dict(benchmark):
+    benchmark(enumerate_dict, 'InboundShipmentHeader', SHIPMENT_HEADER)
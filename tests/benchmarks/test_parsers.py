@@ -0,0 +1,56 @@
+"""
+Streaming a synthetic _GET_FLAT_FILE_OPEN_LISTINGS_DATA_ report through FlatFileParser,
+against the naive `text.split('\\n')` approach.
+"""
+import pytest
+
+from mws_extensions.reports.parsers import FlatFileParser, to_decimal, to_int
+
+from ..fake_server import flat_file_lines
+
+pytest.importorskip('pytest_benchmark')
+
+REPORT_TYPE = '_GET_FLAT_FILE_OPEN_LISTINGS_DATA_'
+ROWS = 100000
+
+
+def parser_rows(rows):
+    count = 0
+    for _ in FlatFileParser(report_type=REPORT_TYPE).iter_rows(flat_file_lines(rows)):
+        count += 1
+    return count
+
+
+def parser_batches(rows):
+    count = 0
+    for batch in FlatFileParser(report_type=REPORT_TYPE).iter_batches(flat_file_lines(rows), 50000):
+        count += len(batch['sku'])
+    return count
+
+
+def naive_split(rows):
+    text = '\n'.join(flat_file_lines(rows))
+    lines = text.split('\n')
+    header = lines[0].split('\t')
+    result = []
+    for line in lines[1:]:
+        row = dict(zip(header, line.split('\t')))
+        row['price'] = to_decimal(row['price'])
+        row['quantity'] = to_int(row['quantity'])
+        result.append(row)
+    return len(result)
+
+
+@pytest.mark.benchmark(group='parsers.100k_rows')
+def test_100k_rows_parser_rows(benchmark):
+    assert benchmark.pedantic(parser_rows, args=(ROWS,), rounds=3) == ROWS
+
+
+@pytest.mark.benchmark(group='parsers.100k_rows')
+def test_100k_rows_parser_batches(benchmark):
+    assert benchmark.pedantic(parser_batches, args=(ROWS,), rounds=3) == ROWS
+
+
+@pytest.mark.benchmark(group='parsers.100k_rows')
+def test_100k_rows_naive_split(benchmark):
+    assert benchmark.pedantic(naive_split, args=(ROWS,), rounds=3) == ROWS
@@ -0,0 +1,58 @@
+"""
+Report pipeline against a local :class:`FakeMWSServer`.
+"""
+import pytest
+
+from mws_extensions.reports import AdvancedReports, BatchReports, BackoffSchedule
+from mws_extensions.sessions import SessionPool
+
+from ..fake_server import FakeMWSServer
+
+pytest.importorskip('pytest_benchmark')
+
+CREDENTIALS = dict(access_key='access', secret_key='secret', account_id='seller')
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FakeMWSServer(report_rows=10000, reports=1000) as server:
+        yield server
+
+
+@pytest.fixture(scope='module')
+def session_pool():
+    pool = SessionPool()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def client(server, session_pool):
+    def client(cls, *args):
+        return cls(*args, schedule=BackoffSchedule(initial=0.01, jitter=0), domain=server.domain,
+                   session_pool=session_pool, **CREDENTIALS)
+    return client
+
+
+@pytest.mark.benchmark(group='reports')
+def test_request_and_download_10k_rows(benchmark, client):
+    reports = client(AdvancedReports, '_GET_FLAT_FILE_OPEN_LISTINGS_DATA_')
+    assert len(benchmark(reports.request_and_download).splitlines()) == 10001
+
+
+@pytest.mark.benchmark(group='reports')
+def test_iter_report_list_1000_reports(benchmark, client):
+    reports = client(AdvancedReports, None)
+    assert benchmark(lambda: sum(1 for _ in reports.iter_report_list())) == 1000
+
+
+@pytest.mark.benchmark(group='reports')
+def test_batch_10_reports(benchmark, client):
+    def batch():
+        batch = client(BatchReports)
+        for i in range(10):
+            batch.add_job('_GET_FLAT_FILE_OPEN_LISTINGS_DATA_', marketplaceids=('M{}'.format(i),))
+        return batch.run()
+
+    jobs = benchmark.pedantic(batch, rounds=5)
+    assert all(job.downloaded for job in jobs)
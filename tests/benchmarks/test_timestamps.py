@@ -0,0 +1,72 @@
+"""
+Amazon timestamp conversion, against the previous dateutil implementation.
+"""
+import datetime
+
+import pytest
+from dateutil import parser
+
+from mws_extensions.reports.utils import from_amazon_timestamp, from_amazon_timestamps, to_amazon_timestamp
+
+pytest.importorskip('pytest_benchmark')
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# 100k values, 5000 distinct ones, like the dates of a large report.
+TIMESTAMPS = [(datetime.datetime(2020, 1, 1) + datetime.timedelta(minutes=i % 5000)).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+              for i in range(100000)]
+
+
+def legacy_from_amazon_timestamp(ts):
+    # Previous implementation: dateutil and two clock reads on every call.
+    offset = int(((datetime.datetime.utcnow() - datetime.datetime.now()) + datetime.timedelta(
+        seconds=1)).total_seconds() / 60 / 60)
+    return parser.parse(ts).replace(tzinfo=None) - datetime.timedelta(hours=offset)
+
+
+def cleared(*args):
+    """
+    `pedantic` setup emptying the memo before each round.
+    """
+    def setup():
+        from_amazon_timestamp.cache_clear()
+        return args, {}
+    return setup
+
+
+@pytest.mark.benchmark(group='timestamps.parse_2k')
+def test_parse_2k_legacy(benchmark):
+    benchmark(lambda: [legacy_from_amazon_timestamp(x) for x in TIMESTAMPS[:2000]])
+
+
+@pytest.mark.benchmark(group='timestamps.parse_2k')
+def test_parse_2k_no_memo(benchmark):
+    parse = from_amazon_timestamp.__wrapped__
+    benchmark(lambda: [parse(x) for x in TIMESTAMPS[:2000]])
+
+
+@pytest.mark.benchmark(group='timestamps.parse_column_100k')
+def test_parse_column_100k_memoized(benchmark):
+    benchmark.pedantic(lambda: [from_amazon_timestamp(x) for x in TIMESTAMPS], setup=cleared(), rounds=5)
+
+
+@pytest.mark.benchmark(group='timestamps.parse_column_100k')
+def test_parse_column_100k_batch(benchmark):
+    benchmark.pedantic(from_amazon_timestamps, setup=cleared(TIMESTAMPS), rounds=5)
+
+
+@pytest.mark.skipif(numpy is None, reason='numpy is not installed')
+@pytest.mark.benchmark(group='timestamps.parse_column_100k')
+def test_parse_column_100k_numpy(benchmark):
+    array = numpy.array(TIMESTAMPS)
+    result = benchmark.pedantic(from_amazon_timestamps, setup=cleared(array), rounds=5)
+    assert result.dtype == numpy.dtype('datetime64[us]')
+
+
+@pytest.mark.benchmark(group='timestamps.format_10k')
+def test_format_10k(benchmark):
+    value = datetime.datetime(2020, 1, 1)
+    benchmark(lambda: [to_amazon_timestamp(value) for _ in range(10000)])
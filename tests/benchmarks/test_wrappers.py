@@ -0,0 +1,45 @@
+"""
+Parsing a GetReportList page of 100 entries with the element wrappers, against one
+uncompiled `element.xpath` per field like the wrappers used to.
+"""
+from functools import partial
+
+import pytest
+from lxml import etree
+
+from mws_extensions.reports.base import GetReportListResponse
+
+from ..fake_server import REPORTS_NAMESPACE, report_info_xml, report_list_xml
+
+pytest.importorskip('pytest_benchmark')
+
+FIELDS = ('ReportType', 'Acknowledged', 'AcknowledgedDate', 'ReportId', 'ReportRequestId', 'AvailableDate')
+PAGE = report_list_xml([report_info_xml(1000 + i, 5000 + i, available_date='2020-01-{:02d}T10:00:00+00:00'.format(
+    i % 28 + 1)) for i in range(100)], 'token').encode()
+
+
+def baseline(page):
+    # Only extracts the text, the wrappers also parse dates and booleans.
+    element = etree.fromstring(page)
+    xpath = partial(element.xpath, namespaces={'a': REPORTS_NAMESPACE})
+    result = []
+    for info in xpath('./a:GetReportListResult//a:ReportInfo'):
+        info_xpath = partial(info.xpath, namespaces={'a': REPORTS_NAMESPACE})
+        result.append({field: (info_xpath('./a:{}/text()'.format(field)) or [None])[0] for field in FIELDS})
+    return result
+
+
+@pytest.mark.benchmark(group='wrappers.report_list_page')
+def test_report_list_page_baseline_xpath(benchmark):
+    assert len(benchmark(baseline, PAGE)) == 100
+
+
+@pytest.mark.benchmark(group='wrappers.report_list_page')
+def test_report_list_page_wrappers(benchmark):
+    result = benchmark(lambda: GetReportListResponse.load(PAGE).to_dict())
+    assert len(result['report_info_list']) == 100
+
+
+@pytest.mark.benchmark(group='wrappers.report_list_page')
+def test_report_list_page_records(benchmark):
+    assert len(benchmark(GetReportListResponse.load_records, PAGE)) == 100
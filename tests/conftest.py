@@ -0,0 +1,33 @@
+"""
+`mws==0.8.6` parses responses with `Element.getchildren()`, which was removed in Python 3.9,
+so `DictWrapper` raises AttributeError on any xml response. Use the same parser with
+`list(node)` when running on such a Python, so that the clients can be tested
+end to end against :class:`tests.fake_server.FakeMWSServer`.
+"""
+from xml.etree import ElementTree
+
+from mws import utils
+
+
+def _parse_node(self, node):
+    tree = utils.ObjectDict()
+    if node.text:
+        tree.value = node.text
+    for key, value in node.attrib.items():
+        key, value = self._namespace_split(key, utils.ObjectDict({'value': value}))
+        tree[key] = value
+    for child in list(node):
+        tag, child_tree = self._namespace_split(child.tag, self._parse_node(child))
+        if tag not in tree:
+            tree[tag] = child_tree
+            continue
+        old = tree[tag]
+        if not isinstance(old, list):
+            tree.pop(tag)
+            tree[tag] = [old]
+        tree[tag].append(child_tree)
+    return tree
+
+
+if not hasattr(ElementTree.Element, 'getchildren'):
+    utils.XML2Dict._parse_node = _parse_node
@@ -0,0 +1,299 @@
+"""
+Local fake MWS endpoint and synthetic responses, to test and benchmark the clients offline.
+
+    with FakeMWSServer(latency=0.05, processing_time=2) as server:
+        reports = AdvancedReports('_GET_FLAT_FILE_OPEN_LISTINGS_DATA_', domain=server.domain, ...)
+        reports.request_and_download()
+"""
+import time
+import socket
+import base64
+import hashlib
+import itertools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from urllib.parse import urlsplit, parse_qsl
+except ImportError:
+    from urlparse import urlsplit, parse_qsl
+
+from mws_extensions.reports.notifications import report_notification_xml
+
+REPORTS_NAMESPACE = 'http://mws.amazonaws.com/doc/2009-01-01/'
+OPEN_LISTINGS_HEADER = 'sku\tasin\tprice\tquantity'
+
+
+def _element(tag, value):
+    return '<{0}>{1}</{0}>'.format(tag, value) if value is not None else ''
+
+
+def report_info_xml(report_id, report_request_id, report_type='_GET_FLAT_FILE_OPEN_LISTINGS_DATA_',
+                    available_date='2020-01-01T10:00:00+00:00', acknowledged=False):
+    return '<ReportInfo>{}{}{}{}{}</ReportInfo>'.format(
+        _element('ReportId', report_id),
+        _element('ReportType', report_type),
+        _element('ReportRequestId', report_request_id),
+        _element('AvailableDate', available_date),
+        _element('Acknowledged', 'true' if acknowledged else 'false'),
+    )
+
+
+def report_request_info_xml(report_request_id, report_type='_GET_FLAT_FILE_OPEN_LISTINGS_DATA_',
+                            status='_DONE_', generated_report_id=None, start_date='2020-01-01T00:00:00+00:00',
+                            end_date='2020-01-31T00:00:00+00:00', submitted_date='2020-01-31T00:00:00+00:00',
+                            started_processing_date=None, completed_date=None):
+    return '<ReportRequestInfo>{}{}{}{}<Scheduled>false</Scheduled>{}{}{}{}{}</ReportRequestInfo>'.format(
+        _element('ReportRequestId', report_request_id),
+        _element('ReportType', report_type),
+        _element('StartDate', start_date),
+        _element('EndDate', end_date),
+        _element('SubmittedDate', submitted_date),
+        _element('ReportProcessingStatus', status),
+        _element('GeneratedReportId', generated_report_id),
+        _element('StartedProcessingDate', started_processing_date),
+        _element('CompletedDate', completed_date),
+    )
+
+
+def _list_response(action, entries, next_token=None):
+    return (
+        '<{action}Response xmlns="{ns}"><{action}Result>{next_token}<HasNext>{has_next}</HasNext>{entries}'
+        '</{action}Result><ResponseMetadata><RequestId>fake-request-id</RequestId></ResponseMetadata>'
+        '</{action}Response>'
+    ).format(action=action, ns=REPORTS_NAMESPACE, entries=''.join(entries),
+             next_token=_element('NextToken', next_token), has_next='true' if next_token else 'false')
+
+
+def report_list_xml(infos, next_token=None, action='GetReportList'):
+    """
+    :param infos: iterable of :func:`report_info_xml`
+    """
+    return _list_response(action, infos, next_token)
+
+
+def report_request_list_xml(infos, next_token=None, action='GetReportRequestList'):
+    """
+    :param infos: iterable of :func:`report_request_info_xml`
+    """
+    return _list_response(action, infos, next_token)
+
+
+def request_report_xml(info):
+    return (
+        '<RequestReportResponse xmlns="{ns}"><RequestReportResult>{info}</RequestReportResult>'
+        '<ResponseMetadata><RequestId>fake-request-id</RequestId></ResponseMetadata></RequestReportResponse>'
+    ).format(ns=REPORTS_NAMESPACE, info=info)
+
+
+def error_xml(code, message=''):
+    return (
+        '<ErrorResponse xmlns="{ns}"><Error><Type>Sender</Type><Code>{code}</Code><Message>{message}</Message>'
+        '</Error><RequestId>fake-request-id</RequestId></ErrorResponse>'
+    ).format(ns=REPORTS_NAMESPACE, code=code, message=message)
+
+
+def flat_file_lines(rows):
+    """
+    Synthetic _GET_FLAT_FILE_OPEN_LISTINGS_DATA_ report lines, header included.
+    """
+    yield OPEN_LISTINGS_HEADER
+    for i in range(rows):
+        yield 'SKU-{0:08d}\tB0{0:08d}\t{1}.{2:02d}\t{3}'.format(i, i % 500, i % 100, i % 37)
+
+
+def flat_file_report(rows):
+    return ('\n'.join(flat_file_lines(rows)) + '\n').encode()
+
+
+class FakeMWSServer(object):
+    """
+    Threaded local HTTP server answering the Reports API like Amazon would, with
+    simulated latency, throttling, NextToken paging and report processing time.
+
+    Requests are not authenticated, so any credentials work. Point the clients at
+    :attr:`domain`, ie. `AdvancedReports(..., domain=server.domain)`.
+    """
+
+    def __init__(self, latency=0.0, processing_time=0.0, page_size=100, report_rows=1000, reports=0,
+                 quotas=None, notifications=None):
+        """
+        :param latency: Seconds added to every response.
+        :param processing_time: Seconds between a RequestReport and its report being `_DONE_`.
+        :param page_size: Number of entries of a GetReportList / GetReportRequestList page.
+        :param report_rows: Number of rows of the generated flat file reports.
+        :param reports: Number of already generated reports returned by GetReportList.
+        :param quotas: dict of operation: (maximum request quota, restore rate per second).
+            Requests over quota get a 503 RequestThrottled. Operations missing are not throttled.
+        :param notifications: Optional :class:`LocalQueue` receiving a `ReportProcessingFinished`
+            notification when each requested report is done.
+        """
+        self.latency = latency
+        self.processing_time = processing_time
+        self.page_size = page_size
+        self.report_rows = report_rows
+        self.quotas = quotas or {}
+        self.notifications = notifications
+        self.calls = {}
+        self.throttled = 0
+        self.requests = {}
+        self._buckets = {}
+        self._ids = itertools.count(50000)
+        self._lock = threading.Lock()
+        self._reports = {}
+        self._listings = {}
+        self._report_infos = [report_info_xml(10000 + i, 20000 + i) for i in range(reports)]
+        self._server = None
+        self._thread = None
+
+    @property
+    def domain(self):
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            wbufsize = -1
+
+            def setup(self):
+                super().setup()
+                # Don't let Nagle's algorithm delay the last segment of kept alive responses.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def _respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                status, body, headers = server.handle(dict(parse_qsl(urlsplit(self.path).query)))
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-mws', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _take(self, operation):
+        quota = self.quotas.get(operation)
+        if quota is None:
+            return True
+        capacity, rate = quota
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(operation, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens < 1:
+                self._buckets[operation] = (tokens, now)
+                self.throttled += 1
+                return False
+            self._buckets[operation] = (tokens - 1, now)
+            return True
+
+    def handle(self, params):
+        """
+        :param params: dict of the query parameters.
+        :return: (status code, body bytes, headers dict)
+        """
+        action = params.get('Action', '')
+        with self._lock:
+            self.calls[action] = self.calls.get(action, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        if not self._take(action):
+            return 503, error_xml('RequestThrottled', 'Request is throttled').encode(), {'Content-Type': 'text/xml'}
+
+        handler = getattr(self, '_' + action, None)
+        if handler is None:
+            return 400, error_xml('InvalidParameterValue', 'Unknown action').encode(), {'Content-Type': 'text/xml'}
+        body = handler(params)
+        if isinstance(body, tuple):
+            return body
+        return 200, body.encode(), {'Content-Type': 'text/xml'}
+
+    def _request_info(self, report_request_id):
+        request = self.requests[report_request_id]
+        elapsed = time.monotonic() - request['time']
+        if elapsed >= self.processing_time:
+            return report_request_info_xml(report_request_id, request['report_type'], '_DONE_',
+                                           'G{}'.format(report_request_id),
+                                           started_processing_date='2020-01-31T00:00:01+00:00',
+                                           completed_date='2020-01-31T00:01:00+00:00')
+        status = '_IN_PROGRESS_' if elapsed >= self.processing_time / 2 else '_SUBMITTED_'
+        return report_request_info_xml(report_request_id, request['report_type'], status)
+
+    def _RequestReport(self, params):
+        report_request_id = str(next(self._ids))
+        with self._lock:
+            self.requests[report_request_id] = dict(report_type=params.get('ReportType'), time=time.monotonic())
+        if self.notifications is not None:
+            notification = report_notification_xml(report_request_id, 'G{}'.format(report_request_id),
+                                                   params.get('ReportType'), seller_id=params.get('SellerId', ''))
+            timer = threading.Timer(self.processing_time, self.notifications.send, (notification,))
+            timer.daemon = True
+            timer.start()
+        return request_report_xml(self._request_info(report_request_id))
+
+    def _page(self, action, entries, offset, listing=''):
+        page = entries[offset:offset + self.page_size]
+        next_token = None
+        if offset + self.page_size < len(entries):
+            next_token = '{}:{}'.format(listing, offset + self.page_size) if listing else str(offset + self.page_size)
+        return _list_response(action, page, next_token)
+
+    def _GetReportRequestList(self, params):
+        ids = [value for key, value in params.items() if key.startswith('ReportRequestIdList.Id.')]
+        ids = [x for x in ids if x in self.requests] if ids else list(self.requests)
+        # The next pages list the same requests, the filter isn't sent again with the token.
+        listing = str(next(self._ids))
+        with self._lock:
+            self._listings[listing] = ids
+        return self._page('GetReportRequestList', [self._request_info(x) for x in ids], 0, listing)
+
+    def _GetReportRequestListByNextToken(self, params):
+        listing, offset = params['NextToken'].split(':')
+        infos = [self._request_info(x) for x in self._listings[listing]]
+        return self._page('GetReportRequestListByNextToken', infos, int(offset), listing)
+
+    def _GetReportList(self, params):
+        return self._page('GetReportList', self._report_infos, 0)
+
+    def _GetReportListByNextToken(self, params):
+        return self._page('GetReportListByNextToken', self._report_infos, int(params['NextToken']))
+
+    def _GetReport(self, params):
+        report_id = params.get('ReportId')
+        body = self._reports.get(report_id)
+        if body is None:
+            body = self._reports[report_id] = flat_file_report(self.report_rows)
+        md5 = base64.b64encode(hashlib.md5(body).digest()).decode()
+        return 200, body, {'Content-Type': 'text/plain;charset=UTF-8', 'Content-MD5': md5}
+
+    def _UpdateReportAcknowledgements(self, params):
+        return (
+            '<UpdateReportAcknowledgementsResponse xmlns="{ns}"><UpdateReportAcknowledgementsResult>'
+            '<Count>1</Count></UpdateReportAcknowledgementsResult></UpdateReportAcknowledgementsResponse>'
+        ).format(ns=REPORTS_NAMESPACE)
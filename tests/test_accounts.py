@@ -0,0 +1,139 @@
+import time
+import threading
+import unittest
+from concurrent.futures import wait
+
+from mws_extensions.accounts import Account, AccountRegistry, AccountResults, MultiAccountExecutor
+from mws_extensions.bulk import BulkError
+
+
+class FakeClient(object):
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.account_id = kwargs['account_id']
+
+
+def registry(*names):
+    return AccountRegistry(Account(name, 'access', 'secret', name) for name in names)
+
+
+class Recorder(object):
+    """
+    Job recording the order in which the jobs start and the concurrency per account.
+    """
+
+    def __init__(self, duration=0.01):
+        self.duration = duration
+        self.started = []
+        self.running = {}
+        self.max_running = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, client, index):
+        account = client.account_id
+        with self.lock:
+            self.started.append(account)
+            self.running[account] = self.running.get(account, 0) + 1
+            self.max_running[account] = max(self.max_running.get(account, 0), self.running[account])
+        time.sleep(self.duration)
+        with self.lock:
+            self.running[account] -= 1
+        return account, index
+
+
+class MultiAccountExecutorTest(unittest.TestCase):
+
+    def test_round_robin_fairness(self):
+        job = Recorder()
+        with MultiAccountExecutor(registry('big', 'small1', 'small2'), max_workers=2, per_account=1) as executor:
+            futures = [executor.submit('big', FakeClient, job, i) for i in range(20)]
+            futures += [executor.submit(name, FakeClient, job, i) for name in ('small1', 'small2') for i in range(3)]
+            results = executor.gather(futures)
+
+        self.assertTrue(results.ok)
+        self.assertEqual(len(results.results['big']), 20)
+        self.assertEqual(job.max_running, {'big': 1, 'small1': 1, 'small2': 1})
+        # The small accounts take turns with the big one instead of waiting for its 20 jobs.
+        last_small = max(i for i, account in enumerate(job.started) if account != 'big')
+        self.assertLess(job.started[:last_small].count('big'), 8)
+
+    def test_per_account_limit(self):
+        job = Recorder(duration=0.02)
+        with MultiAccountExecutor(registry('a', 'b'), max_workers=8, per_account=2) as executor:
+            executor.gather([executor.submit(name, FakeClient, job, i) for name in ('a', 'b') for i in range(10)])
+        self.assertEqual(job.max_running, {'a': 2, 'b': 2})
+
+    def test_warm_clients(self):
+        with MultiAccountExecutor(registry('a', 'b'), max_workers=4) as executor:
+            results = executor.gather([executor.submit(name, FakeClient, lambda client: client)
+                                       for name in ('a', 'a', 'b')])
+            self.assertIs(results.results['a'][0], results.results['a'][1])
+            self.assertIsNot(results.results['a'][0], results.results['b'][0])
+            client = results.results['a'][0]
+            self.assertIs(client.kwargs['governor'], executor.governor)
+            self.assertEqual(client.kwargs['access_key'], 'access')
+
+    def test_errors_grouped_per_account(self):
+        def job(client, fail):
+            if fail:
+                raise ValueError(client.account_id)
+            return client.account_id
+
+        with MultiAccountExecutor(registry('a', 'b', 'c')) as executor:
+            results = executor.gather([
+                executor.submit('a', FakeClient, job, False),
+                executor.submit('b', FakeClient, job, True),
+                executor.submit('b', FakeClient, job, False),
+                executor.submit('c', FakeClient, job, True),
+            ])
+
+        self.assertFalse(results.ok)
+        self.assertEqual(dict(results.results), {'a': ['a'], 'b': ['b']})
+        self.assertEqual({name: [str(e) for e in errors] for name, errors in results.errors.items()},
+                         {'b': ['b'], 'c': ['c']})
+        with self.assertRaises(BulkError) as raised:
+            results.raise_for_errors()
+        self.assertEqual(sorted(raised.exception.errors), ['b', 'c'])
+
+    def test_map_accounts(self):
+        with MultiAccountExecutor(registry('a', 'b')) as executor:
+            results = executor.map_accounts(FakeClient, lambda client, suffix: client.account_id + suffix, '!')
+        self.assertEqual(dict(results.results), {'a': ['a!'], 'b': ['b!']})
+
+    def test_unknown_account(self):
+        with MultiAccountExecutor(registry('a')) as executor:
+            with self.assertRaises(KeyError):
+                executor.submit('missing', FakeClient, lambda client: None)
+
+    def test_shutdown_runs_queued_jobs(self):
+        job = Recorder()
+        with MultiAccountExecutor(registry('a', 'b'), max_workers=2, per_account=1) as executor:
+            futures = [executor.submit(name, FakeClient, job, i) for i in range(3) for name in ('a', 'b')]
+        done, not_done = wait(futures, timeout=5)
+        self.assertFalse(not_done)
+        self.assertTrue(executor.gather(futures).ok)
+        with self.assertRaises(RuntimeError):
+            executor.submit('a', FakeClient, job, 0)
+
+    def test_shutdown_cancel_futures(self):
+        release = threading.Event()
+        executor = MultiAccountExecutor(registry('a', 'b'), max_workers=2, per_account=1)
+        futures = [executor.submit(name, FakeClient, lambda client: release.wait(5)) for i in range(3)
+                   for name in ('a', 'b')]
+        executor.shutdown(wait=False, cancel_futures=True)
+        release.set()
+        done, not_done = wait(futures, timeout=5)
+        self.assertFalse(not_done)
+        self.assertEqual([future.cancelled() for future in futures], [False, False, True, True, True, True])
+        self.assertEqual([future.result() for future in futures[:2]], [True, True])
+
+
+class AccountResultsTest(unittest.TestCase):
+
+    def test_repr(self):
+        self.assertEqual(repr(AccountResults()), '<AccountResults results=0 errors=0>')
+
+
+if __name__ == '__main__':
+    unittest.main()
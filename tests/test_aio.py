@@ -0,0 +1,127 @@
+import io
+import gzip
+import asyncio
+import tempfile
+import unittest
+
+from mws_extensions.throttle import ThrottleGovernor
+from mws_extensions.reports import BackoffSchedule, ReportCache
+
+from .fake_server import FakeMWSServer, flat_file_report
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+else:
+    from mws_extensions.aio import AsyncTransport, AsyncInboundShipments
+    from mws_extensions.reports.aio import AsyncAdvancedReports
+
+REPORT_TYPE = '_GET_FLAT_FILE_OPEN_LISTINGS_DATA_'
+
+
+def credentials(seller):
+    return dict(access_key='access', secret_key='secret', account_id=seller)
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class AsyncAdvancedReportsTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.server = FakeMWSServer(processing_time=0.2, report_rows=100).start()
+        self.addCleanup(self.server.stop)
+
+    async def asyncSetUp(self):
+        self.transport = AsyncTransport()
+
+    async def asyncTearDown(self):
+        await self.transport.close()
+
+    def client(self, seller, **kwargs):
+        kwargs.setdefault('schedule', BackoffSchedule(initial=0.05, jitter=0))
+        return AsyncAdvancedReports(REPORT_TYPE, domain=self.server.domain, transport=self.transport,
+                                    **dict(credentials(seller), **kwargs))
+
+    async def test_concurrent_request_and_download(self):
+        clients = [self.client('seller{}'.format(i)) for i in range(5)]
+        reports = await asyncio.gather(*(client.request_and_download() for client in clients))
+
+        self.assertEqual(reports, [flat_file_report(100).decode()] * 5)
+        self.assertEqual(self.server.calls['RequestReport'], 5)
+        self.assertEqual(self.server.calls['GetReport'], 5)
+        self.assertEqual(self.server.calls['UpdateReportAcknowledgements'], 5)
+
+    async def test_request_and_download_to_dest(self):
+        dest = io.BytesIO()
+        size = await self.client('seller').request_and_download(dest=dest, compression='gzip')
+        self.assertEqual(size, len(flat_file_report(100)))
+        self.assertEqual(gzip.decompress(dest.getvalue()), flat_file_report(100))
+
+    async def test_throttled_requests_retried(self):
+        # The client expects a larger quota than the one Amazon enforces.
+        self.server.quotas = {'RequestReport': (1, 10)}
+        governor = ThrottleGovernor(quotas={'RequestReport': (3, 5)})
+        clients = [self.client('seller', governor=governor) for _ in range(3)]
+        responses = await asyncio.gather(*(client.request() for client in clients))
+
+        self.assertGreater(self.server.throttled, 0)
+        self.assertEqual(len({x.request_report_result.report_request_id for x in responses}), 3)
+
+    async def test_sync_only_helpers(self):
+        client = self.client('seller')
+        with self.assertRaisesRegex(TypeError, r'AsyncAdvancedReports.iter_report_list\(\)'):
+            client.iter_report_list()
+        with self.assertRaises(TypeError):
+            client.run_job(None)
+        with self.assertRaises(TypeError):
+            AsyncInboundShipments(domain=self.server.domain, **credentials('seller')).iter_inbound_shipments()
+
+    def test_unsupported_options(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaisesRegex(TypeError, '`cache`'):
+                self.client('seller', cache=ReportCache(directory))
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class AsyncTransportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeMWSServer().start()
+        self.addCleanup(self.server.stop)
+
+    def request(self, transport):
+        url = self.server.domain + '/?Action=GetReportList'
+        return transport.request('GET', url)
+
+    def test_session_per_event_loop(self):
+        transport = AsyncTransport()
+
+        async def run():
+            response = await self.request(transport)
+            self.assertEqual(response.status_code, 200)
+            return await transport.get_session()
+
+        first = asyncio.run(run())
+        self.assertFalse(first.closed)
+        # The session of a finished event loop is replaced, and closed, in the next one.
+        second = asyncio.run(run())
+        self.assertIsNot(first, second)
+        self.assertTrue(first.closed)
+
+        asyncio.run(transport.close())
+        self.assertTrue(second.closed)
+
+    def test_session_reused_within_a_loop(self):
+        async def run():
+            async with AsyncTransport() as transport:
+                responses = await asyncio.gather(*(self.request(transport) for _ in range(10)))
+                session = await transport.get_session()
+                self.assertIs(session, await transport.get_session())
+            self.assertTrue(session.closed)
+            return responses
+
+        self.assertEqual([response.status_code for response in asyncio.run(run())], [200] * 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
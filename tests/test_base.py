@@ -0,0 +1,76 @@
+import unittest
+
+from mws_extensions.metrics import instrumentation, CallbackSink
+from mws_extensions.reports.base import GetReportListResponse, GetReportRequestListResponse
+
+from .fake_server import report_info_xml, report_list_xml, report_request_info_xml, report_request_list_xml
+
+PAGE = report_list_xml([report_info_xml(1000 + i, 5000 + i) for i in range(3)], 'token').encode()
+
+
+def counting(response_class):
+    """
+    Subclass of a response wrapper counting its xpath evaluations.
+    """
+    class Counting(response_class):
+        evaluated = 0
+
+        def xpath(self, expression):
+            Counting.evaluated += 1
+            return super().xpath(expression)
+    return Counting
+
+
+class WrapperFieldsTest(unittest.TestCase):
+
+    def assertFieldsCached(self, response_class, page):
+        response_class = counting(response_class)
+        response = response_class.load(page)
+        fields = (response.request_id, response.has_next, response.next_token)
+        self.assertEqual(fields, ('fake-request-id', True, 'token'))
+        self.assertEqual(response_class.evaluated, 3)
+        for _ in range(3):
+            self.assertEqual((response.request_id, response.has_next, response.next_token), fields)
+        self.assertEqual(response_class.evaluated, 3)
+
+    def test_report_list_fields_cached(self):
+        self.assertFieldsCached(GetReportListResponse, PAGE)
+
+    def test_report_request_list_fields_cached(self):
+        page = report_request_list_xml([report_request_info_xml('1')], 'token').encode()
+        self.assertFieldsCached(GetReportRequestListResponse, page)
+
+    def test_fields_of_each_instance(self):
+        first = GetReportListResponse.load(PAGE)
+        second = GetReportListResponse.load(report_list_xml([]).encode())
+        self.assertEqual((first.has_next, first.next_token), (True, 'token'))
+        self.assertEqual((second.has_next, second.next_token), (False, None))
+
+
+class WrapperInstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.measurements = []
+        sink = instrumentation.add_sink(CallbackSink(self.measurements.append))
+        self.addCleanup(instrumentation.remove_sink, sink)
+
+    def test_parse_and_extract_timers(self):
+        response = GetReportListResponse.load(PAGE)
+        self.assertEqual([(x.name, x.labels) for x in self.measurements],
+                         [('mws.wrapper.parse', {'operation': 'GetReportList'})])
+
+        del self.measurements[:]
+        infos = response.report_info_list()
+        self.assertEqual([info.report_id for info in infos], ['1000', '1001', '1002'])
+        self.assertEqual({(x.name, x.labels['operation']) for x in self.measurements},
+                         {('mws.wrapper.extract', 'ReportInfo')})
+        # One pass over the children of each entry, then one lookup per field.
+        self.assertEqual(len(self.measurements), 6)
+
+        del self.measurements[:]
+        [info.report_id for info in infos]
+        self.assertEqual(self.measurements, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
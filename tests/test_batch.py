@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mws_extensions.reports import BatchReports, BackoffSchedule, ReportJob, StatusPoller, JobJournal
+from mws_extensions.reports.jobs import ACKNOWLEDGED, FAILED
+from mws_extensions.sessions import SessionPool
+
+from .fake_server import FakeMWSServer, flat_file_report
+
+REPORT_TYPE = '_GET_FLAT_FILE_OPEN_LISTINGS_DATA_'
+CREDENTIALS = dict(access_key='access', secret_key='secret', account_id='seller')
+
+
+class FakeServerTestCase(unittest.TestCase):
+
+    server_options = {}
+
+    def setUp(self):
+        self.server = FakeMWSServer(**self.server_options).start()
+        self.addCleanup(self.server.stop)
+        self.pool = SessionPool()
+        self.addCleanup(self.pool.close)
+
+    def batch(self, jobs=(), **kwargs):
+        return BatchReports(jobs, schedule=BackoffSchedule(initial=0.01, jitter=0), domain=self.server.domain,
+                            session_pool=self.pool, **dict(CREDENTIALS, **kwargs))
+
+
+class StatusPollerTest(FakeServerTestCase):
+
+    server_options = dict(page_size=2, report_rows=10)
+
+    def setUp(self):
+        super().setUp()
+        self.reports = self.batch()
+        self.ids = [self.reports.request().request_report_result.report_request_id for _ in range(7)]
+
+    def test_fetch_follows_next_token_pages(self):
+        poller = StatusPoller(self.reports, max_count=2)
+        infos = poller.fetch(self.ids[1:6])
+
+        self.assertEqual(sorted(infos), sorted(self.ids[1:6]))
+        self.assertEqual([info.report_request_id for info in infos.values()], self.ids[1:6])
+        self.assertEqual(self.server.calls['GetReportRequestList'], 1)
+        self.assertEqual(self.server.calls['GetReportRequestListByNextToken'], 2)
+
+    def test_poll_routes_infos_to_waiters(self):
+        poller = StatusPoller(self.reports)
+        seen = []
+        for report_request_id in self.ids[:3]:
+            poller.register(report_request_id, lambda info: seen.append(info.report_request_id) or True)
+        poller.register(self.ids[3], lambda info: False)
+
+        self.assertEqual(poller.poll(), self.ids[:3])
+        self.assertEqual(seen, self.ids[:3])
+        self.assertEqual(poller.pending, [self.ids[3]])
+
+    def test_fetch_nothing(self):
+        self.assertEqual(StatusPoller(self.reports).fetch(()), {})
+        self.assertNotIn('GetReportRequestList', self.server.calls)
+
+
+class BatchReportsTest(FakeServerTestCase):
+
+    server_options = dict(processing_time=0.05, report_rows=10)
+
+    def test_run(self):
+        batch = self.batch()
+        for i in range(3):
+            batch.add_job(REPORT_TYPE, marketplaceids=('M{}'.format(i),))
+        jobs = batch.run()
+
+        self.assertEqual([job.contents for job in jobs], [flat_file_report(10).decode()] * 3)
+        self.assertEqual(self.server.calls['RequestReport'], 3)
+
+    def test_jobs_sharing_a_report_request(self):
+        first = ReportJob(REPORT_TYPE)
+        batch = self.batch([first])
+        batch.submit(first)
+        second = ReportJob(REPORT_TYPE, marketplaceids=('M1',))
+        second.report_request_id = first.report_request_id
+        batch.jobs.append(second)
+
+        completed = list(batch.iter_completed())
+
+        self.assertEqual(completed, [first, second])
+        self.assertTrue(first.downloaded and second.downloaded)
+        self.assertEqual(self.server.calls['RequestReport'], 1)
+
+    def test_failed_download_does_not_abort_the_batch(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        journal = JobJournal(os.path.join(directory, 'jobs.db'))
+        batch = self.batch(journal=journal)
+        first = batch.add_job(REPORT_TYPE, marketplaceids=('M1',))
+        broken = batch.add_job(REPORT_TYPE, marketplaceids=('M2',), dest=os.path.join(directory, 'missing', 'report'))
+        last = batch.add_job(REPORT_TYPE, marketplaceids=('M3',))
+
+        jobs = batch.run()
+
+        self.assertEqual(jobs, [first, broken, last])
+        self.assertEqual(first.contents, flat_file_report(10).decode())
+        self.assertEqual(last.contents, flat_file_report(10).decode())
+        self.assertIsInstance(broken.error, OSError)
+        self.assertFalse(broken.downloaded)
+        self.assertEqual({job.job_id: job.stage for job in journal.jobs()},
+                         {first.job_id: ACKNOWLEDGED, broken.job_id: FAILED, last.job_id: ACKNOWLEDGED})
+
+
+if __name__ == '__main__':
+    unittest.main()
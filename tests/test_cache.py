@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import datetime
+import tempfile
+import unittest
+
+from mws_extensions.reports import AdvancedReports, BackoffSchedule, ReportCache
+from mws_extensions.sessions import SessionPool
+
+from .fake_server import FakeMWSServer, flat_file_report
+
+REPORT_TYPE = '_GET_FLAT_FILE_OPEN_LISTINGS_DATA_'
+
+
+class ReportCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.cache = ReportCache(self.directory)
+
+    def test_read_text_with_response_encoding(self):
+        key = self.cache.key(REPORT_TYPE)
+        self.cache.put(key, [b'sku\tprice\n', b'caf\xe9\t1,50\n'], encoding='Cp1252')
+        entry = self.cache.get(key)
+        self.assertEqual(entry.encoding, 'Cp1252')
+        self.assertEqual(entry.read_text(), 'sku\tprice\ncafé\t1,50\n')
+
+    def test_read_text_defaults_to_utf8(self):
+        key = self.cache.key(REPORT_TYPE)
+        self.cache.put(key, ['café\n'.encode()])
+        self.assertEqual(self.cache.get(key).read_text(), 'café\n')
+
+    def test_index_without_encoding_column(self):
+        db = sqlite3.connect(os.path.join(self.directory, 'index.sqlite'))
+        with db:
+            db.execute('DROP TABLE entries')
+            db.execute('CREATE TABLE entries ('
+                       'key TEXT PRIMARY KEY, digest TEXT, size INTEGER, created REAL, accessed REAL, metadata TEXT)')
+        db.close()
+        cache = ReportCache(self.directory)
+        key = cache.key(REPORT_TYPE)
+        cache.put(key, [b'caf\xe9\n'], encoding='latin-1')
+        self.assertEqual(cache.get(key).read_text(), 'café\n')
+
+
+class CachedRequestAndDownloadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeMWSServer(report_rows=10).start()
+        self.addCleanup(self.server.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = ReportCache(directory.name)
+        self.pool = SessionPool()
+        self.addCleanup(self.pool.close)
+        self.reports = AdvancedReports(REPORT_TYPE, cache=self.cache, schedule=BackoffSchedule(initial=0.01, jitter=0),
+                                       domain=self.server.domain, session_pool=self.pool, access_key='access',
+                                       secret_key='secret', account_id='seller')
+
+    def test_cached_by_dates(self):
+        start, end = datetime.datetime(2020, 1, 1), datetime.datetime(2020, 1, 31)
+        self.assertEqual(self.reports.request_and_download(start, end), flat_file_report(10).decode())
+        self.assertEqual(self.reports.request_and_download(start, end), flat_file_report(10).decode())
+        self.assertEqual(self.server.calls['RequestReport'], 1)
+        self.assertEqual(self.cache.get(self.cache.key(REPORT_TYPE, start, end)).encoding, 'UTF-8')
+
+    def test_default_dates_resolved_in_key(self):
+        self.reports.request_and_download()
+        # The last 30 days are requested and cached, not an open-ended range.
+        self.assertIsNone(self.cache.get(self.cache.key(REPORT_TYPE)))
+        with self.cache._connect() as db:
+            self.assertEqual(db.execute('SELECT COUNT(*) FROM entries').fetchone()[0], 1)
+            key, = db.execute('SELECT key FROM requests').fetchone()
+        self.assertIsNotNone(self.cache.get(key))
+
+
+if __name__ == '__main__':
+    unittest.main()
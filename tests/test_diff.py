@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mws_extensions.reports.diff import SnapshotDiff, INSERTED, UPDATED, DELETED
+
+
+def snapshot(count, price=lambda i: '{}.00'.format(i), start=0):
+    return [{'sku': 'SKU{:04d}'.format(i), 'price': price(i), 'updated': str(i)} for i in range(start, count)]
+
+
+class SnapshotDiffTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'listings.idx')
+
+    def changes(self, diff, rows):
+        return sorted((change, row['sku']) for change, row in diff.diff(rows))
+
+    def test_first_snapshot_inserted(self):
+        diff = SnapshotDiff(self.path, key='sku', run_size=3)
+        self.assertEqual(self.changes(diff, snapshot(10)), [(INSERTED, row['sku']) for row in snapshot(10)])
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(self.changes(diff, snapshot(10)), [])
+
+    def test_changes_across_spilled_runs(self):
+        # 3 rows per run: the new index is merged from several sorted runs on disk.
+        diff = SnapshotDiff(self.path, key='sku', run_size=3)
+        list(diff.diff(snapshot(20)))
+
+        rows = snapshot(25, price=lambda i: '9.99' if i % 4 == 0 else '{}.00'.format(i), start=5)
+        expected = sorted([(UPDATED, row['sku']) for row in rows if row['price'] == '9.99' and row['sku'] < 'SKU0020']
+                          + [(INSERTED, row['sku']) for row in rows if row['sku'] >= 'SKU0020']
+                          + [(DELETED, row['sku']) for row in snapshot(5)])
+        self.assertEqual(self.changes(diff, rows), expected)
+        # The index of `rows` replaced the previous one.
+        self.assertEqual(self.changes(diff, rows), [])
+
+    def test_deleted_rows_hold_their_key(self):
+        diff = SnapshotDiff(self.path, key=('sku', 'price'), run_size=2)
+        list(diff.diff(snapshot(5)))
+        self.assertEqual(list(diff.diff(snapshot(5, start=1))), [(DELETED, {'sku': 'SKU0000', 'price': '0.00'})])
+
+    def test_compared_columns(self):
+        diff = SnapshotDiff(self.path, key='sku', columns=('price',), run_size=4)
+        list(diff.diff(snapshot(10)))
+        rows = snapshot(10)
+        for row in rows:
+            row['updated'] = 'later'
+        rows[7]['price'] = '1.00'
+        self.assertEqual(self.changes(diff, rows), [(UPDATED, 'SKU0007')])
+
+    def test_stopped_diff_keeps_the_index(self):
+        diff = SnapshotDiff(self.path, key='sku', run_size=3)
+        list(diff.diff(snapshot(10)))
+        changes = diff.diff(snapshot(20))
+        next(changes)
+        changes.close()
+        self.assertEqual(self.changes(diff, snapshot(10)), [])
+
+    def test_reset(self):
+        diff = SnapshotDiff(self.path, key='sku', run_size=3)
+        list(diff.diff(snapshot(5)))
+        diff.reset()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(len(self.changes(diff, snapshot(5))), 5)
+
+    def test_empty_snapshot(self):
+        diff = SnapshotDiff(self.path, key='sku', run_size=3)
+        list(diff.diff(snapshot(4)))
+        self.assertEqual(self.changes(diff, []), [(DELETED, row['sku']) for row in snapshot(4)])
+        self.assertEqual(self.changes(diff, snapshot(2)), [(INSERTED, 'SKU0000'), (INSERTED, 'SKU0001')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mws_extensions.reports import BatchReports, BackoffSchedule, JobJournal, ReportJob
+from mws_extensions.reports.jobs import NEW, REQUESTED, POLLED, GENERATED, DOWNLOADED, ACKNOWLEDGED, FAILED
+
+from .fake_server import flat_file_report
+from .test_batch import FakeServerTestCase, CREDENTIALS, REPORT_TYPE
+
+
+class JournalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.journal = JobJournal(os.path.join(self.directory, 'jobs.db'))
+
+
+class JobJournalTest(JournalTestCase):
+
+    def job(self, marketplaceid='M1', **kwargs):
+        return ReportJob(REPORT_TYPE, marketplaceids=(marketplaceid,), **kwargs)
+
+    def test_record_upserts(self):
+        job = self.job()
+        self.journal.record(job, NEW)
+        job.report_request_id, job.status = '1', '_SUBMITTED_'
+        self.journal.record(job, REQUESTED)
+        job.status = '_IN_PROGRESS_'
+        self.journal.record(job, POLLED)
+
+        jobs = self.journal.jobs()
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual((jobs[0].job_id, jobs[0].stage, jobs[0].report_request_id, jobs[0].status),
+                         (job.job_id, POLLED, '1', '_IN_PROGRESS_'))
+        self.assertEqual([event[:2] for event in self.journal.history(job.job_id)],
+                         [(NEW, None), (REQUESTED, '_SUBMITTED_'), (POLLED, '_IN_PROGRESS_')])
+
+    def test_restore(self):
+        job = self.job()
+        job.report_request_id, job.status, job.generated_report_id = '1', '_DONE_', '2'
+        self.journal.record(job, GENERATED)
+
+        restored = self.job()
+        self.assertTrue(self.journal.restore(restored))
+        self.assertEqual((restored.stage, restored.report_request_id, restored.generated_report_id),
+                         (GENERATED, '1', '2'))
+        self.assertFalse(self.journal.restore(self.job('M2')))
+
+    def test_restore_downloaded(self):
+        dest = os.path.join(self.directory, 'report.txt')
+        in_memory, on_disk = self.job('M1'), self.job('M2', dest=dest)
+        with open(dest, 'wb') as fp:
+            fp.write(b'report')
+        for job in (in_memory, on_disk):
+            job.generated_report_id, job.contents = '2', 6
+            self.journal.record(job, DOWNLOADED)
+
+        # The report kept in memory is lost with the process, the file isn't.
+        in_memory, on_disk = self.job('M1'), self.job('M2', dest=dest)
+        self.journal.restore(in_memory)
+        self.journal.restore(on_disk)
+        self.assertEqual((in_memory.stage, in_memory.downloaded), (GENERATED, False))
+        self.assertEqual((on_disk.stage, on_disk.downloaded, on_disk.contents), (DOWNLOADED, True, 6))
+
+    def test_pending_reset_and_forget(self):
+        jobs = [self.job('M{}'.format(i)) for i in range(3)]
+        jobs[1].status = '_CANCELLED_'
+        for job, stage in zip(jobs, (REQUESTED, FAILED, ACKNOWLEDGED)):
+            self.journal.record(job, stage)
+
+        self.assertEqual([job.job_id for job in self.journal.pending()], [jobs[0].job_id])
+        failed = self.journal.jobs(stages=(FAILED,))[0]
+        self.assertEqual(failed.error.status, '_CANCELLED_')
+
+        self.journal.reset(jobs[1].job_id)
+        self.assertEqual([job.job_id for job in self.journal.pending()], [jobs[0].job_id, jobs[1].job_id])
+        self.journal.forget()
+        self.assertEqual([job.job_id for job in self.journal.jobs()], [jobs[0].job_id, jobs[1].job_id])
+
+
+class ResumeTest(JournalTestCase, FakeServerTestCase):
+
+    server_options = dict(processing_time=0.05, report_rows=10)
+
+    def setUp(self):
+        JournalTestCase.setUp(self)
+        FakeServerTestCase.setUp(self)
+
+    def resume(self):
+        return BatchReports.resume(self.journal, schedule=BackoffSchedule(initial=0.01, jitter=0),
+                                   domain=self.server.domain, session_pool=self.pool, **CREDENTIALS)
+
+    def test_resume_requested_jobs(self):
+        # A process requesting the reports, then dying before polling them.
+        batch = self.batch(journal=self.journal)
+        for i in range(3):
+            batch.submit(batch.add_job(REPORT_TYPE, marketplaceids=('M{}'.format(i),)))
+
+        jobs = self.resume().run()
+
+        self.assertEqual([job.job_id for job in jobs], [job.job_id for job in batch.jobs])
+        self.assertEqual([job.report_request_id for job in jobs], [job.report_request_id for job in batch.jobs])
+        self.assertEqual([job.contents for job in jobs], [flat_file_report(10).decode()] * 3)
+        self.assertEqual(self.server.calls['RequestReport'], 3)
+        self.assertEqual(self.journal.pending(), [])
+        self.assertEqual({job.stage for job in self.journal.jobs()}, {ACKNOWLEDGED})
+
+    def test_resume_generated_job(self):
+        # A process dying while downloading the report.
+        batch = self.batch(journal=self.journal)
+        job = batch.add_job(REPORT_TYPE)
+        batch.submit(job)
+        job.generated_report_id = batch.poll(job.report_request_id)
+        self.journal.record(job, GENERATED)
+        polls = self.server.calls['GetReportRequestList']
+
+        jobs = self.resume().run()
+
+        self.assertEqual(jobs[0].contents, flat_file_report(10).decode())
+        self.assertEqual(self.server.calls['GetReportRequestList'], polls)
+        self.assertEqual(self.server.calls['RequestReport'], 1)
+        self.assertEqual(self.journal.jobs()[0].stage, ACKNOWLEDGED)
+
+
+if __name__ == '__main__':
+    unittest.main()
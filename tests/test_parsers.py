@@ -0,0 +1,35 @@
+import decimal
+import unittest
+
+from mws_extensions.reports.parsers import FlatFileParser, to_decimal
+
+
+class ToDecimalTest(unittest.TestCase):
+
+    def test_separators(self):
+        for value, expected in [
+            ('12', '12'),
+            ('12.50', '12.50'),
+            ('12,50', '12.50'),
+            ('-0,99', '-0.99'),
+            ('1,234.50', '1234.50'),
+            ('1,234,567.5', '1234567.5'),
+            ('1.234,50', '1234.50'),
+            ('1.234.567,5', '1234567.5'),
+        ]:
+            self.assertEqual(to_decimal(value), decimal.Decimal(expected), value)
+
+
+class FlatFileParserTest(unittest.TestCase):
+
+    def test_byte_order_mark_stripped_from_header(self):
+        lines = ['\ufeffsku\tprice\tquantity', 'a\t1,234.50\t3', 'b\t\t']
+        rows = list(FlatFileParser(report_type='_GET_FLAT_FILE_OPEN_LISTINGS_DATA_').iter_rows(lines))
+        self.assertEqual(rows, [
+            {'sku': 'a', 'price': decimal.Decimal('1234.50'), 'quantity': 3},
+            {'sku': 'b', 'price': None, 'quantity': None},
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from mws.mws import MWSError
+
+from mws_extensions.mws_additions import InboundShipments
+from mws_extensions.sessions import SessionPool
+
+RESPONSE = (
+    b'<ListInboundShipmentsResponse xmlns="http://mws.amazonaws.com/FulfillmentInboundShipment/2010-10-01/">'
+    b'<ListInboundShipmentsResult><ShipmentData/></ListInboundShipmentsResult>'
+    b'</ListInboundShipmentsResponse>'
+)
+
+
+class CountingServer(object):
+    """
+    Local endpoint counting the connections it accepts and the requests of each action.
+    Answers every request with `status`.
+    """
+
+    def __init__(self, status=200):
+        self.status = status
+        self.connections = 0
+        self.requests = {}
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Buffer the headers and the body in a single segment, flushed once the request is handled.
+            wbufsize = -1
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def _respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                action = self.path.split('Action=')[-1].split('&')[0]
+                with server.lock:
+                    server.requests[action] = server.requests.get(action, 0) + 1
+                self.send_response(server.status)
+                self.send_header('Content-Type', 'text/xml')
+                self.send_header('Content-Length', str(len(RESPONSE)))
+                self.end_headers()
+                self.wfile.write(RESPONSE)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.domain = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SessionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = CountingServer()
+        self.addCleanup(self.server.stop)
+        self.pool = SessionPool(pool_maxsize=4, backoff_factor=0)
+        self.addCleanup(self.pool.close)
+
+    def client(self):
+        return InboundShipments(access_key='a', secret_key='s', account_id='m', domain=self.server.domain,
+                                session_pool=self.pool)
+
+    def test_keepalive_connections_reused(self):
+        # A new client per request: connections belong to the pool, not to the client.
+        def request(_):
+            return self.client().make_request(dict(Action='ListInboundShipments')).response.status_code
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            statuses = list(executor.map(request, range(200)))
+
+        self.assertEqual(statuses, [200] * 200)
+        self.assertEqual(self.server.requests, {'ListInboundShipments': 200})
+        self.assertLessEqual(self.server.connections, 4)
+
+    def test_stream_request_releases_connection(self):
+        for _ in range(20):
+            response = self.client().stream_request(dict(Action='ListInboundShipments'))
+            self.assertEqual(response.content, RESPONSE)
+            response.close()
+        self.assertEqual(self.server.connections, 1)
+
+    def test_one_session_per_endpoint(self):
+        url = self.server.domain + '/FulfillmentInboundShipment/2010-10-01'
+        self.assertIs(self.pool.session(url + '?Action=ListInboundShipments'), self.pool.session(url))
+        self.assertIsNot(self.pool.session(url), self.pool.session('https://mws.amazonservices.com/'))
+
+
+class MWSRetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = CountingServer(status=500)
+        self.addCleanup(self.server.stop)
+        self.pool = SessionPool(retries=3, backoff_factor=0)
+        self.addCleanup(self.pool.close)
+        self.client = InboundShipments(access_key='a', secret_key='s', account_id='m', domain=self.server.domain,
+                                       session_pool=self.pool)
+
+    def test_read_only_operation_retried(self):
+        with self.assertRaises(MWSError):
+            self.client.make_request(dict(Action='ListInboundShipments'))
+        self.assertEqual(self.server.requests, {'ListInboundShipments': 4})
+
+    def test_mutating_operation_not_retried(self):
+        with self.assertRaises(MWSError):
+            self.client.make_request(dict(Action='RequestReport'))
+        with self.assertRaises(MWSError):
+            self.client.make_request(dict(Action='ListInboundShipments'), method='POST')
+        self.assertEqual(self.server.requests, {'RequestReport': 1, 'ListInboundShipments': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from mws_extensions.throttle import MemoryBackend, FileBackend, ThrottleGovernor, DEFAULT_QUOTA, fcntl, is_throttled
+
+KEY = ('seller', 'ListInboundShipments')
+
+
+class MemoryBackendTest(unittest.TestCase):
+
+    def backend(self):
+        return MemoryBackend()
+
+    def test_reserve_until_empty(self):
+        backend = self.backend()
+        self.assertEqual([backend.reserve(KEY, 3, 2, now=100) for _ in range(3)], [0, 0, 0])
+        # In debt: each request waits for one more token to be restored.
+        self.assertEqual(backend.reserve(KEY, 3, 2, now=100), 0.5)
+        self.assertEqual(backend.reserve(KEY, 3, 2, now=100), 1)
+
+    def test_refill(self):
+        backend = self.backend()
+        for _ in range(3):
+            backend.reserve(KEY, 3, 2, now=100)
+        self.assertEqual(backend.reserve(KEY, 3, 2, now=101), 0)
+        self.assertEqual(backend.reserve(KEY, 3, 2, now=101), 0)
+        self.assertEqual(backend.reserve(KEY, 3, 2, now=101), 0.5)
+        # Never more than the capacity.
+        self.assertEqual([backend.reserve(KEY, 3, 2, now=1000) for _ in range(4)], [0, 0, 0, 0.5])
+
+    def test_update_only_lowers(self):
+        backend = self.backend()
+        backend.update(KEY, 3, 2, 0, now=100)
+        self.assertEqual(backend.reserve(KEY, 3, 2, now=100), 0.5)
+        backend.update(KEY, 3, 2, 10, now=101)
+        self.assertEqual(backend.reserve(KEY, 3, 2, now=101), 0)
+        self.assertEqual(backend.reserve(KEY, 3, 2, now=101), 0.5)
+
+    def test_keys_independent(self):
+        backend = self.backend()
+        backend.update(KEY, 3, 2, 0, now=100)
+        self.assertEqual(backend.reserve(('other', KEY[1]), 3, 2, now=100), 0)
+        self.assertEqual(backend.reserve((KEY[0], 'GetReport'), 3, 2, now=100), 0)
+
+
+@unittest.skipIf(fcntl is None, 'fcntl is not available')
+class FileBackendTest(MemoryBackendTest):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'buckets.json')
+
+    def backend(self):
+        return FileBackend(self.path)
+
+    def test_shared_between_instances(self):
+        # Two processes using the same file.
+        first, second = FileBackend(self.path), FileBackend(self.path)
+        for _ in range(3):
+            first.reserve(KEY, 3, 2, now=100)
+        self.assertEqual(second.reserve(KEY, 3, 2, now=100), 0.5)
+        second.update(KEY, 3, 2, -2, now=100)
+        self.assertEqual(first.reserve(KEY, 3, 2, now=100), 1.5)
+
+
+class ThrottleGovernorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.slept = []
+        self.governor = ThrottleGovernor(quotas={'Slow': (2, 0.001)}, sleep=self.slept.append)
+
+    def test_quotas(self):
+        self.assertEqual(self.governor.quota('Slow'), (2, 0.001))
+        self.assertEqual(self.governor.quota('GetReport'), (15, 1 / 60.))
+        self.assertEqual(self.governor.quota('Unknown'), DEFAULT_QUOTA)
+
+    def test_acquire_sleeps_once_the_quota_is_used(self):
+        self.assertEqual([self.governor.acquire('seller', 'Slow') for _ in range(2)], [0, 0])
+        self.assertEqual(self.slept, [])
+        wait = self.governor.acquire('seller', 'Slow')
+        self.assertAlmostEqual(wait, 1000, delta=1)
+        self.assertEqual(self.slept, [wait])
+        # Per seller.
+        self.assertEqual(self.governor.acquire('other', 'Slow'), 0)
+
+    def test_throttled_empties_the_bucket(self):
+        self.governor.throttled('seller', 'Slow')
+        self.assertAlmostEqual(self.governor.reserve('seller', 'Slow'), 1000, delta=1)
+
+    def test_sync(self):
+        self.governor.sync('seller', 'Slow', {'x-mws-quota-remaining': '0.0'})
+        self.assertAlmostEqual(self.governor.reserve('seller', 'Slow'), 1000, delta=1)
+
+        for headers in (None, {}, {'x-mws-quota-remaining': 'n/a'}):
+            self.governor.sync('other', 'Slow', headers)
+        self.assertEqual(self.governor.reserve('other', 'Slow'), 0)
+
+
+class IsThrottledTest(unittest.TestCase):
+
+    def test_responses(self):
+        throttled = mock.Mock(status_code=503, text='<Code>RequestThrottled</Code>')
+        unavailable = mock.Mock(status_code=503, text='<Code>ServiceUnavailable</Code>')
+        error = mock.Mock(status_code=400, text='<Code>RequestThrottled</Code>')
+        self.assertTrue(is_throttled(throttled))
+        self.assertFalse(is_throttled(unavailable))
+        self.assertFalse(is_throttled(error))
+        self.assertFalse(is_throttled(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
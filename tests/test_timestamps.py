@@ -0,0 +1,42 @@
+import unittest
+
+from mws_extensions.reports.utils import from_amazon_timestamp, from_amazon_timestamps
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FIRST = '2020-01-02T03:04:05+00:00'
+SECOND = '2020-06-30T23:59:59+00:00'
+
+
+class FromAmazonTimestampsTest(unittest.TestCase):
+
+    def test_list(self):
+        self.assertEqual(from_amazon_timestamps([FIRST, None, '', SECOND, FIRST]), [
+            from_amazon_timestamp(FIRST), None, None, from_amazon_timestamp(SECOND), from_amazon_timestamp(FIRST),
+        ])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_object_array_with_nulls(self):
+        values = numpy.array([None, FIRST, '', SECOND, None, FIRST], dtype=object)
+        converted = from_amazon_timestamps(values)
+
+        self.assertEqual(converted.dtype, numpy.dtype('datetime64[us]'))
+        self.assertEqual(numpy.isnat(converted).tolist(), [True, False, True, False, True, False])
+        self.assertEqual(converted[[1, 3, 5]].tolist(), [
+            from_amazon_timestamp(FIRST), from_amazon_timestamp(SECOND), from_amazon_timestamp(FIRST),
+        ])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_str_array_keeps_its_shape(self):
+        converted = from_amazon_timestamps(numpy.array([[FIRST, ''], [SECOND, FIRST]]))
+
+        self.assertEqual(converted.shape, (2, 2))
+        self.assertTrue(numpy.isnat(converted[0, 1]))
+        self.assertEqual(converted[1].tolist(), [from_amazon_timestamp(SECOND), from_amazon_timestamp(FIRST)])
+
+
+if __name__ == '__main__':
+    unittest.main()
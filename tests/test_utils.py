@@ -0,0 +1,56 @@
+import unittest
+
+from mws.utils import enumerate_param
+
+from mws_extensions import utils
+from mws_extensions.utils import flatten_params, enumerate_dict, enumerate_list
+
+
+class FlattenParamsTest(unittest.TestCase):
+
+    def test_scalars_match_enumerate_param(self):
+        values = ['a', 'b', 3, 'ü', 'x y&z']
+        for param in ('MarketplaceIdList.Id', 'MarketplaceIdList.Id.'):
+            self.assertEqual(flatten_params(param, values), enumerate_param('MarketplaceIdList.Id.', values))
+            self.assertEqual(enumerate_list(param, iter(values)), enumerate_param('MarketplaceIdList.Id.', values))
+
+    def test_positions_grow_past_the_precomputed_ones(self):
+        count = len(utils._POSITIONS) + 500
+        values = ['SKU{}'.format(i) for i in range(count)]
+
+        self.assertEqual(flatten_params('SellerSKUList.Id', values), enumerate_param('SellerSKUList.Id.', values))
+        self.assertGreaterEqual(len(utils._POSITIONS), count)
+        # A shorter list afterwards still uses the grown positions.
+        self.assertEqual(flatten_params('SellerSKUList.Id', values[:3]),
+                         enumerate_param('SellerSKUList.Id.', values[:3]))
+
+    def test_nested(self):
+        items = [
+            {'SellerSKU': 'a', 'Quantity': 1, 'PrepDetailsList': {'PrepDetails': [{'PrepInstruction': 'Taping'}]}},
+            {'SellerSKU': 'b', 'Quantity': 2},
+        ]
+        self.assertEqual(flatten_params('InboundShipmentPlanRequestItems.member.', items), {
+            'InboundShipmentPlanRequestItems.member.1.SellerSKU': 'a',
+            'InboundShipmentPlanRequestItems.member.1.Quantity': 1,
+            'InboundShipmentPlanRequestItems.member.1.PrepDetailsList.PrepDetails.1.PrepInstruction': 'Taping',
+            'InboundShipmentPlanRequestItems.member.2.SellerSKU': 'b',
+            'InboundShipmentPlanRequestItems.member.2.Quantity': 2,
+        })
+
+    def test_enumerate_dict(self):
+        header = {'ShipmentName': 'a', 'ShipFromAddress': {'Name': 'b', 'City': 'c'}}
+        self.assertEqual(enumerate_dict('InboundShipmentHeader', header), {
+            'InboundShipmentHeader.ShipmentName': 'a',
+            'InboundShipmentHeader.ShipFromAddress.Name': 'b',
+            'InboundShipmentHeader.ShipFromAddress.City': 'c',
+        })
+        self.assertEqual(enumerate_dict('InboundShipmentHeader', None), {})
+
+    def test_adds_to_params(self):
+        params = {'Action': 'ListInboundShipments'}
+        self.assertIs(flatten_params('ShipmentIdList.member', ['x'], params), params)
+        self.assertEqual(params, {'Action': 'ListInboundShipments', 'ShipmentIdList.member.1': 'x'})
+
+
+if __name__ == '__main__':
+    unittest.main()